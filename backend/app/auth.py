@@ -4,22 +4,13 @@ from datetime import datetime, timedelta, timezone
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
-from app.database import get_db
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
+from app.database import get_async_db
+from app.passwords import password_pool
+from app.principals import AUTH_FAILURES, Principal, principal_cache
 
 SECRET_KEY = os.environ["SECRET_KEY"]
 ALGORITHM = "HS256"
@@ -39,37 +30,54 @@ def verify_access_token(token: str, credentials_exception):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("user_id")
-        if user_id is None:
-            raise credentials_exception
-        return user_id
     except JWTError:
+        user_id = None
+    if user_id is None:
+        AUTH_FAILURES.inc(reason="invalid_token")
         raise credentials_exception
+    return user_id
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(
+    token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     user_id = verify_access_token(token, credentials_exception)
-    user = db.query(models.User).filter(models.User.id == user_id).first()
-    if not user:
-        raise credentials_exception
-    return user
+    principal = principal_cache.get_user(user_id)
+    if principal is None:
+        user = await db.scalar(select(models.User).where(models.User.id == user_id))
+        if not user:
+            AUTH_FAILURES.inc(reason="unknown_user")
+            raise credentials_exception
+        principal = Principal.from_user(user)
+        principal_cache.put_user(principal)
+    return principal
 
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    invalid_credentials = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid email or password",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    user = await db.scalar(select(models.User).where(models.User.email == form_data.username))
+    if not user:
+        AUTH_FAILURES.inc(reason="invalid_login")
+        raise invalid_credentials
+    valid, new_hash = await password_pool.verify_and_update(form_data.password, user.hashed_password)
+    if not valid:
+        AUTH_FAILURES.inc(reason="invalid_login")
+        raise invalid_credentials
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
     access_token = create_access_token({"user_id": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
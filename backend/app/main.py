@@ -1,72 +1,43 @@
 from contextlib import asynccontextmanager
+from typing import Optional
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, Query, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from jose import JWTError, jwt
 
-from app import models
 from app.auth import ALGORITHM, SECRET_KEY
 from app.auth import router as auth_router
-from app.database import Base, SessionLocal, engine
+from app.database import AsyncSessionLocal, async_engine
+from app.metrics import RequestMetricsMiddleware, multiprocess
+from app.passwords import password_pool
+from app.principals import AUTH_FAILURES
+from app.querystats import QueryStatsMiddleware
 from app.routes.boards import router as boards_router
 from app.routes.cards import router as cards_router
 from app.routes.columns import router as columns_router
+from app.routes.metrics import router as metrics_router
 from app.routes.users import router as users_router
-from app.ws import manager
+from app.services.boards import get_role
+from app.services.events import replay_since
+from app.services.socket_actions import SocketContext, handle_message
+from app.tickets import read_ticket
+from app.ws import CLOSE_LIMIT, ConnectionLimitExceeded, manager
 
 load_dotenv()
 
 
-DEMO_EMAIL = "demo@taskboard.dev"
-DEMO_PASSWORD = "demo1234"
-
-
-def seed_demo_data():
-    from app.auth import hash_password
-    db = SessionLocal()
-    try:
-        existing = db.query(models.User).filter(models.User.email == DEMO_EMAIL).first()
-        if existing:
-            return
-
-        user = models.User(email=DEMO_EMAIL, hashed_password=hash_password(DEMO_PASSWORD), display_name="Demo User")
-        db.add(user)
-        db.flush()
-
-        board = models.Board(title="Weekend Plans", owner_id=user.id)
-        db.add(board)
-        db.flush()
-
-        member = models.BoardMember(board_id=board.id, user_id=user.id, role="owner")
-        db.add(member)
-
-        cols = [
-            models.BoardColumn(board_id=board.id, title="To Do", position=0),
-            models.BoardColumn(board_id=board.id, title="In Progress", position=1),
-            models.BoardColumn(board_id=board.id, title="Done", position=2),
-        ]
-        db.add_all(cols)
-        db.flush()
-
-        cards = [
-            models.Card(column_id=cols[0].id, title="Make coffee", description="The good beans, not the instant stuff", position=0, created_by=user.id),
-            models.Card(column_id=cols[0].id, title="Go for a run", description="At least 3km, no excuses", position=1, created_by=user.id),
-            models.Card(column_id=cols[0].id, title="Call mom", position=2, created_by=user.id),
-            models.Card(column_id=cols[1].id, title="Grocery shopping", description="Milk, eggs, and way too many snacks", position=0, created_by=user.id),
-            models.Card(column_id=cols[2].id, title="Clean the apartment", position=0, created_by=user.id),
-        ]
-        db.add_all(cards)
-        db.commit()
-    finally:
-        db.close()
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
-    seed_demo_data()
+    await manager.start()
+    if multiprocess:
+        await multiprocess.start()
     yield
+    if multiprocess:
+        await multiprocess.stop()
+    await manager.stop()
+    password_pool.shutdown()
+    await async_engine.dispose()
 
 
 app = FastAPI(title="TaskBoard API", lifespan=lifespan)
@@ -78,12 +49,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
 
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(boards_router)
 app.include_router(columns_router)
 app.include_router(cards_router)
+app.include_router(metrics_router)
 
 
 @app.get("/")
@@ -91,33 +65,74 @@ def read_root():
     return {"message": "TaskBoard API is running"}
 
 
-@app.websocket("/ws/{board_id}")
-async def websocket_endpoint(websocket: WebSocket, board_id: int, token: str = Query(...)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id = payload.get("user_id")
-        if user_id is None:
+async def _authorize_socket(websocket: WebSocket, board_id: int, token: Optional[str], ticket: Optional[str]):
+    """(user_id, role) for the socket, or None once it has been closed with the reason.
+
+    A board ticket is checked without the database; an access token costs a role lookup.
+    """
+    if ticket is not None:
+        grant = read_ticket(ticket, board_id)
+        if grant is None:
+            AUTH_FAILURES.inc(reason="invalid_ticket")
             await websocket.close(code=4001)
-            return
+            return None
+        return grant.user_id, grant.role
+
+    try:
+        user_id = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM]).get("user_id") if token else None
     except JWTError:
+        user_id = None
+    if user_id is None:
+        AUTH_FAILURES.inc(reason="invalid_token")
         await websocket.close(code=4001)
+        return None
+
+    async with AsyncSessionLocal() as db:
+        try:
+            return user_id, await get_role(db, board_id, user_id)
+        except HTTPException:
+            await websocket.close(code=4003)
+            return None
+
+
+@app.websocket("/ws/{board_id}")
+async def websocket_endpoint(
+    websocket: WebSocket,
+    board_id: int,
+    token: Optional[str] = Query(None),
+    ticket: Optional[str] = Query(None),
+    since: Optional[int] = Query(None, ge=0),
+):
+    """Board event stream. With ``since`` (a board version), missed events are replayed first.
+
+    Authenticate with a board ticket from ``POST /boards/{board_id}/ticket`` or an access token.
+    Editors can also send card and column mutations on the socket; see ``socket_actions``.
+    """
+    principal = await _authorize_socket(websocket, board_id, token, ticket)
+    if principal is None:
         return
+    user_id, role = principal
 
-    db = SessionLocal()
+    # Subscribe before reading the log so nothing committed in between is missed; live
+    # events wait behind the replay and clients drop any seq they already applied.
     try:
-        membership = db.query(models.BoardMember).filter(
-            models.BoardMember.board_id == board_id,
-            models.BoardMember.user_id == user_id,
-        ).first()
-        if not membership:
-            await websocket.close(code=4003)
+        connection = await manager.connect(websocket, board_id, held=since is not None, user_id=user_id)
+    except ConnectionLimitExceeded:
+        await websocket.close(code=CLOSE_LIMIT)
+        return
+    if since is not None:
+        try:
+            async with AsyncSessionLocal() as db:
+                replay = await replay_since(db, board_id, since)
+        except HTTPException:
+            manager.disconnect(websocket, board_id)
+            await websocket.close(code=4004)
             return
-    finally:
-        db.close()
+        connection.release(replay)
 
-    await manager.connect(websocket, board_id)
+    context = SocketContext(board_id=board_id, user_id=user_id, role=role, connection=connection)
     try:
         while True:
-            await websocket.receive_text()
+            await handle_message(context, await websocket.receive_text())
     except WebSocketDisconnect:
         manager.disconnect(websocket, board_id)
@@ -0,0 +1,356 @@
+"""In-process metrics, rendered in the Prometheus text format by ``GET /metrics``.
+
+Modules declare their metrics at import time on the shared ``registry``. Values that are
+cheaper to read than to track (pool occupancy, queue depths) are set by collect hooks that
+run just before each scrape. Updates are plain dict writes on the event loop: no locks.
+
+With several worker processes, set ``METRICS_DIR`` to a directory they share. Each worker
+writes a snapshot of its registry there every ``METRICS_FLUSH_INTERVAL`` seconds, and the
+worker that serves the scrape sums every snapshot. Counters and histograms of exited workers
+keep counting; their gauges are dropped once the snapshot goes stale.
+"""
+
+import asyncio
+import contextlib
+import glob
+import json
+import logging
+import math
+import os
+import socket
+import time
+from typing import Callable, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS_DIR = os.getenv("METRICS_DIR")
+METRICS_FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", 5))
+
+# Seconds; suits pool checkouts and queries as well as whole requests.
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(pairs: Iterable[tuple[str, str]]) -> str:
+    text = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return "{" + text + "}" if text else ""
+
+
+class Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[tuple[str, tuple[tuple[str, str], ...], float]]:
+        raise NotImplementedError
+
+    def dump(self) -> dict:
+        return {
+            "kind": self.kind,
+            "documentation": self.documentation,
+            "labelnames": list(self.labelnames),
+            "values": [[list(key), value] for key, value in list(self.values.items())],
+        }
+
+    def merge(self, values: list):
+        """Add another process's dumped ``values`` to this metric's."""
+        for key, value in values:
+            key = tuple(key)
+            self.values[key] = self.values.get(key, 0.0) + value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, pairs, value in self.samples():
+            lines.append(f"{name}{_labels(pairs)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        for key, value in sorted(self.values.items()):
+            yield self.name, tuple(zip(self.labelnames, key)), value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        self.values[self._key(labels)] = float(value)
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def clear(self):
+        """Forget every label set, for collect hooks whose label sets come and go."""
+        self.values = {}
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> [count per bucket..., sum, count]
+        self.values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        state = self.values.get(key)
+        if state is None:
+            state = self.values[key] = [0.0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[i] += 1
+                break
+        state[-2] += value
+        state[-1] += 1
+
+    def count(self, **labels) -> float:
+        state = self.values.get(self._key(labels))
+        return state[-1] if state else 0.0
+
+    def dump(self) -> dict:
+        return {**super().dump(), "buckets": list(self.buckets[:-1])}
+
+    def merge(self, values: list):
+        for key, state in values:
+            key = tuple(key)
+            current = self.values.get(key)
+            if current is None:
+                self.values[key] = list(state)
+            else:
+                self.values[key] = [a + b for a, b in zip(current, state)]
+
+    def total(self, **labels) -> float:
+        state = self.values.get(self._key(labels))
+        return state[-2] if state else 0.0
+
+    def samples(self):
+        for key, state in sorted(self.values.items()):
+            pairs = tuple(zip(self.labelnames, key))
+            cumulative = 0.0
+            for bound, observed in zip(self.buckets, state):
+                cumulative += observed
+                yield f"{self.name}_bucket", pairs + (("le", _format_value(bound)),), cumulative
+            yield f"{self.name}_sum", pairs, state[-2]
+            yield f"{self.name}_count", pairs, state[-1]
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collect_hooks: list[Callable[[], None]] = []
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} is already registered differently")
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def on_collect(self, hook: Callable[[], None]):
+        """Run ``hook`` before every render; it should ``set`` the gauges it owns."""
+        self.collect_hooks.append(hook)
+        return hook
+
+    def collect(self):
+        for hook in self.collect_hooks:
+            hook()
+
+    def snapshot(self) -> dict:
+        self.collect()
+        return {name: metric.dump() for name, metric in list(self.metrics.items())}
+
+    def merge(self, name: str, dumped: dict):
+        documentation, labelnames = dumped["documentation"], tuple(dumped["labelnames"])
+        if dumped["kind"] == "histogram":
+            metric = self.histogram(name, documentation, labelnames, tuple(dumped["buckets"]))
+            if list(metric.buckets[:-1]) != dumped["buckets"]:
+                raise ValueError(f"Metric {name} has different buckets")
+        else:
+            metric = self._register(KINDS[dumped["kind"]](name, documentation, labelnames))
+        metric.merge(dumped["values"])
+
+    def render(self) -> str:
+        self.collect()
+        lines = []
+        for name in sorted(self.metrics):
+            lines.extend(self.metrics[name].render())
+        return "\n".join(lines) + "\n"
+
+
+KINDS = {"counter": Counter, "gauge": Gauge, "histogram": Histogram}
+
+
+class MultiProcessCollector:
+    """Shares ``registry`` with the other workers through snapshot files in ``directory``.
+
+    Each process owns ``<name>.json`` (host and pid by default, looked up at write time so
+    forked workers get their own) and replaces it atomically, so readers never see half a file.
+    """
+
+    def __init__(
+        self, registry: Registry, directory: str, interval: float = METRICS_FLUSH_INTERVAL, name: Optional[str] = None
+    ):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self.name = name
+        self._flusher: Optional[asyncio.Task] = None
+
+    @property
+    def path(self) -> str:
+        name = self.name or f"{socket.gethostname()}-{os.getpid()}"
+        return os.path.join(self.directory, f"{name}.json")
+
+    async def start(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self.write()
+        self._flusher = asyncio.create_task(self._flush())
+
+    async def stop(self):
+        if self._flusher is not None:
+            self._flusher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._flusher
+            self._flusher = None
+        self.write()
+
+    async def _flush(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                logger.exception("Failed to write metrics snapshot to %s", self.directory)
+
+    def write(self):
+        body = json.dumps({"written_at": time.time(), "metrics": self.registry.snapshot()}, separators=(",", ":"))
+        path = self.path
+        with open(f"{path}.tmp", "w") as f:
+            f.write(body)
+        os.replace(f"{path}.tmp", path)
+
+    def render(self) -> str:
+        """Write this process's snapshot, then render the sum of every process's."""
+        self.write()
+        merged = Registry()
+        # Three missed flushes: the worker is gone and its gauges no longer describe anything.
+        stale_before = time.time() - 3 * self.interval
+        for path in sorted(glob.glob(os.path.join(self.directory, "*.json"))):
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            live = snapshot["written_at"] >= stale_before
+            for name, dumped in snapshot["metrics"].items():
+                if dumped["kind"] == "gauge" and not live:
+                    continue
+                try:
+                    merged.merge(name, dumped)
+                except ValueError:
+                    # A worker from another release declares it differently; keep the first.
+                    logger.warning("Skipping metric %s from %s: declared differently", name, path)
+        return merged.render()
+
+
+registry = Registry()
+multiprocess = MultiProcessCollector(registry, METRICS_DIR) if METRICS_DIR else None
+
+
+def render() -> str:
+    return multiprocess.render() if multiprocess else registry.render()
+
+
+HTTP_REQUESTS = registry.counter(
+    "taskboard_http_requests_total", "HTTP requests, by method, route and status.", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "taskboard_http_request_duration_seconds", "Time to send the whole response, by method and route.", ("method", "route")
+)
+HTTP_IN_PROGRESS = registry.gauge("taskboard_http_requests_in_progress", "HTTP requests being handled.")
+
+
+def route_label(scope: dict) -> str:
+    """The matched route's template, so ids in paths don't each become a series."""
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+class RequestMetricsMiddleware:
+    """Counts HTTP requests and times them per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_PROGRESS.dec()
+            route = route_label(scope)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status))
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=scope["method"], route=route)
@@ -0,0 +1,116 @@
+"""Schema migrations. The app never changes the schema itself; run this before starting it.
+
+    python -m app.migrate upgrade [--seed]   # bring DATABASE_URL to head
+    python -m app.migrate downgrade 0002
+    python -m app.migrate current
+    python -m app.migrate check              # exit 1 if the schema is behind head
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.database import engine as default_engine
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+# Databases created by create_all before migrations existed match this revision.
+BASELINE_REVISION = "0001"
+# pg_advisory_lock key held while migrating, so concurrent deploys run one at a time.
+MIGRATION_LOCK_KEY = 7_240_601
+
+
+def alembic_config(connection=None) -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.attributes["configure_logger"] = False
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def _lock(connection: Connection):
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
+def _unlock(connection: Connection):
+    if connection.dialect.name == "postgresql":
+        connection.rollback()
+        connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
+
+
+def upgrade(engine: Engine = None, revision: str = "head"):
+    """Bring the schema up to ``revision``, adopting pre-migration databases at the baseline."""
+    with (engine or default_engine).connect() as connection:
+        _lock(connection)
+        try:
+            tables = set(inspect(connection).get_table_names())
+            config = alembic_config(connection)
+            if "users" in tables and "alembic_version" not in tables:
+                command.stamp(config, BASELINE_REVISION)
+            # Alembic must own the transaction so revisions can step outside it (CONCURRENTLY).
+            connection.commit()
+            command.upgrade(config, revision)
+            connection.commit()
+        finally:
+            _unlock(connection)
+
+
+def downgrade(engine: Engine = None, revision: str = "-1"):
+    with (engine or default_engine).connect() as connection:
+        _lock(connection)
+        try:
+            command.downgrade(alembic_config(connection), revision)
+            connection.commit()
+        finally:
+            _unlock(connection)
+
+
+def current_revision(engine: Engine = None):
+    with (engine or default_engine).connect() as connection:
+        return MigrationContext.configure(connection).get_current_revision()
+
+
+def head_revision() -> str:
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+
+def main(argv: list[str] = None, engine: Engine = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrate", description="Manage the TaskBoard schema.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="apply migrations up to a revision")
+    upgrade_parser.add_argument("revision", nargs="?", default="head")
+    upgrade_parser.add_argument("--seed", action="store_true", help="also create the demo user and board")
+    downgrade_parser = commands.add_parser("downgrade", help="revert migrations down to a revision")
+    downgrade_parser.add_argument("revision", nargs="?", default="-1")
+    commands.add_parser("current", help="print the database's revision")
+    commands.add_parser("check", help="exit 1 unless the database is at head")
+    args = parser.parse_args(argv)
+
+    if args.command == "upgrade":
+        upgrade(engine, args.revision)
+        if args.seed:
+            from app.seed import seed_demo_data
+
+            seed_demo_data(engine)
+    elif args.command == "downgrade":
+        downgrade(engine, args.revision)
+    elif args.command == "current":
+        print(current_revision(engine) or "none")
+    elif args.command == "check":
+        current, head = current_revision(engine), head_revision()
+        if current != head:
+            print(f"Database is at {current or 'none'}, head is {head}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,26 @@
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+from typing import Optional
+
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    event,
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.database import Base
 
+# Rank keys compare bytewise; Postgres needs the C collation for that.
+RankType = String(255).with_variant(String(255, collation="C"), "postgresql")
+
 
 class User(Base):
     __tablename__ = "users"
@@ -24,12 +41,14 @@ class Board(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
     owner_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
+    # Bumped in the same transaction as every change to the board, its columns, cards or members.
+    version = Column(BigInteger, nullable=False, server_default="0")
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
     owner = relationship("User", back_populates="owned_boards")
     members = relationship("BoardMember", back_populates="board", cascade="all, delete-orphan")
-    board_columns = relationship("BoardColumn", back_populates="board", cascade="all, delete-orphan", order_by="BoardColumn.position")
+    board_columns = relationship("BoardColumn", back_populates="board", cascade="all, delete-orphan", order_by="BoardColumn.rank")
 
 
 class BoardMember(Base):
@@ -41,7 +60,10 @@ class BoardMember(Base):
     role = Column(String(20), nullable=False)
     invited_at = Column(DateTime, server_default=func.now())
 
-    __table_args__ = (UniqueConstraint("board_id", "user_id"),)
+    __table_args__ = (
+        UniqueConstraint("board_id", "user_id"),
+        Index("ix_board_members_user_id_board_id", "user_id", "board_id"),
+    )
 
     board = relationship("Board", back_populates="members")
     user = relationship("User", back_populates="memberships")
@@ -53,11 +75,13 @@ class BoardColumn(Base):
     id = Column(Integer, primary_key=True, index=True)
     board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"))
     title = Column(String(255), nullable=False)
-    position = Column(Integer, nullable=False, default=0)
+    rank = Column(RankType, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
 
+    __table_args__ = (Index("ix_board_columns_board_id_rank", "board_id", "rank"),)
+
     board = relationship("Board", back_populates="board_columns")
-    cards = relationship("Card", back_populates="column", cascade="all, delete-orphan", order_by="Card.position")
+    cards = relationship("Card", back_populates="column", cascade="all, delete-orphan", order_by="Card.rank")
 
 
 class Card(Base):
@@ -67,10 +91,69 @@ class Card(Base):
     column_id = Column(Integer, ForeignKey("board_columns.id", ondelete="CASCADE"))
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    position = Column(Integer, nullable=False, default=0)
-    assigned_to = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    rank = Column(RankType, nullable=False)
+    assigned_to = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     created_by = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
+    __table_args__ = (Index("ix_cards_column_id_rank", "column_id", "rank"),)
+
     column = relationship("BoardColumn", back_populates="cards")
+
+
+class BoardEvent(Base):
+    """Append-only log of a board's broadcast events; ``seq`` is the board version it produced."""
+
+    __tablename__ = "board_events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    board_id = Column(Integer, ForeignKey("boards.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(BigInteger, nullable=False)
+    type = Column(String(50), nullable=False)
+    # The encoded WebSocket message, replayed verbatim.
+    message = Column(Text, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    __table_args__ = (UniqueConstraint("board_id", "seq"),)
+
+
+# --- Card search index ---
+# Dialect-specific DDL kept out of the mapped columns: a generated tsvector column with a GIN
+# index on Postgres, an external-content FTS5 table kept in step by triggers on SQLite. The
+# database maintains it on every write, including batches, imports and cascades.
+# Migration 0006 creates the same objects.
+
+CARD_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE cards ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED",
+        "CREATE INDEX ix_cards_search_vector ON cards USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE cards_fts USING fts5("
+        "title, description, content='cards', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER cards_fts_insert AFTER INSERT ON cards BEGIN "
+        "INSERT INTO cards_fts (rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER cards_fts_delete AFTER DELETE ON cards BEGIN "
+        "INSERT INTO cards_fts (cards_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER cards_fts_update AFTER UPDATE OF title, description ON cards BEGIN "
+        "INSERT INTO cards_fts (cards_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO cards_fts (rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    ],
+}
+
+
+def is_search_object(name: Optional[str]) -> bool:
+    """Whether a reflected table, column or index belongs to the search index above."""
+    return bool(name) and (name == "search_vector" or name.startswith(("cards_fts", "ix_cards_search_vector")))
+
+
+for dialect, statements in CARD_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Card.__table__, "after_create", DDL(statement).execute_if(dialect=dialect))
+# Dropping cards takes the triggers and Postgres column with it, but not the FTS table.
+event.listen(Card.__table__, "after_drop", DDL("DROP TABLE IF EXISTS cards_fts").execute_if(dialect="sqlite"))
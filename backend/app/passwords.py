@@ -0,0 +1,116 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.metrics import registry
+
+T = TypeVar("T")
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", 4))
+PASSWORD_MAX_PENDING = int(os.getenv("PASSWORD_MAX_PENDING", 64))
+PASSWORD_RETRY_AFTER = int(os.getenv("PASSWORD_RETRY_AFTER", 2))
+
+PASSWORD_JOBS = registry.counter("taskboard_password_jobs_total", "bcrypt hashes and verifications by outcome.", ("outcome",))
+PASSWORD_PENDING = registry.gauge("taskboard_password_pending", "bcrypt jobs queued or running.")
+PASSWORD_QUEUE_DEPTH = registry.gauge("taskboard_password_queue_depth", "bcrypt jobs waiting for a worker thread.")
+
+# Changing BCRYPT_ROUNDS marks existing hashes for update; login rehashes them transparently.
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+class PasswordPool:
+    """Size-limited executor for bcrypt work.
+
+    bcrypt holds a CPU for the whole hash, so it gets its own threads instead of the shared
+    request threadpool. At most ``max_pending`` jobs may be queued or running; beyond that
+    callers get a 503 with ``Retry-After`` rather than waiting in an unbounded queue.
+    """
+
+    def __init__(self, workers: int = PASSWORD_WORKERS, max_pending: int = PASSWORD_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Jobs waiting for a worker thread."""
+        return max(0, self.pending - self.workers)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+        }
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            PASSWORD_JOBS.inc(outcome="rejected")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins in progress, please retry shortly",
+                headers={"Retry-After": str(PASSWORD_RETRY_AFTER)},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password")
+        self.pending += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            PASSWORD_JOBS.inc(outcome="cancelled")
+            raise
+        except Exception:
+            self.failed += 1
+            PASSWORD_JOBS.inc(outcome="failed")
+            raise
+        finally:
+            self.pending -= 1
+        self.completed += 1
+        PASSWORD_JOBS.inc(outcome="completed")
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+        """Verify a password; also returns a fresh hash when the stored one uses outdated settings."""
+        return await self.run(pwd_context.verify_and_update, plain_password, hashed_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_pool = PasswordPool()
+
+
+@registry.on_collect
+def _collect_password_pool():
+    PASSWORD_PENDING.set(password_pool.pending)
+    PASSWORD_QUEUE_DEPTH.set(password_pool.queue_depth)
@@ -0,0 +1,96 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+from app import models
+from app.metrics import registry
+
+AUTH_FAILURES = registry.counter(
+    "taskboard_auth_failures_total", "Rejected logins, tokens and board access, by reason.", ("reason",)
+)
+
+PRINCIPAL_CACHE_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", 60))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 10_000))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller, detached from any database session."""
+
+    id: int
+    email: str
+    display_name: str
+
+    @classmethod
+    def from_user(cls, user: models.User) -> "Principal":
+        return cls(id=user.id, email=user.email, display_name=user.display_name)
+
+
+@dataclass
+class _Entry:
+    expires_at: float
+    user: Optional[Principal] = None
+    roles: dict[int, str] = field(default_factory=dict)
+
+
+class PrincipalCache:
+    """TTL + LRU cache of users and their board roles, keyed by user id.
+
+    Routes invalidate entries when they change membership in this process. Other workers
+    pick the change up once their entry expires, so keep the TTL short.
+    """
+
+    def __init__(self, max_entries: int = PRINCIPAL_CACHE_SIZE, ttl: float = PRINCIPAL_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+
+    def _get(self, user_id: int) -> Optional[_Entry]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def _get_or_create(self, user_id: int) -> _Entry:
+        entry = self._get(user_id)
+        if entry is None:
+            entry = _Entry(expires_at=time.monotonic() + self.ttl)
+            self._entries[user_id] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def get_user(self, user_id: int) -> Optional[Principal]:
+        entry = self._get(user_id)
+        return entry.user if entry else None
+
+    def put_user(self, principal: Principal):
+        self._get_or_create(principal.id).user = principal
+
+    def get_role(self, user_id: int, board_id: int) -> Optional[str]:
+        entry = self._get(user_id)
+        return entry.roles.get(board_id) if entry else None
+
+    def put_role(self, user_id: int, board_id: int, role: str):
+        self._get_or_create(user_id).roles[board_id] = role
+
+    def invalidate_role(self, user_id: int, board_id: int):
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            entry.roles.pop(board_id, None)
+
+    def invalidate_board(self, board_id: int):
+        for entry in self._entries.values():
+            entry.roles.pop(board_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+principal_cache = PrincipalCache()
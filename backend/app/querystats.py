@@ -0,0 +1,136 @@
+"""Per-request SQL accounting: statement count, database time and the slowest statement.
+
+``instrument_queries`` times every statement an engine runs and charges it to the request
+being served, found through a context variable, so the async engine, the sync engine and
+background work inside a request all count. ``QueryStatsMiddleware`` opens the tally,
+records it on ``/metrics`` per route and, with ``DEBUG_QUERY_HEADERS`` on, returns it in
+``X-DB-*`` response headers. Statements slower than ``SLOW_QUERY_MS`` are logged.
+"""
+
+import contextvars
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import registry, route_label
+
+logger = logging.getLogger(__name__)
+
+DEBUG_QUERY_HEADERS = os.getenv("DEBUG_QUERY_HEADERS", "false").lower() in ("1", "true", "yes", "on")
+SLOW_QUERY_SECONDS = float(os.getenv("SLOW_QUERY_MS", 500)) / 1000
+# Long statements are cut to this many characters in headers and logs.
+STATEMENT_PREVIEW_LENGTH = 200
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 6, 8, 10, 15, 20, 30, 50, 100)
+
+REQUEST_QUERIES = registry.histogram(
+    "taskboard_http_db_queries", "SQL statements per request, by route.", ("method", "route"), QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = registry.histogram(
+    "taskboard_http_db_seconds", "Time spent in SQL statements per request, by route.", ("method", "route")
+)
+REQUEST_SLOWEST_SECONDS = registry.histogram(
+    "taskboard_http_db_slowest_query_seconds", "The slowest SQL statement of each request, by route.", ("method", "route")
+)
+SLOW_QUERIES = registry.counter("taskboard_db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS.")
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: Optional[str] = None
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if seconds >= self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+
+_current: contextvars.ContextVar[Optional[QueryStats]] = contextvars.ContextVar("query_stats", default=None)
+
+
+def preview(statement: str) -> str:
+    text = " ".join(statement.split())
+    if len(text) > STATEMENT_PREVIEW_LENGTH:
+        text = text[: STATEMENT_PREVIEW_LENGTH - 3] + "..."
+    return text
+
+
+def instrument_queries(sync_engine: Engine) -> Engine:
+    """Time each statement on ``sync_engine`` and charge it to the current request, if any."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("query_started")
+        if not started:
+            return
+        seconds = time.perf_counter() - started.pop()
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if seconds >= SLOW_QUERY_SECONDS:
+            SLOW_QUERIES.inc()
+            logger.warning("Slow query (%.1f ms): %s", seconds * 1000, preview(statement))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def on_error(exception_context):
+        # A failed statement never reaches after_cursor_execute.
+        started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+        if started:
+            started.pop()
+
+    return sync_engine
+
+
+class QueryStatsMiddleware:
+    """Tallies SQL per HTTP request; see the module docstring."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start" and DEBUG_QUERY_HEADERS:
+                message["headers"] = list(message.get("headers", [])) + self._headers(stats)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _current.reset(token)
+            labels = {"method": scope["method"], "route": route_label(scope)}
+            REQUEST_QUERIES.observe(stats.count, **labels)
+            REQUEST_DB_SECONDS.observe(stats.seconds, **labels)
+            if stats.count:
+                REQUEST_SLOWEST_SECONDS.observe(stats.slowest_seconds, **labels)
+
+    @staticmethod
+    def _headers(stats: QueryStats) -> list[tuple[bytes, bytes]]:
+        headers = [
+            (b"x-db-queries", str(stats.count).encode()),
+            (b"x-db-time-ms", f"{stats.seconds * 1000:.2f}".encode()),
+        ]
+        if stats.slowest_statement is not None:
+            headers.append((b"x-db-slowest-ms", f"{stats.slowest_seconds * 1000:.2f}".encode()))
+            headers.append((b"x-db-slowest-statement", preview(stats.slowest_statement).encode("latin-1", "replace")))
+        return headers
@@ -0,0 +1,153 @@
+"""Fractional-index rank keys for ordering cards and columns.
+
+A rank is a string that sorts (bytewise) between its neighbours, so moving an item only
+rewrites that item's rank. Keys are an "integer" part whose first character encodes its
+length (``a0``, ``a1``, ... ``b10`` ...) followed by an optional base-62 fraction; appends
+bump the integer part and inserts between two keys extend the fraction.
+"""
+
+from typing import Optional
+
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+BASE = len(DIGITS)
+SMALLEST_INTEGER = "A" + "0" * 26
+
+
+def _integer_length(head: str) -> int:
+    if "a" <= head <= "z":
+        return ord(head) - ord("a") + 2
+    if "A" <= head <= "Z":
+        return ord("Z") - ord(head) + 2
+    raise ValueError(f"Invalid rank head: {head!r}")
+
+
+def _integer_part(key: str) -> str:
+    length = _integer_length(key[0])
+    if length > len(key):
+        raise ValueError(f"Invalid rank: {key!r}")
+    return key[:length]
+
+
+def validate(key: str):
+    if key == SMALLEST_INTEGER:
+        raise ValueError(f"Invalid rank: {key!r}")
+    fraction = key[len(_integer_part(key)):]
+    if fraction.endswith("0"):
+        raise ValueError(f"Invalid rank: {key!r}")
+
+
+def _increment_integer(x: str) -> Optional[str]:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) + 1
+        if value < BASE:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = "0"
+    if head == "Z":
+        return "a0"
+    if head == "z":
+        return None
+    head = chr(ord(head) + 1)
+    if head > "a":
+        digits.append("0")
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _decrement_integer(x: str) -> Optional[str]:
+    head, digits = x[0], list(x[1:])
+    for i in reversed(range(len(digits))):
+        value = DIGITS.index(digits[i]) - 1
+        if value >= 0:
+            digits[i] = DIGITS[value]
+            return head + "".join(digits)
+        digits[i] = DIGITS[-1]
+    if head == "a":
+        return "Z" + DIGITS[-1]
+    if head == "A":
+        return None
+    head = chr(ord(head) - 1)
+    if head < "Z":
+        digits.append(DIGITS[-1])
+    else:
+        digits.pop()
+    return head + "".join(digits)
+
+
+def _midpoint(a: str, b: Optional[str]) -> str:
+    """A fraction strictly between fractions ``a`` and ``b`` (``None`` means +infinity)."""
+    if b is not None:
+        n = 0
+        while (a[n] if n < len(a) else "0") == b[n]:
+            n += 1
+        if n > 0:
+            return b[:n] + _midpoint(a[n:], b[n:])
+    digit_a = DIGITS.index(a[0]) if a else 0
+    digit_b = DIGITS.index(b[0]) if b is not None else BASE
+    if digit_b - digit_a > 1:
+        return DIGITS[(digit_a + digit_b + 1) // 2]
+    if b is not None and len(b) > 1:
+        return b[0]
+    return DIGITS[digit_a] + _midpoint(a[1:], None)
+
+
+def key_between(a: Optional[str], b: Optional[str]) -> str:
+    """A rank that sorts after ``a`` and before ``b``; ``None`` means unbounded on that side."""
+    if a is not None:
+        validate(a)
+    if b is not None:
+        validate(b)
+    if a is not None and b is not None and a >= b:
+        raise ValueError(f"Ranks out of order: {a!r} >= {b!r}")
+
+    if a is None:
+        if b is None:
+            return "a0"
+        integer_b = _integer_part(b)
+        if integer_b == SMALLEST_INTEGER:
+            return integer_b + _midpoint("", b[len(integer_b):])
+        if integer_b < b:
+            return integer_b
+        decremented = _decrement_integer(integer_b)
+        if decremented is None:
+            raise ValueError("Cannot decrement rank any further")
+        return decremented
+
+    integer_a = _integer_part(a)
+    fraction_a = a[len(integer_a):]
+    if b is None:
+        incremented = _increment_integer(integer_a)
+        return integer_a + _midpoint(fraction_a, None) if incremented is None else incremented
+
+    integer_b = _integer_part(b)
+    if integer_a == integer_b:
+        return integer_a + _midpoint(fraction_a, b[len(integer_b):])
+    incremented = _increment_integer(integer_a)
+    if incremented is None:
+        raise ValueError("Cannot increment rank any further")
+    if incremented < b:
+        return incremented
+    return integer_a + _midpoint(fraction_a, None)
+
+
+def keys_between(a: Optional[str], b: Optional[str], n: int) -> list[str]:
+    """``n`` ascending ranks between ``a`` and ``b``, spread as evenly as the keys allow."""
+    if n <= 0:
+        return []
+    if n == 1:
+        return [key_between(a, b)]
+    if b is None:
+        keys = [key_between(a, None)]
+        for _ in range(n - 1):
+            keys.append(key_between(keys[-1], None))
+        return keys
+    if a is None:
+        keys = [key_between(None, b)]
+        for _ in range(n - 1):
+            keys.append(key_between(None, keys[-1]))
+        return list(reversed(keys))
+    middle = n // 2
+    pivot = key_between(a, b)
+    return keys_between(a, pivot, middle) + [pivot] + keys_between(pivot, b, n - middle - 1)
@@ -1,119 +1,279 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Literal, Optional, Union
+
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
 from app.auth import get_current_user
-from app.database import get_db
+from app.database import get_async_db
+from app.principals import Principal, principal_cache
+from app.services.batch import apply_card_batch
 from app.services.boards import (
-    build_board_detail,
+    BOARD_PAGE_SIZE,
+    CARD_PAGE_SIZE,
+    MAX_BOARD_PAGE_SIZE,
+    MAX_CARD_PAGE_SIZE,
+    board_etag,
+    build_board_summary,
+    etag_matches,
     get_board_or_404,
-    get_membership,
+    get_board_snapshot,
+    get_role,
+    list_user_boards,
     require_role,
     to_member_output,
 )
+from app.services.events import changes_since, record_event
+from app.services.ranks import needs_rebalance, rebalance_in_background
+from app.services.search import MAX_SEARCH_PAGE_SIZE, SEARCH_PAGE_SIZE, search_cards
+from app.services.transfer import export_board, import_board
+from app.snapshots import snapshot_cache
+from app.tickets import BOARD_TICKET_TTL, issue_ticket, ticket_revocations
+from app.ws import manager
 
 router = APIRouter(prefix="/boards", tags=["Boards"])
 
 
 @router.post("/", response_model=schemas.BoardOut)
-def create_board(
+async def create_board(
     board: schemas.BoardCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
     new_board = models.Board(title=board.title, owner_id=current_user.id)
     db.add(new_board)
-    db.flush()
+    await db.flush()
 
     owner_membership = models.BoardMember(board_id=new_board.id, user_id=current_user.id, role="owner")
     db.add(owner_membership)
 
-    db.commit()
-    db.refresh(new_board)
+    await db.commit()
+    await db.refresh(new_board)
+    principal_cache.put_role(current_user.id, new_board.id, "owner")
     return new_board
 
 
-@router.get("/", response_model=list[schemas.BoardOut])
-def list_boards(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    return (
-        db.query(models.Board)
-        .join(models.BoardMember, models.BoardMember.board_id == models.Board.id)
-        .filter(models.BoardMember.user_id == current_user.id)
-        .order_by(models.Board.created_at.desc())
-        .all()
+@router.post("/import", response_model=schemas.BoardImportResult)
+async def import_board_stream(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    result = await import_board(db, current_user.id, request.stream())
+    await db.commit()
+    principal_cache.put_role(current_user.id, result.board.id, "owner")
+    return result
+
+
+@router.get("/", response_model=list[schemas.BoardListItem])
+async def list_boards(
+    request: Request,
+    response: Response,
+    after: Optional[str] = Query(None, description="Cursor from the previous page's `Link: rel=\"next\"`"),
+    limit: int = Query(BOARD_PAGE_SIZE, ge=1, le=MAX_BOARD_PAGE_SIZE),
+    title: Optional[str] = Query(None, description="Only boards whose title starts with this, ignoring case"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    boards, next_cursor = await list_user_boards(db, current_user.id, after, limit, title)
+    if next_cursor is not None:
+        response.headers["Link"] = f'<{request.url.include_query_params(after=next_cursor)}>; rel="next"'
+    return boards
+
+
+@router.get("/{board_id}", response_model=Union[schemas.BoardDetail, schemas.BoardSummary])
+async def get_board(
+    board_id: int,
+    view: Literal["full", "summary"] = Query("full"),
+    limit: int = Query(CARD_PAGE_SIZE, ge=1, le=MAX_CARD_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    await get_role(db, board_id, current_user.id)
+    version = await db.scalar(select(models.Board.version).where(models.Board.id == board_id))
+    if version is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+
+    # Clients revalidate every time; an unchanged board costs one indexed lookup and no body.
+    variant = f".summary.{limit}" if view == "summary" else ""
+    headers = {"ETag": board_etag(board_id, version, variant), "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    if view == "summary":
+        summary = await build_board_summary(db, board_id, limit)
+        headers["ETag"] = board_etag(board_id, summary.version, variant)
+        return Response(content=summary.model_dump_json(), media_type="application/json", headers=headers)
+
+    version, body = await get_board_snapshot(db, board_id, version)
+    headers["ETag"] = board_etag(board_id, version)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/{board_id}/search", response_model=list[schemas.SearchHit])
+async def search_board(
+    board_id: int,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(SEARCH_PAGE_SIZE, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    await get_role(db, board_id, current_user.id)
+    return await search_cards(db, board_id, q, limit)
+
+
+@router.get("/{board_id}/changes", response_model=schemas.BoardChanges)
+async def get_board_changes(
+    board_id: int,
+    since: int = Query(..., ge=0, description="Board version the client already has"),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    await get_role(db, board_id, current_user.id)
+    version, messages = await changes_since(db, board_id, since)
+    if messages is None:
+        version, body = await get_board_snapshot(db, board_id, version)
+        content = f'{{"version":{version},"events":null,"snapshot":{body.decode()}}}'
+    else:
+        content = f'{{"version":{version},"events":[{",".join(messages)}],"snapshot":null}}'
+    return Response(content=content, media_type="application/json")
+
+
+@router.get("/{board_id}/export")
+async def export_board_stream(
+    board_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    await require_role(db, board_id, current_user.id, ["owner", "editor", "viewer"])
+    return StreamingResponse(
+        export_board(board_id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="board-{board_id}.ndjson"'},
     )
 
 
-@router.get("/{board_id}", response_model=schemas.BoardDetail)
-def get_board(board_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    get_membership(db, board_id, current_user.id)
-    board = get_board_or_404(db, board_id)
-    return build_board_detail(board)
+@router.post("/{board_id}/batch", response_model=schemas.CardBatchResult)
+async def apply_batch(
+    board_id: int,
+    batch: schemas.CardBatch,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    await require_role(db, board_id, current_user.id, ["owner", "editor"])
+
+    changes = await apply_card_batch(db, board_id, current_user.id, batch.operations)
+    version, message = await record_event(db, board_id, "cards_batch", changes)
+    await db.commit()
+    for column_id in {card.column_id for card in changes.cards if needs_rebalance(card.rank)}:
+        background_tasks.add_task(rebalance_in_background, models.Card, models.Card.column_id, column_id, board_id)
+
+    manager.broadcast(board_id, message)
+    return schemas.CardBatchResult(version=version, **changes.model_dump())
 
 
 @router.put("/{board_id}", response_model=schemas.BoardOut)
-def update_board(
+async def update_board(
     board_id: int,
     update: schemas.BoardUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    require_role(db, board_id, current_user.id, ["owner"])
-    board = db.query(models.Board).filter(models.Board.id == board_id).first()
+    await require_role(db, board_id, current_user.id, ["owner"])
+    board = await db.get(models.Board, board_id)
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
     board.title = update.title
-    db.commit()
-    db.refresh(board)
+    _, message = await record_event(db, board_id, "board_updated", schemas.BoardOut.model_validate(board))
+    await db.commit()
+    await db.refresh(board)
+
+    manager.broadcast(board_id, message)
     return board
 
 
 @router.delete("/{board_id}")
-def delete_board(board_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    require_role(db, board_id, current_user.id, ["owner"])
-    board = db.query(models.Board).filter(models.Board.id == board_id).first()
+async def delete_board(
+    board_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)
+):
+    await require_role(db, board_id, current_user.id, ["owner"])
+    board = await db.get(models.Board, board_id)
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
 
-    db.delete(board)
-    db.commit()
+    await db.execute(delete(models.BoardEvent).where(models.BoardEvent.board_id == board_id))
+    await db.delete(board)
+    await db.commit()
+    principal_cache.invalidate_board(board_id)
+    snapshot_cache.invalidate_board(board_id)
+    ticket_revocations.revoke(board_id)
     return {"detail": "Board deleted"}
 
 
 @router.post("/{board_id}/invite", response_model=schemas.BoardMemberOut)
-def invite_member(
+async def invite_member(
     board_id: int,
     invite: schemas.InviteRequest,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    require_role(db, board_id, current_user.id, ["owner"])
+    await require_role(db, board_id, current_user.id, ["owner"])
 
     if invite.role not in ("editor", "viewer"):
         raise HTTPException(status_code=400, detail="Role must be 'editor' or 'viewer'")
 
-    user = db.query(models.User).filter(models.User.email == invite.email).first()
+    user = await db.scalar(select(models.User).where(models.User.email == invite.email))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    existing = (
-        db.query(models.BoardMember)
-        .filter(models.BoardMember.board_id == board_id, models.BoardMember.user_id == user.id)
-        .first()
+    existing = await db.scalar(
+        select(models.BoardMember).where(
+            models.BoardMember.board_id == board_id,
+            models.BoardMember.user_id == user.id,
+        )
     )
     if existing:
         raise HTTPException(status_code=400, detail="User is already a member")
 
     member = models.BoardMember(board_id=board_id, user_id=user.id, role=invite.role)
     db.add(member)
-    db.commit()
-    db.refresh(member)
-    return schemas.BoardMemberOut(user_id=user.id, role=invite.role, display_name=user.display_name)
+    member_out = schemas.BoardMemberOut(user_id=user.id, role=invite.role, display_name=user.display_name)
+    _, message = await record_event(db, board_id, "member_added", member_out)
+    await db.commit()
+    principal_cache.invalidate_role(user.id, board_id)
+
+    manager.broadcast(board_id, message)
+    return member_out
+
+
+@router.post("/{board_id}/ticket", response_model=schemas.BoardTicketOut)
+async def create_board_ticket(
+    board_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)
+):
+    """Sign a short-lived ticket for opening this board's WebSocket without a database check."""
+    role = await get_role(db, board_id, current_user.id)
+    ticket, _ = issue_ticket(current_user.id, board_id, role)
+    return schemas.BoardTicketOut(ticket=ticket, role=role, expires_in=BOARD_TICKET_TTL)
 
 
 @router.get("/{board_id}/members", response_model=list[schemas.BoardMemberOut])
-def list_members(board_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    get_membership(db, board_id, current_user.id)
-    board = get_board_or_404(db, board_id)
+async def list_members(
+    board_id: int, db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)
+):
+    await get_role(db, board_id, current_user.id)
+    board = await get_board_or_404(db, board_id)
     return [to_member_output(member) for member in board.members]
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
 from app.auth import get_current_user
-from app.database import get_db
-from app.services.boards import require_role
+from app.database import get_async_db
+from app.principals import Principal
+from app.services import cards as card_service
+from app.services.moves import move_coalescer
+from app.services.ranks import needs_rebalance, rebalance_in_background
 from app.ws import manager
 
 router = APIRouter(prefix="/boards/{board_id}/cards", tags=["Cards"])
@@ -14,39 +17,16 @@ router = APIRouter(prefix="/boards/{board_id}/cards", tags=["Cards"])
 async def create_card(
     board_id: int,
     card: schemas.CardCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    require_role(db, board_id, current_user.id, ["owner", "editor"])
+    new_card, message = await card_service.create_card(db, board_id, current_user.id, card)
+    await db.commit()
+    if needs_rebalance(new_card.rank):
+        background_tasks.add_task(rebalance_in_background, models.Card, models.Card.column_id, new_card.column_id, board_id)
 
-    column = (
-        db.query(models.BoardColumn)
-        .filter(models.BoardColumn.id == card.column_id, models.BoardColumn.board_id == board_id)
-        .first()
-    )
-    if not column:
-        raise HTTPException(status_code=404, detail="Column not found")
-
-    max_position = db.query(models.Card).filter(models.Card.column_id == card.column_id).count()
-
-    new_card = models.Card(
-        column_id=card.column_id,
-        title=card.title,
-        description=card.description,
-        position=max_position,
-        created_by=current_user.id,
-    )
-    db.add(new_card)
-    db.commit()
-    db.refresh(new_card)
-
-    await manager.broadcast(
-        board_id,
-        {
-            "type": "card_created",
-            "data": schemas.CardOut.model_validate(new_card).model_dump(),
-        },
-    )
+    manager.broadcast(board_id, message)
     return new_card
 
 
@@ -55,38 +35,13 @@ async def update_card(
     board_id: int,
     card_id: int,
     update: schemas.CardUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    require_role(db, board_id, current_user.id, ["owner", "editor"])
-
-    card = db.query(models.Card).filter(models.Card.id == card_id).first()
-    if not card:
-        raise HTTPException(status_code=404, detail="Card not found")
-
-    column = (
-        db.query(models.BoardColumn)
-        .filter(models.BoardColumn.id == card.column_id, models.BoardColumn.board_id == board_id)
-        .first()
-    )
-    if not column:
-        raise HTTPException(status_code=404, detail="Card not found in this board")
-
-    if update.title is not None:
-        card.title = update.title
-    if update.description is not None:
-        card.description = update.description
-
-    db.commit()
-    db.refresh(card)
+    card, message = await card_service.update_card(db, board_id, current_user.id, card_id, update)
+    await db.commit()
 
-    await manager.broadcast(
-        board_id,
-        {
-            "type": "card_updated",
-            "data": schemas.CardOut.model_validate(card).model_dump(),
-        },
-    )
+    manager.broadcast(board_id, message)
     return card
 
 
@@ -95,41 +50,17 @@ async def move_card(
     board_id: int,
     card_id: int,
     move: schemas.CardMove,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    require_role(db, board_id, current_user.id, ["owner", "editor"])
+    await card_service.check_move(db, board_id, current_user.id, card_id, move.column_id)
 
-    card = db.query(models.Card).filter(models.Card.id == card_id).first()
-    if not card:
-        raise HTTPException(status_code=404, detail="Card not found")
-
-    target_column = (
-        db.query(models.BoardColumn)
-        .filter(models.BoardColumn.id == move.column_id, models.BoardColumn.board_id == board_id)
-        .first()
-    )
-    if not target_column:
-        raise HTTPException(status_code=404, detail="Target column not found")
-
-    old_column_id = card.column_id
-    card.column_id = move.column_id
-    card.position = move.position
-    db.commit()
-    db.refresh(card)
-
-    await manager.broadcast(
-        board_id,
-        {
-            "type": "card_moved",
-            "data": {
-                "card_id": card.id,
-                "from_column": old_column_id,
-                "to_column": move.column_id,
-                "position": move.position,
-            },
-        },
-    )
+    # The coalescer writes in its own session; don't hold this connection through its window.
+    await db.close()
+    card = await move_coalescer.move(board_id, card_id, move.column_id, move.position)
+    if needs_rebalance(card.rank):
+        background_tasks.add_task(rebalance_in_background, models.Card, models.Card.column_id, card.column_id, board_id)
     return card
 
 
@@ -137,31 +68,11 @@ async def move_card(
 async def delete_card(
     board_id: int,
     card_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    require_role(db, board_id, current_user.id, ["owner", "editor"])
-
-    card = db.query(models.Card).filter(models.Card.id == card_id).first()
-    if not card:
-        raise HTTPException(status_code=404, detail="Card not found")
-
-    column = (
-        db.query(models.BoardColumn)
-        .filter(models.BoardColumn.id == card.column_id, models.BoardColumn.board_id == board_id)
-        .first()
-    )
-    if not column:
-        raise HTTPException(status_code=404, detail="Card not found in this board")
-
-    db.delete(card)
-    db.commit()
+    message = await card_service.delete_card(db, board_id, current_user.id, card_id)
+    await db.commit()
 
-    await manager.broadcast(
-        board_id,
-        {
-            "type": "card_deleted",
-            "data": {"card_id": card_id},
-        },
-    )
+    manager.broadcast(board_id, message)
     return {"detail": "Card deleted"}
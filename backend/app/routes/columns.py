@@ -1,10 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
 from app.auth import get_current_user
-from app.database import get_db
-from app.services.boards import require_role
+from app.database import get_async_db
+from app.principals import Principal
+from app.services import columns as column_service
+from app.services.boards import (
+    CARD_PAGE_SIZE,
+    MAX_CARD_PAGE_SIZE,
+    get_role,
+    list_column_cards,
+    require_role,
+)
+from app.services.cards import get_board_column
+from app.services.ranks import needs_rebalance, rebalance_in_background
 from app.ws import manager
 
 router = APIRouter(prefix="/boards/{board_id}/columns", tags=["Columns"])
@@ -14,61 +26,53 @@ router = APIRouter(prefix="/boards/{board_id}/columns", tags=["Columns"])
 async def create_column(
     board_id: int,
     column: schemas.ColumnCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    require_role(db, board_id, current_user.id, ["owner", "editor"])
-
-    max_position = db.query(models.BoardColumn).filter(models.BoardColumn.board_id == board_id).count()
-
-    new_column = models.BoardColumn(board_id=board_id, title=column.title, position=max_position)
-    db.add(new_column)
-    db.commit()
-    db.refresh(new_column)
-
-    await manager.broadcast(
-        board_id,
-        {
-            "type": "column_created",
-            "data": {"id": new_column.id, "title": new_column.title, "position": new_column.position},
-        },
-    )
+    await require_role(db, board_id, current_user.id, ["owner", "editor"])
+
+    new_column, message = await column_service.create_column(db, board_id, column)
+    await db.commit()
+    if needs_rebalance(new_column.rank):
+        background_tasks.add_task(rebalance_in_background, models.BoardColumn, models.BoardColumn.board_id, board_id, board_id)
+
+    manager.broadcast(board_id, message)
     return new_column
 
 
+@router.get("/{column_id}/cards", response_model=schemas.CardPage)
+async def list_cards(
+    board_id: int,
+    column_id: int,
+    after: Optional[str] = Query(None, description="The previous page's `next` cursor"),
+    limit: int = Query(CARD_PAGE_SIZE, ge=1, le=MAX_CARD_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
+):
+    await get_role(db, board_id, current_user.id)
+
+    await get_board_column(db, board_id, column_id)
+    return await list_column_cards(db, column_id, after, limit)
+
+
 @router.put("/{column_id}", response_model=schemas.ColumnOut)
 async def update_column(
     board_id: int,
     column_id: int,
     update: schemas.ColumnUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    require_role(db, board_id, current_user.id, ["owner", "editor"])
-
-    column = (
-        db.query(models.BoardColumn)
-        .filter(models.BoardColumn.id == column_id, models.BoardColumn.board_id == board_id)
-        .first()
-    )
-    if not column:
-        raise HTTPException(status_code=404, detail="Column not found")
-
-    if update.title is not None:
-        column.title = update.title
-    if update.position is not None:
-        column.position = update.position
-
-    db.commit()
-    db.refresh(column)
-
-    await manager.broadcast(
-        board_id,
-        {
-            "type": "column_updated",
-            "data": {"id": column.id, "title": column.title, "position": column.position},
-        },
-    )
+    await require_role(db, board_id, current_user.id, ["owner", "editor"])
+
+    column, message = await column_service.update_column(db, board_id, column_id, update)
+    await db.commit()
+    if needs_rebalance(column.rank):
+        background_tasks.add_task(rebalance_in_background, models.BoardColumn, models.BoardColumn.board_id, board_id, board_id)
+
+    manager.broadcast(board_id, message)
     return column
 
 
@@ -76,27 +80,13 @@ async def update_column(
 async def delete_column(
     board_id: int,
     column_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user),
 ):
-    require_role(db, board_id, current_user.id, ["owner", "editor"])
-
-    column = (
-        db.query(models.BoardColumn)
-        .filter(models.BoardColumn.id == column_id, models.BoardColumn.board_id == board_id)
-        .first()
-    )
-    if not column:
-        raise HTTPException(status_code=404, detail="Column not found")
-
-    db.delete(column)
-    db.commit()
-
-    await manager.broadcast(
-        board_id,
-        {
-            "type": "column_deleted",
-            "data": {"column_id": column_id},
-        },
-    )
+    await require_role(db, board_id, current_user.id, ["owner", "editor"])
+
+    message = await column_service.delete_column(db, board_id, column_id)
+    await db.commit()
+
+    manager.broadcast(board_id, message)
     return {"detail": "Column deleted"}
@@ -0,0 +1,11 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.metrics import CONTENT_TYPE, render
+
+router = APIRouter(tags=["Metrics"])
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def read_metrics():
+    return PlainTextResponse(render(), media_type=CONTENT_TYPE)
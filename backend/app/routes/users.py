@@ -1,25 +1,26 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models, schemas
-from app.auth import hash_password
-from app.database import get_db
+from app.database import get_async_db
+from app.passwords import password_pool
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=schemas.UserOut)
-def register_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == user.email).first()
+async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing = await db.scalar(select(models.User).where(models.User.email == user.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     new_user = models.User(
         email=user.email,
-        hashed_password=hash_password(user.password),
+        hashed_password=await password_pool.hash(user.password),
         display_name=user.display_name,
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
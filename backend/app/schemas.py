@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Literal, Optional, Union
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 # --- Users ---
 
@@ -33,6 +33,14 @@ class BoardUpdate(BaseModel):
     title: str
 
 
+class BoardTicketOut(BaseModel):
+    """Pass as ``/ws/{board_id}?ticket=...`` within ``expires_in`` seconds."""
+
+    ticket: str
+    role: str
+    expires_in: int
+
+
 class BoardMemberOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     user_id: int
@@ -53,6 +61,7 @@ class ColumnCreate(BaseModel):
 
 class ColumnUpdate(BaseModel):
     title: Optional[str] = None
+    # Target index among the board's columns.
     position: Optional[int] = None
 
 
@@ -60,7 +69,7 @@ class ColumnOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
     id: int
     title: str
-    position: int
+    rank: str
 
 
 # --- Cards ---
@@ -78,6 +87,7 @@ class CardUpdate(BaseModel):
 
 class CardMove(BaseModel):
     column_id: int
+    # Target index in the destination column.
     position: int
 
 
@@ -87,11 +97,52 @@ class CardOut(BaseModel):
     column_id: int
     title: str
     description: Optional[str] = None
-    position: int
+    rank: str
     assigned_to: Optional[int] = None
     created_by: Optional[int] = None
 
 
+# --- Card batches ---
+
+MAX_BATCH_OPERATIONS = 1000
+
+
+class BatchCreate(CardCreate):
+    op: Literal["create"]
+
+
+class BatchUpdate(CardUpdate):
+    op: Literal["update"]
+    card_id: int
+
+
+class BatchMove(CardMove):
+    op: Literal["move"]
+    card_id: int
+
+
+class BatchDelete(BaseModel):
+    op: Literal["delete"]
+    card_id: int
+
+
+BatchOperation = Annotated[Union[BatchCreate, BatchUpdate, BatchMove, BatchDelete], Field(discriminator="op")]
+
+
+class CardBatch(BaseModel):
+    operations: list[BatchOperation] = Field(min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
+
+# Final state of every card the batch created, updated or moved, plus the ids it deleted.
+class CardBatchChanges(BaseModel):
+    cards: list[CardOut] = []
+    deleted: list[int] = []
+
+
+class CardBatchResult(CardBatchChanges):
+    version: int
+
+
 class ColumnWithCards(ColumnOut):
     cards: list[CardOut] = []
 
@@ -104,6 +155,118 @@ class BoardOut(BaseModel):
     created_at: Optional[datetime] = None
 
 
+class BoardListItem(BoardOut):
+    card_count: int = 0
+    member_count: int = 0
+
+
 class BoardDetail(BoardOut):
+    version: int = 0
     columns: list[ColumnWithCards] = []
     members: list[BoardMemberOut] = []
+
+
+# A page of a column's cards in rank order; pass ``next`` back as ``after`` for the next page.
+class CardPage(BaseModel):
+    cards: list[CardOut] = []
+    next: Optional[str] = None
+
+
+class ColumnSummary(ColumnWithCards):
+    card_count: int = 0
+    next: Optional[str] = None
+
+
+# ``GET /boards/{id}?view=summary``: every column's card count and only its first page of cards.
+class BoardSummary(BoardOut):
+    version: int = 0
+    columns: list[ColumnSummary] = []
+    members: list[BoardMemberOut] = []
+
+
+# Events after the client's version, or the whole board when they can't be replayed.
+class BoardChanges(BaseModel):
+    version: int
+    events: Optional[list[dict]] = None
+    snapshot: Optional[BoardDetail] = None
+
+
+# --- Board export/import ---
+# One NDJSON record per line: the board, then its columns, then their cards. Column ids are
+# the exporting database's and only link cards to their column within the file.
+
+EXPORT_FORMAT = 1
+
+
+class ExportBoard(BaseModel):
+    type: Literal["board"]
+    format: Literal[1] = EXPORT_FORMAT
+    title: str
+
+
+class ExportColumn(BaseModel):
+    type: Literal["column"]
+    id: int
+    title: str
+    rank: str
+
+
+class ExportCard(BaseModel):
+    type: Literal["card"]
+    column_id: int
+    title: str
+    description: Optional[str] = None
+    rank: str
+    # Matched to an existing user by email on import; unknown emails leave the card unassigned.
+    assignee: Optional[str] = None
+
+
+ExportRecord = Annotated[Union[ExportBoard, ExportColumn, ExportCard], Field(discriminator="type")]
+
+
+class BoardImportResult(BaseModel):
+    board: BoardOut
+    columns: int
+    cards: int
+
+
+# --- Search ---
+
+class SearchHit(BaseModel):
+    card: CardOut
+    # Higher is a better match; only comparable within one response.
+    score: float
+    # HTML-escaped, with matched terms wrapped in <mark>.
+    title: str
+    snippet: Optional[str] = None
+
+
+# --- WebSocket actions ---
+# Clients send {"id": ..., "action": ..., "data": {...}} on the board socket and get back
+# {"type": "ack", "id": ..., "ok": true, "data": ...} or {"type": "ack", "id": ..., "ok": false,
+# "status": ..., "detail": ...}.
+
+class SocketRequest(BaseModel):
+    id: Union[int, str]
+    action: str
+    data: dict = {}
+
+
+class CardRef(BaseModel):
+    card_id: int
+
+
+class SocketCardUpdate(CardUpdate, CardRef):
+    pass
+
+
+class SocketCardMove(CardMove, CardRef):
+    pass
+
+
+class ColumnRef(BaseModel):
+    column_id: int
+
+
+class SocketColumnUpdate(ColumnUpdate, ColumnRef):
+    pass
@@ -0,0 +1,53 @@
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import engine
+from app.passwords import hash_password
+from app.ranking import keys_between
+
+DEMO_EMAIL = "demo@taskboard.dev"
+DEMO_PASSWORD = "demo1234"
+
+
+def seed_demo_data(bind: Engine = None):
+    """Create the demo user and board unless they already exist."""
+    db = Session(bind or engine)
+    try:
+        existing = db.scalar(select(models.User).where(models.User.email == DEMO_EMAIL))
+        if existing:
+            return
+
+        user = models.User(email=DEMO_EMAIL, hashed_password=hash_password(DEMO_PASSWORD), display_name="Demo User")
+        db.add(user)
+        db.flush()
+
+        board = models.Board(title="Weekend Plans", owner_id=user.id)
+        db.add(board)
+        db.flush()
+
+        member = models.BoardMember(board_id=board.id, user_id=user.id, role="owner")
+        db.add(member)
+
+        column_ranks = keys_between(None, None, 3)
+        cols = [
+            models.BoardColumn(board_id=board.id, title="To Do", rank=column_ranks[0]),
+            models.BoardColumn(board_id=board.id, title="In Progress", rank=column_ranks[1]),
+            models.BoardColumn(board_id=board.id, title="Done", rank=column_ranks[2]),
+        ]
+        db.add_all(cols)
+        db.flush()
+
+        card_ranks = keys_between(None, None, 3)
+        cards = [
+            models.Card(column_id=cols[0].id, title="Make coffee", description="The good beans, not the instant stuff", rank=card_ranks[0], created_by=user.id),
+            models.Card(column_id=cols[0].id, title="Go for a run", description="At least 3km, no excuses", rank=card_ranks[1], created_by=user.id),
+            models.Card(column_id=cols[0].id, title="Call mom", rank=card_ranks[2], created_by=user.id),
+            models.Card(column_id=cols[1].id, title="Grocery shopping", description="Milk, eggs, and way too many snacks", rank=card_ranks[0], created_by=user.id),
+            models.Card(column_id=cols[2].id, title="Clean the apartment", rank=card_ranks[0], created_by=user.id),
+        ]
+        db.add_all(cards)
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,118 @@
+from bisect import bisect_left, insort
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.ranking import key_between
+
+
+class ColumnOrder:
+    """A column's cards as sorted (rank, id) pairs, kept in memory while a batch reorders it."""
+
+    def __init__(self, rows: list[tuple[str, int]]):
+        self.entries = sorted(rows)
+
+    def remove(self, rank: str, card_id: int):
+        index = bisect_left(self.entries, (rank, card_id))
+        del self.entries[index]
+
+    def insert(self, position: Optional[int], card_id: int) -> str:
+        """Rank for ``card_id`` at index ``position`` (``None`` appends), recorded in the order."""
+        position = len(self.entries) if position is None else max(0, min(position, len(self.entries)))
+        before = self.entries[position - 1][0] if position > 0 else None
+        after = self.entries[position][0] if position < len(self.entries) else None
+        if before is not None and before == after:
+            raise HTTPException(status_code=409, detail="Column ordering is being rebalanced, retry the batch")
+        rank = key_between(before, after)
+        insort(self.entries, (rank, card_id))
+        return rank
+
+
+async def apply_card_batch(
+    db: AsyncSession, board_id: int, user_id: int, operations: list[schemas.BatchOperation]
+) -> schemas.CardBatchChanges:
+    """Apply ``operations`` in order inside the caller's transaction; any failure rejects the lot.
+
+    Reads every referenced card, column and column ordering up front, so the cost in queries
+    does not grow with the number of operations.
+    """
+    card_ids = {op.card_id for op in operations if op.op != "create"}
+    cards: dict[int, models.Card] = {}
+    if card_ids:
+        result = await db.scalars(
+            select(models.Card)
+            .join(models.BoardColumn, models.BoardColumn.id == models.Card.column_id)
+            .where(models.Card.id.in_(card_ids), models.BoardColumn.board_id == board_id)
+        )
+        cards = {card.id: card for card in result}
+
+    target_columns = {op.column_id for op in operations if op.op in ("create", "move")}
+    board_columns = set()
+    if target_columns:
+        board_columns = set(
+            await db.scalars(
+                select(models.BoardColumn.id).where(
+                    models.BoardColumn.id.in_(target_columns),
+                    models.BoardColumn.board_id == board_id,
+                )
+            )
+        )
+
+    # Moves need the order of the columns they leave as well as the ones they enter.
+    sources = {cards[op.card_id].column_id for op in operations if op.op == "move" and op.card_id in cards}
+    rows_by_column: dict[int, list[tuple[str, int]]] = {column_id: [] for column_id in board_columns | sources}
+    if rows_by_column:
+        rows = await db.execute(
+            select(models.Card.column_id, models.Card.rank, models.Card.id).where(models.Card.column_id.in_(rows_by_column))
+        )
+        for column_id, rank, card_id in rows:
+            rows_by_column[column_id].append((rank, card_id))
+    orders = {column_id: ColumnOrder(rows) for column_id, rows in rows_by_column.items()}
+
+    touched: dict[int, models.Card] = {}
+    created: list[models.Card] = []
+    deleted: list[int] = []
+    for index, op in enumerate(operations):
+        if op.op in ("create", "move") and op.column_id not in board_columns:
+            raise HTTPException(status_code=404, detail=f"Operation {index}: Column not found")
+        if op.op != "create" and op.card_id not in cards:
+            raise HTTPException(status_code=404, detail=f"Operation {index}: Card not found")
+
+        if op.op == "create":
+            card = models.Card(
+                column_id=op.column_id,
+                title=op.title,
+                description=op.description,
+                rank=orders[op.column_id].insert(None, -len(created) - 1),
+                assigned_to=None,
+                created_by=user_id,
+            )
+            db.add(card)
+            created.append(card)
+        elif op.op == "update":
+            card = cards[op.card_id]
+            if op.title is not None:
+                card.title = op.title
+            if op.description is not None:
+                card.description = op.description
+            touched[card.id] = card
+        elif op.op == "move":
+            card = cards[op.card_id]
+            orders[card.column_id].remove(card.rank, card.id)
+            card.rank = orders[op.column_id].insert(op.position, card.id)
+            card.column_id = op.column_id
+            touched[card.id] = card
+        else:
+            card = cards.pop(op.card_id)
+            if card.column_id in orders:
+                orders[card.column_id].remove(card.rank, card.id)
+            touched.pop(card.id, None)
+            await db.delete(card)
+            deleted.append(card.id)
+
+    await db.flush()
+    changed = list(touched.values()) + created
+    return schemas.CardBatchChanges(cards=[schemas.CardOut.model_validate(card) for card in changed], deleted=deleted)
@@ -1,36 +1,106 @@
+from datetime import datetime
+from typing import Optional, Sequence
+
 from fastapi import HTTPException
-from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import func, literal, select, true, tuple_, union_all, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased, selectinload
 
 from app import models, schemas
+from app.principals import AUTH_FAILURES, principal_cache
+from app.snapshots import snapshot_cache
 
+# Boards per page of the caller's board list.
+BOARD_PAGE_SIZE = 100
+MAX_BOARD_PAGE_SIZE = 500
+# Cards per page of a column, and per column in a board summary.
+CARD_PAGE_SIZE = 50
+MAX_CARD_PAGE_SIZE = 500
 
-def get_membership(db: Session, board_id: int, user_id: int) -> models.BoardMember:
-    membership = (
-        db.query(models.BoardMember)
-        .filter(models.BoardMember.board_id == board_id, models.BoardMember.user_id == user_id)
-        .first()
-    )
-    if not membership:
-        raise HTTPException(status_code=403, detail="Not a member of this board")
-    return membership
 
+EDITOR_ROLES = ("owner", "editor")
 
-def require_role(db: Session, board_id: int, user_id: int, allowed_roles: list[str]) -> models.BoardMember:
-    membership = get_membership(db, board_id, user_id)
-    if membership.role not in allowed_roles:
+
+def check_role(role: Optional[str], allowed_roles: Optional[Sequence[str]] = None) -> str:
+    """Raise the board's 403s for a membership role already looked up; ``None`` is no membership."""
+    if role is None:
+        AUTH_FAILURES.inc(reason="not_member")
+        raise HTTPException(status_code=403, detail="Not a member of this board")
+    if allowed_roles is not None and role not in allowed_roles:
+        AUTH_FAILURES.inc(reason="insufficient_role")
         raise HTTPException(status_code=403, detail="Insufficient permissions")
-    return membership
+    return role
+
+
+async def get_role(db: AsyncSession, board_id: int, user_id: int) -> str:
+    role = principal_cache.get_role(user_id, board_id)
+    if role is None:
+        role = check_role(
+            await db.scalar(
+                select(models.BoardMember.role).where(
+                    models.BoardMember.board_id == board_id,
+                    models.BoardMember.user_id == user_id,
+                )
+            )
+        )
+        principal_cache.put_role(user_id, board_id, role)
+    return role
+
+
+async def require_role(db: AsyncSession, board_id: int, user_id: int, allowed_roles: Sequence[str]) -> str:
+    return check_role(await get_role(db, board_id, user_id), allowed_roles)
+
+
+async def bump_version(db: AsyncSession, board_id: int) -> int:
+    """Advance the board's version in the caller's transaction; call it just before commit.
+
+    The UPDATE also row-locks the board, so concurrent writers commit versions in order.
+    """
+    version = await db.scalar(
+        update(models.Board)
+        .where(models.Board.id == board_id)
+        .values(version=models.Board.version + 1)
+        .returning(models.Board.version)
+    )
+    if version is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+    return version
+
+
+def board_etag(board_id: int, version: int, variant: str = "") -> str:
+    return f'"{board_id}.{version}{variant}"'
 
 
-def get_board_or_404(db: Session, board_id: int) -> models.Board:
-    board = (
-        db.query(models.Board)
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def get_board_snapshot(db: AsyncSession, board_id: int, version: int) -> tuple[int, bytes]:
+    """Serialized ``BoardDetail`` for the board, from the cache when ``version`` is current.
+
+    Returns the version the body was built at, which is newer than ``version`` if the board
+    changed in between.
+    """
+    body = snapshot_cache.get(board_id, version)
+    if body is not None:
+        return version, body
+    board = await get_board_or_404(db, board_id)
+    body = build_board_detail(board).model_dump_json().encode()
+    snapshot_cache.put(board_id, board.version, body)
+    return board.version, body
+
+
+async def get_board_or_404(db: AsyncSession, board_id: int) -> models.Board:
+    board = await db.scalar(
+        select(models.Board)
         .options(
             selectinload(models.Board.board_columns).selectinload(models.BoardColumn.cards),
             selectinload(models.Board.members).selectinload(models.BoardMember.user),
         )
-        .filter(models.Board.id == board_id)
-        .first()
+        .where(models.Board.id == board_id)
     )
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
@@ -50,7 +120,7 @@ def build_board_detail(board: models.Board) -> schemas.BoardDetail:
         schemas.ColumnWithCards(
             id=column.id,
             title=column.title,
-            position=column.position,
+            rank=column.rank,
             cards=[schemas.CardOut.model_validate(card) for card in column.cards],
         )
         for column in board.board_columns
@@ -63,6 +133,185 @@ def build_board_detail(board: models.Board) -> schemas.BoardDetail:
         title=board.title,
         owner_id=board.owner_id,
         created_at=board.created_at,
+        version=board.version,
         columns=columns,
         members=members,
     )
+
+
+def encode_board_cursor(board: models.Board) -> str:
+    return f"{board.created_at.isoformat()}.{board.id}"
+
+
+def decode_board_cursor(cursor: str) -> tuple[datetime, int]:
+    created_at, _, board_id = cursor.rpartition(".")
+    try:
+        return datetime.fromisoformat(created_at), int(board_id)
+    except ValueError:
+        raise HTTPException(status_code=422, detail="Invalid cursor") from None
+
+
+async def list_user_boards(
+    db: AsyncSession, user_id: int, after: Optional[str], limit: int, title_prefix: Optional[str] = None
+) -> tuple[list[schemas.BoardListItem], Optional[str]]:
+    """A page of the user's boards, newest first by keyset on (created_at, id), with each
+    board's card and member counts from the same query. Returns the page and the next cursor."""
+    card_count = (
+        select(func.count(models.Card.id))
+        .join(models.BoardColumn, models.BoardColumn.id == models.Card.column_id)
+        .where(models.BoardColumn.board_id == models.Board.id)
+        .correlate(models.Board)
+        .scalar_subquery()
+    )
+    member = aliased(models.BoardMember)
+    member_count = (
+        select(func.count(member.id)).where(member.board_id == models.Board.id).correlate(models.Board).scalar_subquery()
+    )
+    query = (
+        select(models.Board, card_count, member_count)
+        .join(models.BoardMember, models.BoardMember.board_id == models.Board.id)
+        .where(models.BoardMember.user_id == user_id)
+        .order_by(models.Board.created_at.desc(), models.Board.id.desc())
+        .limit(limit + 1)
+    )
+    if title_prefix:
+        query = query.where(models.Board.title.istartswith(title_prefix, autoescape=True))
+    if after is not None:
+        created_at, board_id = decode_board_cursor(after)
+        # Compare with the cursor board's stored timestamp while it exists: a round trip through
+        # Python can change its text form (SQLite) or precision and skip or repeat boards.
+        cursor_board = aliased(models.Board)
+        stored = select(cursor_board.created_at).where(cursor_board.id == board_id).scalar_subquery()
+        query = query.where(
+            tuple_(models.Board.created_at, models.Board.id) < tuple_(func.coalesce(stored, literal(created_at)), board_id)
+        )
+
+    rows = (await db.execute(query)).all()
+    boards = [
+        schemas.BoardListItem(
+            id=board.id,
+            title=board.title,
+            owner_id=board.owner_id,
+            created_at=board.created_at,
+            card_count=cards,
+            member_count=members,
+        )
+        for board, cards, members in rows[:limit]
+    ]
+    return boards, encode_board_cursor(rows[limit - 1][0]) if len(rows) > limit else None
+
+
+def encode_card_cursor(card: models.Card) -> str:
+    return f"{card.rank}.{card.id}"
+
+
+def decode_card_cursor(cursor: str) -> tuple[str, int]:
+    # Ranks never contain ".", and the id breaks ties between equal ranks.
+    rank, _, card_id = cursor.rpartition(".")
+    if not rank or not card_id.isdigit():
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    return rank, int(card_id)
+
+
+def _card_page(cards: list[models.Card], limit: int) -> tuple[list[schemas.CardOut], Optional[str]]:
+    """Cards and next cursor, given up to ``limit + 1`` cards in order."""
+    page = [schemas.CardOut.model_validate(card) for card in cards[:limit]]
+    return page, encode_card_cursor(cards[limit - 1]) if len(cards) > limit else None
+
+
+async def list_column_cards(db: AsyncSession, column_id: int, after: Optional[str], limit: int) -> schemas.CardPage:
+    """A page of the column's cards by keyset on (rank, id), which the column's rank index serves."""
+    query = (
+        select(models.Card)
+        .where(models.Card.column_id == column_id)
+        .order_by(models.Card.rank, models.Card.id)
+        .limit(limit + 1)
+    )
+    if after is not None:
+        query = query.where(tuple_(models.Card.rank, models.Card.id) > tuple_(*decode_card_cursor(after)))
+    cards, next_cursor = _card_page((await db.scalars(query)).all(), limit)
+    return schemas.CardPage(cards=cards, next=next_cursor)
+
+
+def _first_card_ids(db: AsyncSession, board_id: int, column_ids: list[int], limit: int):
+    """Ids of each column's first ``limit`` cards, each read as a range of the column's rank index."""
+
+    def first(column_id):
+        return (
+            select(models.Card.id)
+            .where(models.Card.column_id == column_id)
+            .order_by(models.Card.rank, models.Card.id)
+            .limit(limit)
+        )
+
+    if db.bind.dialect.name == "postgresql":
+        page = first(models.BoardColumn.id).lateral()
+        return select(page.c.id).select_from(models.BoardColumn).join(page, true()).where(models.BoardColumn.board_id == board_id)
+    # No LATERAL in SQLite: one limited branch per column instead.
+    pages = [first(column_id).subquery() for column_id in column_ids]
+    return union_all(*(select(page.c.id) for page in pages))
+
+
+async def build_board_summary(db: AsyncSession, board_id: int, limit: int) -> schemas.BoardSummary:
+    """The board with every column's card count and first ``limit`` cards, in four queries.
+
+    Neither the counts nor the pages read more card rows than they return, so a summary costs
+    the same however long the columns get.
+    """
+    board = await db.scalar(
+        select(models.Board)
+        .options(selectinload(models.Board.members).selectinload(models.BoardMember.user))
+        .where(models.Board.id == board_id)
+    )
+    if not board:
+        raise HTTPException(status_code=404, detail="Board not found")
+    columns = (
+        await db.scalars(
+            select(models.BoardColumn).where(models.BoardColumn.board_id == board_id).order_by(models.BoardColumn.rank)
+        )
+    ).all()
+
+    cards: dict[int, list[models.Card]] = {}
+    counts: dict[int, int] = {}
+    if columns:
+        column_ids = [column.id for column in columns]
+        counts = dict(
+            (
+                await db.execute(
+                    select(models.Card.column_id, func.count())
+                    .where(models.Card.column_id.in_(column_ids))
+                    .group_by(models.Card.column_id)
+                )
+            ).all()
+        )
+        first_pages = await db.scalars(
+            select(models.Card)
+            .where(models.Card.id.in_(_first_card_ids(db, board_id, column_ids, limit + 1)))
+            .order_by(models.Card.column_id, models.Card.rank, models.Card.id)
+        )
+        for card in first_pages:
+            cards.setdefault(card.column_id, []).append(card)
+
+    summaries = []
+    for column in columns:
+        page, next_cursor = _card_page(cards.get(column.id, []), limit)
+        summaries.append(
+            schemas.ColumnSummary(
+                id=column.id,
+                title=column.title,
+                rank=column.rank,
+                cards=page,
+                card_count=counts.get(column.id, 0),
+                next=next_cursor,
+            )
+        )
+
+    return schemas.BoardSummary(
+        id=board.id,
+        title=board.title,
+        owner_id=board.owner_id,
+        created_at=board.created_at,
+        version=board.version,
+        columns=summaries,
+        members=[to_member_output(member) for member in board.members],
+    )
@@ -0,0 +1,130 @@
+from fastapi import HTTPException
+from sqlalchemy import Select, and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app import models, schemas
+from app.principals import principal_cache
+from app.ranking import key_between
+from app.services.boards import EDITOR_ROLES, check_role
+from app.services.events import record_event
+from app.services.ranks import last_rank
+
+# Card mutations shared by the REST routes and WebSocket actions. Each runs in the caller's
+# transaction and returns the encoded event to broadcast once the caller commits. The
+# permission check is folded into the first query: the caller's membership is the row the
+# card and columns are outer-joined to, so a mutation costs one read before its write.
+
+
+async def get_board_column(db: AsyncSession, board_id: int, column_id: int, detail: str = "Column not found") -> models.BoardColumn:
+    column = await db.scalar(
+        select(models.BoardColumn).where(
+            models.BoardColumn.id == column_id,
+            models.BoardColumn.board_id == board_id,
+        )
+    )
+    if not column:
+        raise HTTPException(status_code=404, detail=detail)
+    return column
+
+
+def _membership(board_id: int, user_id: int, *columns) -> Select:
+    return (
+        select(models.BoardMember.role, *columns)
+        .select_from(models.BoardMember)
+        .where(models.BoardMember.board_id == board_id, models.BoardMember.user_id == user_id)
+    )
+
+
+def _on_board(column, board_id: int, column_id):
+    return and_(column.id == column_id, column.board_id == board_id)
+
+
+async def _authorized(db: AsyncSession, board_id: int, user_id: int, statement: Select) -> tuple:
+    """Run a ``_membership`` query; raise the usual 403s and return the joined values."""
+    row = (await db.execute(statement)).first()
+    role, *values = row if row else (None,)
+    check_role(role, EDITOR_ROLES)
+    principal_cache.put_role(user_id, board_id, role)
+    return tuple(values)
+
+
+async def get_editable_card(db: AsyncSession, board_id: int, user_id: int, card_id: int) -> models.Card:
+    """Load a card on the board, checking the caller may edit it, in one query."""
+    card, column_id = await _authorized(
+        db,
+        board_id,
+        user_id,
+        _membership(board_id, user_id, models.Card, models.BoardColumn.id)
+        .outerjoin(models.Card, models.Card.id == card_id)
+        .outerjoin(models.BoardColumn, _on_board(models.BoardColumn, board_id, models.Card.column_id)),
+    )
+    if card is None or column_id is None:
+        raise HTTPException(status_code=404, detail="Card not found")
+    return card
+
+
+async def create_card(db: AsyncSession, board_id: int, user_id: int, card: schemas.CardCreate) -> tuple[models.Card, str]:
+    (column_id,) = await _authorized(
+        db,
+        board_id,
+        user_id,
+        _membership(board_id, user_id, models.BoardColumn.id).outerjoin(
+            models.BoardColumn, _on_board(models.BoardColumn, board_id, card.column_id)
+        ),
+    )
+    if column_id is None:
+        raise HTTPException(status_code=404, detail="Column not found")
+    rank = key_between(await last_rank(db, models.Card, models.Card.column_id == card.column_id), None)
+
+    new_card = models.Card(
+        column_id=card.column_id,
+        title=card.title,
+        description=card.description,
+        rank=rank,
+        created_by=user_id,
+    )
+    db.add(new_card)
+    # The INSERT returns the server defaults; no refresh needed.
+    await db.flush()
+    _, message = await record_event(db, board_id, "card_created", schemas.CardOut.model_validate(new_card))
+    return new_card, message
+
+
+async def update_card(
+    db: AsyncSession, board_id: int, user_id: int, card_id: int, update: schemas.CardUpdate
+) -> tuple[models.Card, str]:
+    card = await get_editable_card(db, board_id, user_id, card_id)
+    if update.title is not None:
+        card.title = update.title
+    if update.description is not None:
+        card.description = update.description
+
+    _, message = await record_event(db, board_id, "card_updated", schemas.CardOut.model_validate(card))
+    return card, message
+
+
+async def check_move(db: AsyncSession, board_id: int, user_id: int, card_id: int, column_id: int):
+    """Validate a move before it is handed to the move coalescer: the caller may edit the
+    board, and both the card's column and the target column are on it."""
+    current, target = aliased(models.BoardColumn), aliased(models.BoardColumn)
+    current_id, target_id = await _authorized(
+        db,
+        board_id,
+        user_id,
+        _membership(board_id, user_id, current.id, target.id)
+        .outerjoin(models.Card, models.Card.id == card_id)
+        .outerjoin(current, _on_board(current, board_id, models.Card.column_id))
+        .outerjoin(target, _on_board(target, board_id, column_id)),
+    )
+    if current_id is None:
+        raise HTTPException(status_code=404, detail="Card not found")
+    if target_id is None:
+        raise HTTPException(status_code=404, detail="Target column not found")
+
+
+async def delete_card(db: AsyncSession, board_id: int, user_id: int, card_id: int) -> str:
+    card = await get_editable_card(db, board_id, user_id, card_id)
+    await db.delete(card)
+    _, message = await record_event(db, board_id, "card_deleted", {"card_id": card_id})
+    return message
@@ -0,0 +1,42 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.ranking import key_between
+from app.services.cards import get_board_column
+from app.services.events import record_event
+from app.services.ranks import last_rank, rank_for_position
+
+# Column mutations shared by the REST routes and WebSocket actions; see services/cards.py.
+
+
+async def create_column(db: AsyncSession, board_id: int, column: schemas.ColumnCreate) -> tuple[models.BoardColumn, str]:
+    rank = key_between(await last_rank(db, models.BoardColumn, models.BoardColumn.board_id == board_id), None)
+
+    new_column = models.BoardColumn(board_id=board_id, title=column.title, rank=rank)
+    db.add(new_column)
+    await db.flush()
+    await db.refresh(new_column)
+    _, message = await record_event(db, board_id, "column_created", schemas.ColumnOut.model_validate(new_column))
+    return new_column, message
+
+
+async def update_column(
+    db: AsyncSession, board_id: int, column_id: int, update: schemas.ColumnUpdate
+) -> tuple[models.BoardColumn, str]:
+    column = await get_board_column(db, board_id, column_id)
+    if update.title is not None:
+        column.title = update.title
+    if update.position is not None:
+        column.rank = await rank_for_position(
+            db, models.BoardColumn, models.BoardColumn.board_id == board_id, update.position, exclude_id=column.id
+        )
+
+    _, message = await record_event(db, board_id, "column_updated", schemas.ColumnOut.model_validate(column))
+    return column, message
+
+
+async def delete_column(db: AsyncSession, board_id: int, column_id: int) -> str:
+    column = await get_board_column(db, board_id, column_id)
+    await db.delete(column)
+    _, message = await record_event(db, board_id, "column_deleted", {"column_id": column_id})
+    return message
@@ -0,0 +1,80 @@
+import os
+from typing import Any, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.services.boards import bump_version, get_board_snapshot
+from app.ws import encode_event
+
+# Events kept per board for /changes and WebSocket resume; clients further behind get a snapshot.
+BOARD_EVENT_RETENTION = int(os.getenv("BOARD_EVENT_RETENTION", 1000))
+# Past this many missed events a snapshot is cheaper than the replay.
+BOARD_CHANGES_LIMIT = int(os.getenv("BOARD_CHANGES_LIMIT", 500))
+# Trim the log once every this many events rather than on every write.
+COMPACT_EVERY = 100
+
+
+async def record_event(db: AsyncSession, board_id: int, event_type: str, data: Any) -> tuple[int, str]:
+    """Bump the board's version and append the event to its log, in the caller's transaction.
+
+    Returns the new version and the encoded event, carrying it as ``seq``, to broadcast once
+    the transaction commits.
+    """
+    seq = await bump_version(db, board_id)
+    message = encode_event(event_type, data, seq=seq)
+    db.add(models.BoardEvent(board_id=board_id, seq=seq, type=event_type, message=message))
+    if seq % COMPACT_EVERY == 0:
+        await db.execute(
+            delete(models.BoardEvent).where(
+                models.BoardEvent.board_id == board_id,
+                models.BoardEvent.seq <= seq - BOARD_EVENT_RETENTION,
+            )
+        )
+    return seq, message
+
+
+async def changes_since(db: AsyncSession, board_id: int, since: int) -> tuple[int, Optional[list[str]]]:
+    """The board's version and its encoded events after ``since``, oldest first.
+
+    The events are ``None`` when they can't be replayed: the log was compacted past
+    ``since``, too many were missed, or ``since`` is ahead of the board.
+    """
+    version = await db.scalar(select(models.Board.version).where(models.Board.id == board_id))
+    if version is None:
+        raise HTTPException(status_code=404, detail="Board not found")
+    if since == version:
+        return version, []
+    if since > version or version - since > BOARD_CHANGES_LIMIT:
+        return version, None
+
+    messages = (
+        await db.scalars(
+            select(models.BoardEvent.message)
+            .where(
+                models.BoardEvent.board_id == board_id,
+                models.BoardEvent.seq > since,
+                models.BoardEvent.seq <= version,
+            )
+            .order_by(models.BoardEvent.seq)
+        )
+    ).all()
+    if len(messages) != version - since:
+        return version, None
+    return version, list(messages)
+
+
+def encode_snapshot(version: int, body: bytes) -> str:
+    return f'{{"type":"board_snapshot","seq":{version},"data":{body.decode()}}}'
+
+
+async def replay_since(db: AsyncSession, board_id: int, since: int) -> list[str]:
+    """Messages that bring a client at version ``since`` up to date: the missed events, or a
+    single ``board_snapshot`` when they are no longer available."""
+    version, messages = await changes_since(db, board_id, since)
+    if messages is not None:
+        return messages
+    version, body = await get_board_snapshot(db, board_id, version)
+    return [encode_snapshot(version, body)]
@@ -0,0 +1,118 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.database import AsyncSessionLocal
+from app.metrics import registry
+from app.services.events import record_event
+from app.services.ranks import rank_for_position
+from app.ws import manager
+
+# Moves of the same card that arrive within this long of the first are collapsed into one
+# write and one card_moved event; 0 bypasses coalescing and writes every move on its own.
+MOVE_COALESCE_WINDOW = float(os.getenv("MOVE_COALESCE_WINDOW_MS", 20)) / 1000
+
+MOVES_RECEIVED = registry.counter("taskboard_card_moves_received_total", "Card move requests accepted for coalescing.")
+MOVES_APPLIED = registry.counter(
+    "taskboard_card_moves_applied_total", "Card moves written and broadcast after coalescing, by outcome.", ("outcome",)
+)
+
+
+async def apply_move(db: AsyncSession, board_id: int, card_id: int, column_id: int, position: int) -> tuple[models.Card, str]:
+    """Move the card in the caller's transaction; returns it and the encoded ``card_moved`` event."""
+    card = await db.get(models.Card, card_id)
+    if not card:
+        raise HTTPException(status_code=404, detail="Card not found")
+
+    old_column_id = card.column_id
+    card.rank = await rank_for_position(db, models.Card, models.Card.column_id == column_id, position, exclude_id=card.id)
+    card.column_id = column_id
+    _, message = await record_event(
+        db,
+        board_id,
+        "card_moved",
+        {
+            "card_id": card.id,
+            "from_column": old_column_id,
+            "to_column": column_id,
+            "position": position,
+            "rank": card.rank,
+        },
+    )
+    return card, message
+
+
+@dataclass
+class _PendingMove:
+    column_id: int
+    position: int
+    result: asyncio.Future
+    task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+
+class MoveCoalescer:
+    """Collapses bursts of moves of one card (a drag) into the last one.
+
+    The first move of a card opens a window; moves of the same card arriving before it closes
+    replace the target. When it closes the final target is written and broadcast once, and
+    every request in the burst gets the card's final state. A window that closes while the
+    card's previous write is still in flight waits for that commit, so writes land in the order
+    the moves arrived. Coalescing is per process; a window of 0 writes every move on its own.
+    """
+
+    def __init__(self, window: float = MOVE_COALESCE_WINDOW):
+        self.window = window
+        self._pending: dict[tuple[int, int], _PendingMove] = {}
+        # The latest window per card, kept until its write commits so the next one can wait on it.
+        self._latest: dict[tuple[int, int], asyncio.Task] = {}
+
+    async def move(self, board_id: int, card_id: int, column_id: int, position: int) -> schemas.CardOut:
+        MOVES_RECEIVED.inc()
+        key = (board_id, card_id)
+        if self.window <= 0 and key not in self._latest:
+            return await self._write(key, column_id, position)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = _PendingMove(column_id, position, asyncio.get_running_loop().create_future())
+            pending.task = asyncio.create_task(self._apply_after_window(key, self._latest.get(key)))
+            self._latest[key] = pending.task
+        else:
+            pending.column_id, pending.position = column_id, position
+        # One caller going away must not cancel the write the others are waiting on.
+        return await asyncio.shield(pending.result)
+
+    async def _apply_after_window(self, key: tuple[int, int], previous: Optional[asyncio.Task]):
+        try:
+            await asyncio.sleep(self.window)
+            if previous is not None:
+                await asyncio.wait([previous])
+            # Moves from here on open the next window, which waits for this write.
+            pending = self._pending.pop(key)
+            try:
+                pending.result.set_result(await self._write(key, pending.column_id, pending.position))
+            except Exception as exc:
+                pending.result.set_exception(exc)
+        finally:
+            if self._latest.get(key) is asyncio.current_task():
+                del self._latest[key]
+
+    async def _write(self, key: tuple[int, int], column_id: int, position: int) -> schemas.CardOut:
+        board_id, card_id = key
+        try:
+            async with AsyncSessionLocal() as db:
+                card, message = await apply_move(db, board_id, card_id, column_id, position)
+                await db.commit()
+        except Exception:
+            MOVES_APPLIED.inc(outcome="error")
+            raise
+        MOVES_APPLIED.inc(outcome="applied")
+        manager.broadcast(board_id, message)
+        return schemas.CardOut.model_validate(card)
+
+
+move_coalescer = MoveCoalescer()
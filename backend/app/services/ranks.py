@@ -0,0 +1,119 @@
+import logging
+import os
+from typing import Optional
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import AsyncSessionLocal
+from app.ranking import key_between, keys_between
+from app.services.events import record_event
+from app.ws import manager
+
+logger = logging.getLogger(__name__)
+
+# Keys longer than this trigger a background rebalance of their column (or board).
+RANK_REBALANCE_LENGTH = int(os.getenv("RANK_REBALANCE_LENGTH", 16))
+
+_rebalancing: set[tuple[str, int]] = set()
+
+RERANKED_EVENTS = {"cards": "cards_reranked", "board_columns": "columns_reranked"}
+
+
+async def last_rank(db: AsyncSession, model, scope) -> Optional[str]:
+    return await db.scalar(select(func.max(model.rank)).where(scope))
+
+
+async def rank_for_position(db: AsyncSession, model, scope, position: int, exclude_id: int = None) -> str:
+    """Rank that places an item at index ``position`` among the other items in ``scope``.
+
+    Reads at most two neighbouring ranks; the moved item is the only row that gets written.
+    """
+    if exclude_id is not None:
+        scope = scope & (model.id != exclude_id)
+    ordered = select(model.rank).where(scope).order_by(model.rank, model.id)
+
+    if position <= 0:
+        before, after = None, await db.scalar(ordered.limit(1))
+    else:
+        neighbours = (await db.scalars(ordered.offset(position - 1).limit(2))).all()
+        if neighbours:
+            before, after = neighbours[0], (neighbours[1] if len(neighbours) > 1 else None)
+        else:
+            before, after = await last_rank(db, model, scope), None
+
+    if before is not None and before == after:
+        # Concurrent writers produced a tie; spread the keys out and try again.
+        await rebalance_ranks(db, model, scope)
+        return await rank_for_position(db, model, scope, position)
+    return key_between(before, after)
+
+
+def needs_rebalance(rank: str) -> bool:
+    return len(rank) > RANK_REBALANCE_LENGTH
+
+
+async def rebalance_ranks(db: AsyncSession, model, scope) -> int:
+    """Rewrite every rank in ``scope`` to short, evenly spaced keys, keeping the order.
+
+    The rows are locked for the rewrite where the database supports it. Without row locks
+    (SQLite), a row moved or added between the read and the write holds a key relative to the
+    old ranks, so it is slotted back in among those and the scope is rewritten again.
+    Returns how many rows were rewritten.
+    """
+    table = model.__table__
+    rows = (
+        await db.execute(select(model.id, model.rank).where(scope).order_by(model.rank, model.id).with_for_update())
+    ).all()
+    current = dict(rows)
+    rewritten = set()
+    while True:
+        ranks = dict(zip([row_id for row_id, _ in rows], keys_between(None, None, len(rows))))
+        changed = [
+            {"row_id": row_id, "old_rank": current[row_id], "new_rank": rank}
+            for row_id, rank in ranks.items()
+            if current[row_id] != rank
+        ]
+        if changed:
+            await db.execute(
+                update(table)
+                .where(table.c.id == bindparam("row_id"), table.c.rank == bindparam("old_rank"))
+                .values(rank=bindparam("new_rank")),
+                changed,
+            )
+            rewritten.update(change["row_id"] for change in changed)
+        current = dict((await db.execute(select(model.id, model.rank).where(scope))).all())
+        strays = {row_id: rank for row_id, rank in current.items() if ranks.get(row_id) != rank}
+        if not strays:
+            return len(rewritten)
+        kept = [(row_id, rank) for row_id, rank in rows if row_id in current and row_id not in strays]
+        rows = sorted(kept + list(strays.items()), key=lambda row: (row[1], row[0]))
+
+
+async def rebalance_in_background(model, scope_column, scope_id: int, board_id: int):
+    """BackgroundTasks entry point: rebalance one column's cards or one board's columns."""
+    key = (model.__tablename__, scope_id)
+    if key in _rebalancing:
+        return
+    _rebalancing.add(key)
+    try:
+        async with AsyncSessionLocal() as db:
+            scope = scope_column == scope_id
+            rewritten = await rebalance_ranks(db, model, scope)
+            if not rewritten:
+                return
+            # Read back what committed alongside the rewrite, so clients get the final order.
+            ranks = (await db.execute(select(model.id, model.rank).where(scope).order_by(model.rank, model.id))).all()
+            _, message = await record_event(
+                db,
+                board_id,
+                RERANKED_EVENTS[model.__tablename__],
+                {scope_column.key: scope_id, "ranks": [[row_id, rank] for row_id, rank in ranks]},
+            )
+            await db.commit()
+        manager.broadcast(board_id, message)
+        logger.info("Rebalanced %s ranks in %s %s", rewritten, model.__tablename__, scope_id)
+    except Exception:
+        logger.exception("Rank rebalance failed for %s %s", model.__tablename__, scope_id)
+    finally:
+        _rebalancing.discard(key)
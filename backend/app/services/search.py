@@ -0,0 +1,85 @@
+import html
+import re
+
+from sqlalchemy import func, literal_column, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+
+SEARCH_PAGE_SIZE = 20
+MAX_SEARCH_PAGE_SIZE = 100
+
+# Marks the database puts around matches, swapped for <mark> once the text is escaped.
+_START, _STOP = "\x02", "\x03"
+_TERM = re.compile(r"\w+")
+
+_cards_fts = table("cards_fts")
+_fts = literal_column("cards_fts")
+_vector = literal_column("cards.search_vector")
+_english = literal_column("'english'::regconfig")
+
+
+def _highlight(text):
+    if not text:
+        return None
+    return html.escape(text, quote=False).replace(_START, "<mark>").replace(_STOP, "</mark>")
+
+
+def _postgres_query(board_id: int, terms: list[str], limit: int):
+    # plainto_tsquery ANDs every term and reads none as an operator ("or", "-"), like the FTS5 match.
+    query = func.plainto_tsquery(_english, " ".join(terms))
+    score = func.ts_rank_cd(_vector, query).label("score")
+    marks = f"StartSel={_START}, StopSel={_STOP}"
+    return (
+        select(
+            models.Card,
+            score,
+            func.ts_headline(_english, models.Card.title, query, f"{marks}, HighlightAll=true").label("title"),
+            func.ts_headline(
+                _english, models.Card.description, query, f"{marks}, MaxFragments=2, MaxWords=20, MinWords=5"
+            ).label("snippet"),
+        )
+        .join(models.BoardColumn, models.BoardColumn.id == models.Card.column_id)
+        .where(models.BoardColumn.board_id == board_id, _vector.op("@@")(query))
+        .order_by(score.desc(), models.Card.id)
+        .limit(limit)
+    )
+
+
+def _sqlite_query(board_id: int, terms: list[str], limit: int):
+    # Quoted terms are matched literally and ANDed; FTS5 query syntax in user input can't leak in.
+    match = " ".join(f'"{term}"' for term in terms)
+    # bm25 is lower for better matches; a title hit counts ten times a description hit.
+    score = (-func.bm25(_fts, 10.0, 1.0)).label("score")
+    return (
+        select(
+            models.Card,
+            score,
+            func.highlight(_fts, 0, _START, _STOP).label("title"),
+            func.snippet(_fts, 1, _START, _STOP, "…", 16).label("snippet"),
+        )
+        .select_from(_cards_fts)
+        .join(models.Card, models.Card.id == literal_column("cards_fts.rowid"))
+        .join(models.BoardColumn, models.BoardColumn.id == models.Card.column_id)
+        .where(_fts.op("MATCH")(match), models.BoardColumn.board_id == board_id)
+        .order_by(score.desc(), models.Card.id)
+        .limit(limit)
+    )
+
+
+async def search_cards(db: AsyncSession, board_id: int, q: str, limit: int) -> list[schemas.SearchHit]:
+    """The board's cards matching every word of ``q``, best first, from the search index."""
+    terms = _TERM.findall(q)
+    if not terms:
+        return []
+    build = _postgres_query if db.bind.dialect.name == "postgresql" else _sqlite_query
+    rows = await db.execute(build(board_id, terms, limit))
+    return [
+        schemas.SearchHit(
+            card=schemas.CardOut.model_validate(card),
+            score=score,
+            title=_highlight(title) or "",
+            snippet=_highlight(snippet),
+        )
+        for card, score, title, snippet in rows
+    ]
@@ -0,0 +1,190 @@
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, schemas
+from app.database import AsyncSessionLocal
+from app.metrics import registry
+from app.principals import AUTH_FAILURES
+from app.services import cards as card_service
+from app.services import columns as column_service
+from app.services.boards import EDITOR_ROLES
+from app.services.moves import move_coalescer
+from app.services.ranks import needs_rebalance, rebalance_in_background
+from app.ws import Connection, encode_json, manager
+
+logger = logging.getLogger(__name__)
+
+SOCKET_ACTIONS = registry.counter(
+    "taskboard_ws_actions_total", "Mutations received over board WebSockets, by action and status.", ("action", "status")
+)
+
+
+@dataclass
+class SocketContext:
+    """Who is on the other end of a board socket, as checked when it connected.
+
+    Actions reuse this instead of decoding a token and looking up the role per request.
+    """
+
+    board_id: int
+    user_id: int
+    role: str
+    connection: Connection
+
+
+def encode_ack(request_id: Union[int, str, None], data: Any) -> str:
+    if isinstance(data, BaseModel):
+        data = data.model_dump(mode="json")
+    return encode_json({"type": "ack", "id": request_id, "ok": True, "data": data})
+
+
+def encode_error(request_id: Union[int, str, None], status: int, detail: Any) -> str:
+    return encode_json({"type": "ack", "id": request_id, "ok": False, "status": status, "detail": detail})
+
+
+_background: set[asyncio.Task] = set()
+
+
+def _spawn(coroutine: Awaitable):
+    task = asyncio.ensure_future(coroutine)
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+def _rebalance_if_needed(model, scope_column, scope_id: int, rank: str, board_id: int):
+    if needs_rebalance(rank):
+        _spawn(rebalance_in_background(model, scope_column, scope_id, board_id))
+
+
+async def _create_card(db: AsyncSession, context: SocketContext, data: schemas.CardCreate):
+    card, message = await card_service.create_card(db, context.board_id, context.user_id, data)
+    await db.commit()
+    _rebalance_if_needed(models.Card, models.Card.column_id, card.column_id, card.rank, context.board_id)
+    manager.broadcast(context.board_id, message)
+    return schemas.CardOut.model_validate(card)
+
+
+async def _update_card(db: AsyncSession, context: SocketContext, data: schemas.SocketCardUpdate):
+    card, message = await card_service.update_card(db, context.board_id, context.user_id, data.card_id, data)
+    await db.commit()
+    manager.broadcast(context.board_id, message)
+    return schemas.CardOut.model_validate(card)
+
+
+async def _move_card(db: AsyncSession, context: SocketContext, data: schemas.SocketCardMove):
+    await card_service.check_move(db, context.board_id, context.user_id, data.card_id, data.column_id)
+    await db.close()
+    card = await move_coalescer.move(context.board_id, data.card_id, data.column_id, data.position)
+    _rebalance_if_needed(models.Card, models.Card.column_id, card.column_id, card.rank, context.board_id)
+    return card
+
+
+async def _delete_card(db: AsyncSession, context: SocketContext, data: schemas.CardRef):
+    message = await card_service.delete_card(db, context.board_id, context.user_id, data.card_id)
+    await db.commit()
+    manager.broadcast(context.board_id, message)
+    return {"card_id": data.card_id}
+
+
+async def _create_column(db: AsyncSession, context: SocketContext, data: schemas.ColumnCreate):
+    column, message = await column_service.create_column(db, context.board_id, data)
+    await db.commit()
+    _rebalance_if_needed(models.BoardColumn, models.BoardColumn.board_id, context.board_id, column.rank, context.board_id)
+    manager.broadcast(context.board_id, message)
+    return schemas.ColumnOut.model_validate(column)
+
+
+async def _update_column(db: AsyncSession, context: SocketContext, data: schemas.SocketColumnUpdate):
+    column, message = await column_service.update_column(db, context.board_id, data.column_id, data)
+    await db.commit()
+    _rebalance_if_needed(models.BoardColumn, models.BoardColumn.board_id, context.board_id, column.rank, context.board_id)
+    manager.broadcast(context.board_id, message)
+    return schemas.ColumnOut.model_validate(column)
+
+
+async def _delete_column(db: AsyncSession, context: SocketContext, data: schemas.ColumnRef):
+    message = await column_service.delete_column(db, context.board_id, data.column_id)
+    await db.commit()
+    manager.broadcast(context.board_id, message)
+    return {"column_id": data.column_id}
+
+
+Handler = Callable[[AsyncSession, SocketContext, Any], Awaitable[Any]]
+
+# action -> (payload schema, handler); every action needs an editor role.
+ACTIONS: dict[str, tuple[type[BaseModel], Handler]] = {
+    "card.create": (schemas.CardCreate, _create_card),
+    "card.update": (schemas.SocketCardUpdate, _update_card),
+    "card.move": (schemas.SocketCardMove, _move_card),
+    "card.delete": (schemas.CardRef, _delete_card),
+    "column.create": (schemas.ColumnCreate, _create_column),
+    "column.update": (schemas.SocketColumnUpdate, _update_column),
+    "column.delete": (schemas.ColumnRef, _delete_column),
+}
+
+
+async def _run(context: SocketContext, request: schemas.SocketRequest, payload: BaseModel, handler: Handler):
+    try:
+        async with AsyncSessionLocal() as db:
+            result = await handler(db, context, payload)
+    except HTTPException as exc:
+        SOCKET_ACTIONS.inc(action=request.action, status=str(exc.status_code))
+        context.connection.reply(encode_error(request.id, exc.status_code, exc.detail))
+        return
+    except Exception:
+        logger.exception("WebSocket action %s failed", request.action)
+        SOCKET_ACTIONS.inc(action=request.action, status="500")
+        context.connection.reply(encode_error(request.id, 500, "Internal server error"))
+        return
+    SOCKET_ACTIONS.inc(action=request.action, status="200")
+    context.connection.reply(encode_ack(request.id, result))
+
+
+async def handle_message(context: SocketContext, text: str):
+    """Apply one client action and queue its ack.
+
+    Actions run one at a time in arrival order, except moves, which run alongside later
+    messages so a drag's moves reach the coalescer together instead of one window apart.
+    Any message keeps the socket alive; ``{"type": "pong"}`` does only that.
+    """
+    context.connection.touch()
+    request_id: Optional[Union[int, str]] = None
+    try:
+        raw = json.loads(text)
+        if isinstance(raw, dict):
+            if raw.get("type") == "pong":
+                return
+            request_id = raw.get("id")
+        request = schemas.SocketRequest.model_validate(raw)
+    except (ValueError, ValidationError):
+        context.connection.reply(encode_error(request_id, 400, "Expected {\"id\", \"action\", \"data\"}"))
+        return
+
+    action = ACTIONS.get(request.action)
+    if action is None:
+        context.connection.reply(encode_error(request.id, 400, f"Unknown action: {request.action}"))
+        return
+    if context.role not in EDITOR_ROLES:
+        AUTH_FAILURES.inc(reason="insufficient_role")
+        SOCKET_ACTIONS.inc(action=request.action, status="403")
+        context.connection.reply(encode_error(request.id, 403, "Insufficient permissions"))
+        return
+    schema, handler = action
+    try:
+        payload = schema.model_validate(request.data)
+    except ValidationError as exc:
+        SOCKET_ACTIONS.inc(action=request.action, status="422")
+        context.connection.reply(encode_error(request.id, 422, exc.errors(include_url=False, include_context=False)))
+        return
+
+    if request.action == "card.move":
+        _spawn(_run(context, request, payload, handler))
+    else:
+        await _run(context, request, payload, handler)
@@ -0,0 +1,181 @@
+import os
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models, ranking, schemas
+from app.database import AsyncSessionLocal
+
+# Rows fetched per round trip when exporting and written per statement when importing.
+BOARD_TRANSFER_BATCH_SIZE = int(os.getenv("BOARD_TRANSFER_BATCH_SIZE", 1000))
+# A longer import line is rejected rather than buffered.
+MAX_IMPORT_LINE_BYTES = 1024 * 1024
+
+CARD_FIELDS = ("column_id", "title", "description", "rank", "assigned_to", "created_by")
+
+_record_type = TypeAdapter(schemas.ExportRecord)
+
+
+def _line(record: BaseModel) -> bytes:
+    return record.model_dump_json().encode() + b"\n"
+
+
+async def export_board(board_id: int) -> AsyncIterator[bytes]:
+    """The board as NDJSON, read through server-side cursors so memory stays flat with size.
+
+    Runs in its own session because the response streams after the request's session closes.
+    """
+    async with AsyncSessionLocal() as db:
+        if db.bind.dialect.name == "postgresql":
+            # Columns and cards come from one snapshot even while the board is being edited.
+            await db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        title = await db.scalar(select(models.Board.title).where(models.Board.id == board_id))
+        yield _line(schemas.ExportBoard(type="board", title=title))
+
+        columns = await db.stream(
+            select(models.BoardColumn.id, models.BoardColumn.title, models.BoardColumn.rank)
+            .where(models.BoardColumn.board_id == board_id)
+            .order_by(models.BoardColumn.rank)
+            .execution_options(yield_per=BOARD_TRANSFER_BATCH_SIZE)
+        )
+        async for rows in columns.partitions():
+            yield b"".join(
+                _line(schemas.ExportColumn(type="column", id=id, title=title, rank=rank)) for id, title, rank in rows
+            )
+
+        cards = await db.stream(
+            select(models.Card.column_id, models.Card.title, models.Card.description, models.Card.rank, models.User.email)
+            .join(models.BoardColumn, models.BoardColumn.id == models.Card.column_id)
+            .outerjoin(models.User, models.User.id == models.Card.assigned_to)
+            .where(models.BoardColumn.board_id == board_id)
+            .order_by(models.Card.column_id, models.Card.rank)
+            .execution_options(yield_per=BOARD_TRANSFER_BATCH_SIZE)
+        )
+        async for rows in cards.partitions():
+            yield b"".join(
+                _line(
+                    schemas.ExportCard(
+                        type="card", column_id=column_id, title=title, description=description, rank=rank, assignee=email
+                    )
+                )
+                for column_id, title, description, rank, email in rows
+            )
+
+
+def _invalid(number: int, message: str) -> HTTPException:
+    return HTTPException(status_code=422, detail=f"Line {number}: {message}")
+
+
+async def _parse(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, schemas.ExportRecord]]:
+    """(line number, record) for each non-blank line of an NDJSON byte stream."""
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        if len(buffer) > MAX_IMPORT_LINE_BYTES:
+            raise _invalid(number + len(lines) + 1, "line is too long")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, _record(number, line)
+    if buffer.strip():
+        yield number + 1, _record(number + 1, buffer)
+
+
+def _record(number: int, line: bytes) -> schemas.ExportRecord:
+    try:
+        return _record_type.validate_json(line)
+    except ValidationError as exc:
+        error = exc.errors()[0]
+        location = ".".join(str(part) for part in error["loc"])
+        raise _invalid(number, f"{location}: {error['msg']}" if location else error["msg"]) from None
+
+
+def _check_rank(number: int, rank: str):
+    try:
+        if not rank or not set(rank) <= set(ranking.DIGITS):
+            raise ValueError(rank)
+        ranking.validate(rank)
+    except ValueError:
+        raise _invalid(number, f"invalid rank {rank!r}") from None
+
+
+async def _insert_cards(db: AsyncSession, rows: list[dict]):
+    emails = {row["assignee"] for row in rows if row["assignee"]}
+    users = {}
+    if emails:
+        users = dict((await db.execute(select(models.User.email, models.User.id).where(models.User.email.in_(emails)))).all())
+    for row in rows:
+        row["assigned_to"] = users.get(row.pop("assignee"))
+
+    if db.bind.dialect.name == "postgresql":
+        connection = await (await db.connection()).get_raw_connection()
+        await connection.driver_connection.copy_records_to_table(
+            models.Card.__tablename__, records=[tuple(row[field] for field in CARD_FIELDS) for row in rows], columns=CARD_FIELDS
+        )
+    else:
+        # An executemany of one cached statement; inlining the rows with .values() costs more to
+        # compile per batch than the insert itself takes.
+        await db.execute(insert(models.Card), rows)
+
+
+async def import_board(db: AsyncSession, owner_id: int, chunks: AsyncIterator[bytes]) -> schemas.BoardImportResult:
+    """Create a board owned by ``owner_id`` from an export stream, in the caller's transaction.
+
+    Cards are written ``BOARD_TRANSFER_BATCH_SIZE`` at a time (COPY on Postgres), so only a
+    batch and the column id mapping are held in memory.
+    """
+    board: Optional[models.Board] = None
+    column_ids: dict[int, int] = {}
+    pending: list[dict] = []
+    cards = 0
+    async for number, record in _parse(chunks):
+        if board is None:
+            if record.type != "board":
+                raise _invalid(number, "expected the board record first")
+            board = models.Board(title=record.title, owner_id=owner_id)
+            db.add(board)
+            await db.flush()
+            await db.refresh(board)
+            db.add(models.BoardMember(board_id=board.id, user_id=owner_id, role="owner"))
+            await db.flush()
+        elif record.type == "board":
+            raise _invalid(number, "only one board record is allowed")
+        elif record.type == "column":
+            if record.id in column_ids:
+                raise _invalid(number, f"duplicate column id {record.id}")
+            _check_rank(number, record.rank)
+            column_ids[record.id] = await db.scalar(
+                insert(models.BoardColumn)
+                .values(board_id=board.id, title=record.title, rank=record.rank)
+                .returning(models.BoardColumn.id)
+            )
+        else:
+            if record.column_id not in column_ids:
+                raise _invalid(number, f"unknown column id {record.column_id}")
+            _check_rank(number, record.rank)
+            pending.append(
+                {
+                    "column_id": column_ids[record.column_id],
+                    "title": record.title,
+                    "description": record.description,
+                    "rank": record.rank,
+                    "assignee": record.assignee,
+                    "created_by": owner_id,
+                }
+            )
+            if len(pending) >= BOARD_TRANSFER_BATCH_SIZE:
+                await _insert_cards(db, pending)
+                cards += len(pending)
+                pending = []
+
+    if board is None:
+        raise HTTPException(status_code=422, detail="The import has no board record")
+    if pending:
+        await _insert_cards(db, pending)
+        cards += len(pending)
+    return schemas.BoardImportResult(board=schemas.BoardOut.model_validate(board), columns=len(column_ids), cards=cards)
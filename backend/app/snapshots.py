@@ -0,0 +1,50 @@
+import os
+from collections import OrderedDict
+from typing import Optional
+
+from app.metrics import registry
+
+BOARD_SNAPSHOT_CACHE_SIZE = int(os.getenv("BOARD_SNAPSHOT_CACHE_SIZE", 256))
+
+SNAPSHOT_LOOKUPS = registry.counter(
+    "taskboard_board_snapshot_lookups_total", "Board snapshot cache lookups by result.", ("result",)
+)
+
+
+class SnapshotCache:
+    """LRU cache of serialized ``BoardDetail`` bodies keyed by (board_id, version).
+
+    Versions only go up and every change bumps them, so an entry never goes stale; a board
+    keeps only its newest snapshot and older ones are dropped when a newer one is stored.
+    """
+
+    def __init__(self, max_entries: int = BOARD_SNAPSHOT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, tuple[int, bytes]] = OrderedDict()
+
+    def get(self, board_id: int, version: int) -> Optional[bytes]:
+        entry = self._entries.get(board_id)
+        if entry is None or entry[0] != version:
+            SNAPSHOT_LOOKUPS.inc(result="miss")
+            return None
+        self._entries.move_to_end(board_id)
+        SNAPSHOT_LOOKUPS.inc(result="hit")
+        return entry[1]
+
+    def put(self, board_id: int, version: int, body: bytes):
+        current = self._entries.get(board_id)
+        if current is not None and current[0] > version:
+            return
+        self._entries[board_id] = (version, body)
+        self._entries.move_to_end(board_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_board(self, board_id: int):
+        self._entries.pop(board_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+snapshot_cache = SnapshotCache()
@@ -0,0 +1,108 @@
+"""Board tickets: short-lived signed grants to open one board's WebSocket.
+
+``POST /boards/{id}/ticket`` checks membership once and signs the board id and the caller's
+role into a ticket that expires after ``BOARD_TICKET_TTL`` seconds. ``/ws/{id}?ticket=...``
+then connects without touching the database, which keeps mass reconnects (deploys, network
+blips) off it. Tickets are signed with a key derived from ``SECRET_KEY``, so a ticket is
+never accepted as an access token or the other way round.
+
+Revocations are held in memory by the process that made them and only need to outlive the
+tickets they cover. Other workers keep accepting already-issued tickets until they expire,
+so keep the TTL short.
+"""
+
+import hashlib
+import hmac
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from app.auth import ALGORITHM, SECRET_KEY
+
+BOARD_TICKET_TTL = int(os.getenv("BOARD_TICKET_TTL", 60))
+
+TICKET_TYPE = "board_ticket"
+_TICKET_KEY = hmac.new(SECRET_KEY.encode(), b"taskboard board ticket", hashlib.sha256).hexdigest()
+
+
+@dataclass(frozen=True)
+class BoardTicket:
+    user_id: int
+    board_id: int
+    role: str
+    issued_at: int
+    expires_at: int
+
+
+def issue_ticket(user_id: int, board_id: int, role: str, ttl: int = BOARD_TICKET_TTL) -> tuple[str, BoardTicket]:
+    now = int(time.time())
+    ticket = BoardTicket(user_id=user_id, board_id=board_id, role=role, issued_at=now, expires_at=now + ttl)
+    claims = {
+        "typ": TICKET_TYPE,
+        "sub": str(user_id),
+        "board_id": board_id,
+        "role": role,
+        "iat": ticket.issued_at,
+        "exp": ticket.expires_at,
+        "jti": uuid.uuid4().hex,
+    }
+    return jwt.encode(claims, _TICKET_KEY, algorithm=ALGORITHM), ticket
+
+
+def read_ticket(token: str, board_id: int) -> Optional[BoardTicket]:
+    """The ticket's grant, or None if it is invalid, expired, revoked or for another board."""
+    try:
+        claims = jwt.decode(token, _TICKET_KEY, algorithms=[ALGORITHM])
+        ticket = BoardTicket(
+            user_id=int(claims["sub"]),
+            board_id=int(claims["board_id"]),
+            role=str(claims["role"]),
+            issued_at=int(claims["iat"]),
+            expires_at=int(claims["exp"]),
+        )
+    except (JWTError, KeyError, TypeError, ValueError):
+        return None
+    if claims.get("typ") != TICKET_TYPE or ticket.board_id != board_id or ticket_revocations.is_revoked(ticket):
+        return None
+    return ticket
+
+
+class TicketRevocations:
+    """Refuses tickets issued before a board, or one member of it, lost access.
+
+    Times are whole seconds like the tickets' ``iat``, so a ticket issued in the same second
+    as a revocation is refused too; the client just asks for another.
+    """
+
+    def __init__(self, ttl: int = BOARD_TICKET_TTL):
+        self.ttl = ttl
+        # (board_id, user_id or None for every member) -> revoked at
+        self._revoked: dict[tuple[int, Optional[int]], int] = {}
+
+    def revoke(self, board_id: int, user_id: Optional[int] = None):
+        now = int(time.time())
+        self._prune(now)
+        self._revoked[(board_id, user_id)] = now
+
+    def is_revoked(self, ticket: BoardTicket) -> bool:
+        for key in ((ticket.board_id, None), (ticket.board_id, ticket.user_id)):
+            revoked_at = self._revoked.get(key)
+            if revoked_at is not None and ticket.issued_at <= revoked_at:
+                return True
+        return False
+
+    def _prune(self, now: int):
+        # Every ticket issued before now - ttl has expired, so older revocations cover nothing.
+        for key, revoked_at in list(self._revoked.items()):
+            if revoked_at < now - self.ttl:
+                del self._revoked[key]
+
+    def clear(self):
+        self._revoked.clear()
+
+
+ticket_revocations = TicketRevocations()
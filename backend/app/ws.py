@@ -1,33 +1,521 @@
-from typing import Dict, Set
+import abc
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Union
 
 from fastapi import WebSocket
+from pydantic import BaseModel
+from sqlalchemy.engine import make_url
 
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+Deliver = Callable[[int, str], None]
+
+SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", 256))
+SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "coalesce")
+SLOW_CONSUMER_POLICIES = ("drop", "coalesce", "disconnect")
+# Seconds between pings, and of client silence (pongs count) before a socket is reaped; 0 disables.
+PING_INTERVAL = float(os.getenv("WS_PING_INTERVAL", 20))
+IDLE_TIMEOUT = float(os.getenv("WS_IDLE_TIMEOUT", 60))
+# Sockets per user and per board in this process; 0 means unlimited.
+MAX_CONNECTIONS_PER_USER = int(os.getenv("WS_MAX_CONNECTIONS_PER_USER", 20))
+MAX_CONNECTIONS_PER_BOARD = int(os.getenv("WS_MAX_CONNECTIONS_PER_BOARD", 1000))
+
+# Close codes: the socket stopped answering pings, or a connection limit was reached.
+CLOSE_IDLE = 4008
+CLOSE_LIMIT = 4029
+
+WS_CONNECTIONS = registry.gauge("taskboard_ws_connections", "Open board WebSockets in this process.")
+WS_BOARDS = registry.gauge("taskboard_ws_boards", "Boards with at least one open WebSocket in this process.")
+WS_BOARD_CONNECTIONS = registry.gauge("taskboard_ws_board_connections", "Open WebSockets per board.", ("board_id",))
+WS_FANOUT_SECONDS = registry.histogram(
+    "taskboard_ws_fanout_seconds", "Time to queue one event for every subscriber of its board in this process."
+)
+WS_FANOUT_RECIPIENTS = registry.histogram(
+    "taskboard_ws_fanout_recipients",
+    "Subscribers an event was queued for in this process.",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500),
+)
+WS_REAPED = registry.counter("taskboard_ws_reaped_total", "WebSockets closed for not answering pings.")
+WS_REJECTED = registry.counter(
+    "taskboard_ws_rejected_total", "WebSocket connections refused by a connection limit.", ("limit",)
+)
+
+
+def encode_json(data: Any) -> str:
+    # Same compact form Starlette's send_json produces.
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def encode_event(event_type: str, data: Any, seq: Optional[int] = None) -> str:
+    """Encode a board event once; the same text is then sent to every subscriber.
+
+    ``seq`` is the board version the event produced; clients skip events at or below the
+    version they already have.
+    """
+    body = data.model_dump_json() if isinstance(data, BaseModel) else encode_json(data)
+    if seq is None:
+        return f'{{"type":{encode_json(event_type)},"data":{body}}}'
+    return f'{{"type":{encode_json(event_type)},"seq":{seq},"data":{body}}}'
+
+
+RESYNC_MESSAGE = encode_event("board_resync", {})
+PING_MESSAGE = encode_json({"type": "ping"})
+
+
+class ConnectionLimitExceeded(Exception):
+    """Raised by ``ConnectionManager.connect`` when the user or board has too many sockets."""
+
+    def __init__(self, limit: str):
+        super().__init__(f"Too many connections per {limit}")
+        self.limit = limit
+
+
+class Backplane(abc.ABC):
+    """Carries broadcasts between app processes.
+
+    The manager always delivers to its own sockets first; a backplane only has to get the
+    message to the *other* processes. Subclasses implement the transport via ``_send`` and
+    hand anything they receive to ``_receive``. Publishing only queues the event; a
+    background task feeds ``_send`` in order so request handlers never wait on the network.
+    """
+
+    OUTBOX_SIZE = 10_000
 
-class ConnectionManager:
     def __init__(self):
-        self.active_connections: Dict[int, Set[WebSocket]] = {}
+        self.origin = uuid.uuid4().hex
+        self._deliver: Optional[Deliver] = None
+        self._outbox: Optional[asyncio.Queue] = None
+        self._publisher: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+        self._outbox = asyncio.Queue(self.OUTBOX_SIZE)
+        self._publisher = asyncio.create_task(self._drain_outbox())
+
+    async def stop(self):
+        self._deliver = None
+        if self._publisher is not None:
+            self._publisher.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._publisher
+            self._publisher = None
+        self._outbox = None
+
+    def publish(self, board_id: int, message: str):
+        if self._outbox is None:
+            logger.warning("Backplane is not started; board %s event stays local", board_id)
+            return
+        try:
+            self._outbox.put_nowait(f"{self.origin} {board_id} {message}")
+        except asyncio.QueueFull:
+            logger.warning("Backplane outbox is full; dropping board %s event", board_id)
+
+    async def _drain_outbox(self):
+        while True:
+            payload = await self._outbox.get()
+            try:
+                await self._send(payload)
+            except Exception:
+                # The mutation is already committed; remote clients resync on their next event.
+                logger.exception("Failed to publish event to the backplane")
+
+    @abc.abstractmethod
+    async def _send(self, payload: str):
+        """Deliver one payload to the other processes."""
+
+    def _receive(self, payload: str):
+        # Payloads are "<origin> <board_id> <encoded event>", so events are never re-encoded.
+        origin, board_id, message = payload.split(" ", 2)
+        if origin == self.origin or self._deliver is None:
+            return
+        self._deliver(int(board_id), message)
+
+
+class LocalBackplane(Backplane):
+    """Single-process deployments: every subscriber is already reached by local delivery."""
+
+    async def start(self, deliver: Deliver):
+        self._deliver = deliver
+
+    def publish(self, board_id: int, message: str):
+        return None
+
+    async def _send(self, payload: str):
+        return None
+
+
+class PostgresBackplane(Backplane):
+    """Fan-out across workers and pods with Postgres LISTEN/NOTIFY."""
+
+    CHANNEL = "taskboard_events"
+    # NOTIFY payloads must be shorter than 8000 bytes.
+    MAX_PAYLOAD_BYTES = 7999
+    RECONNECT_DELAY = 1.0
+
+    def __init__(self, dsn: str):
+        super().__init__()
+        self.dsn = dsn
+        self._pool = None
+        self._listener = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+
+    async def start(self, deliver: Deliver):
+        import asyncpg
+
+        await super().start(deliver)
+        self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=4)
+        await self._listen()
+
+    async def stop(self):
+        await super().stop()
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        if self._listener is not None:
+            self._listener.remove_termination_listener(self._on_terminated)
+            await self._listener.close()
+            self._listener = None
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    async def _listen(self):
+        import asyncpg
+
+        self._listener = await asyncpg.connect(self.dsn)
+        self._listener.add_termination_listener(self._on_terminated)
+        await self._listener.add_listener(self.CHANNEL, self._on_notify)
+
+    async def _send(self, payload: str):
+        if len(payload.encode()) > self.MAX_PAYLOAD_BYTES:
+            # Too large for NOTIFY: tell remote clients to refetch the board instead.
+            origin, board_id, _ = payload.split(" ", 2)
+            payload = f"{origin} {board_id} {RESYNC_MESSAGE}"
+        await self._pool.execute("SELECT pg_notify($1, $2)", self.CHANNEL, payload)
+
+    def _on_notify(self, connection, pid, channel, payload):
+        self._receive(payload)
+
+    def _on_terminated(self, connection):
+        if self._deliver is not None and self._reconnect_task is None:
+            self._reconnect_task = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        try:
+            while self._deliver is not None:
+                try:
+                    await self._listen()
+                    return
+                except Exception:
+                    logger.exception("Backplane LISTEN reconnect failed")
+                    await asyncio.sleep(self.RECONNECT_DELAY)
+        finally:
+            self._reconnect_task = None
+
+
+def create_backplane() -> Backplane:
+    kind = os.getenv("WS_BACKPLANE", "local")
+    if kind == "local":
+        return LocalBackplane()
+    if kind == "postgres":
+        from app.database import DATABASE_URL
+
+        dsn = os.getenv("WS_BACKPLANE_URL") or make_url(DATABASE_URL).set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        return PostgresBackplane(dsn)
+    raise ValueError(f"Unknown WS_BACKPLANE: {kind}")
+
+
+
+
+class Connection:
+    """A subscribed socket with a bounded outbound queue drained by its own writer task.
+
+    When the queue is full the slow-consumer policy decides what happens: ``drop`` discards
+    the new event, ``coalesce`` collapses the backlog into a single ``board_resync`` event
+    (the client refetches the board), and ``disconnect`` closes the socket with 1013 so the
+    client reconnects.
+
+    A ``held`` connection queues live events without sending them until ``release`` puts a
+    replay of missed events in front of them.
+
+    ``last_seen`` is when the client last sent anything; the manager reaps connections that
+    stay silent through its pings.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        max_queue: int,
+        policy: str,
+        on_close: Callable[[], None],
+        held: bool = False,
+        user_id: Optional[int] = None,
+    ):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.policy = policy
+        self.user_id = user_id
+        self.dropped = 0
+        self.closed = False
+        self._queue: deque = deque()
+        self._held = held
+        self._evicted = False
+        self._on_close = on_close
+        self._wakeup = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self.last_seen = self._loop.time()
+        self._writer = self._loop.create_task(self._write())
+        self._closer: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, message: str):
+        if self.closed or self._evicted:
+            return
+        if len(self._queue) >= self.max_queue:
+            self.dropped += 1
+            if self.policy == "drop":
+                return
+            if self.policy == "disconnect":
+                self._evicted = True
+                self._wake()
+                return
+            self._queue.clear()
+            message = RESYNC_MESSAGE
+        self._queue.append(message)
+        self._wake()
+
+    def reply(self, message: str):
+        """Queue a response to this client's own request, in order with its events.
+
+        Replies are never dropped or coalesced; a client that lets them back up past the
+        queue limit isn't reading and is disconnected.
+        """
+        if self.closed or self._evicted:
+            return
+        if len(self._queue) >= self.max_queue:
+            self._evicted = True
+        else:
+            self._queue.append(message)
+        self._wake()
+
+    def ping(self):
+        """Queue a ping unless the queue is already backed up; it is not worth a resync."""
+        if self.closed or self._evicted or len(self._queue) >= self.max_queue:
+            return
+        self._queue.append(PING_MESSAGE)
+        self._wake()
+
+    def touch(self):
+        self.last_seen = self._loop.time()
+
+    def release(self, replay: list[str] = ()):
+        """Send ``replay`` ahead of any live events queued while the connection was held."""
+        self._queue.extendleft(reversed(replay))
+        self._held = False
+        self._wake()
+
+    def stop(self):
+        self.closed = True
+        if self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    def abort(self, code: int):
+        """Stop writing and close the socket with ``code``, even if a send is stuck."""
+        self.stop()
+        self._closer = self._loop.create_task(self._close(code))
+
+    async def _close(self, code: int):
+        with contextlib.suppress(Exception):
+            await self.websocket.close(code=code)
+
+    def _wake(self):
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._wakeup.set()
+        else:
+            # Broadcasts can come from another thread's loop (sync code, the test client).
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _write(self):
+        try:
+            while True:
+                if self._evicted:
+                    await self.websocket.close(code=1013)
+                    return
+                if self._held or not self._queue:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+                await self.websocket.send_text(self._queue.popleft())
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Usually the client went away mid-send; the connection is dropped either way.
+            logger.debug("WebSocket send failed; dropping the connection", exc_info=True)
+        finally:
+            if not self.closed:
+                self._on_close()
+
+
+class ConnectionManager:
+    def __init__(
+        self,
+        backplane: Backplane = None,
+        max_queue: int = SEND_QUEUE_SIZE,
+        policy: str = SLOW_CONSUMER_POLICY,
+        ping_interval: float = PING_INTERVAL,
+        idle_timeout: float = IDLE_TIMEOUT,
+        max_per_user: int = MAX_CONNECTIONS_PER_USER,
+        max_per_board: int = MAX_CONNECTIONS_PER_BOARD,
+    ):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow-consumer policy: {policy}")
+        self.active_connections: Dict[int, Dict[WebSocket, Connection]] = {}
+        self.backplane = backplane or LocalBackplane()
+        self.max_queue = max_queue
+        self.policy = policy
+        self.ping_interval = ping_interval
+        self.idle_timeout = idle_timeout
+        self.max_per_user = max_per_user
+        self.max_per_board = max_per_board
+        self._user_connections: Dict[int, int] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    async def start(self):
+        await self.backplane.start(self.deliver)
+        if self.ping_interval > 0:
+            self._reaper = asyncio.create_task(self._heartbeat())
+
+    async def stop(self):
+        if self._reaper is not None:
+            self._reaper.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._reaper
+            self._reaper = None
+        await self.backplane.stop()
+
+    @property
+    def connection_count(self) -> int:
+        return sum(len(connections) for connections in self.active_connections.values())
+
+    async def connect(
+        self, websocket: WebSocket, board_id: int, held: bool = False, user_id: Optional[int] = None
+    ) -> Connection:
+        """Accept and subscribe the socket, or raise ``ConnectionLimitExceeded`` without accepting."""
+        if self.max_per_board and len(self.active_connections.get(board_id, ())) >= self.max_per_board:
+            WS_REJECTED.inc(limit="board")
+            raise ConnectionLimitExceeded("board")
+        if user_id is not None and self.max_per_user and self._user_connections.get(user_id, 0) >= self.max_per_user:
+            WS_REJECTED.inc(limit="user")
+            raise ConnectionLimitExceeded("user")
 
-    async def connect(self, websocket: WebSocket, board_id: int):
         await websocket.accept()
         if board_id not in self.active_connections:
-            self.active_connections[board_id] = set()
-        self.active_connections[board_id].add(websocket)
+            self.active_connections[board_id] = {}
+        connection = Connection(
+            websocket,
+            self.max_queue,
+            self.policy,
+            lambda: self.disconnect(websocket, board_id),
+            held=held,
+            user_id=user_id,
+        )
+        self.active_connections[board_id][websocket] = connection
+        if user_id is not None:
+            self._user_connections[user_id] = self._user_connections.get(user_id, 0) + 1
+        return connection
 
     def disconnect(self, websocket: WebSocket, board_id: int):
         if board_id in self.active_connections:
-            self.active_connections[board_id].discard(websocket)
+            connection = self.active_connections[board_id].pop(websocket, None)
+            if connection is not None:
+                connection.stop()
+                self._release_user(connection.user_id)
             if not self.active_connections[board_id]:
                 del self.active_connections[board_id]
 
-    async def broadcast(self, board_id: int, message: dict, exclude: WebSocket = None):
+    def _release_user(self, user_id: Optional[int]):
+        if user_id is None:
+            return
+        remaining = self._user_connections.get(user_id, 0) - 1
+        if remaining > 0:
+            self._user_connections[user_id] = remaining
+        else:
+            self._user_connections.pop(user_id, None)
+
+    def reap(self) -> int:
+        """Close sockets silent for longer than ``idle_timeout`` and ping the rest.
+
+        A dead peer (a sleeping laptop, a dropped NAT mapping) never errors a send until the
+        kernel gives up, so silence is what marks it. Returns how many were reaped.
+        """
+        deadline = asyncio.get_running_loop().time() - self.idle_timeout
+        reaped = 0
+        for board_id, connections in list(self.active_connections.items()):
+            for websocket, connection in list(connections.items()):
+                if self.idle_timeout > 0 and connection.last_seen < deadline:
+                    self.disconnect(websocket, board_id)
+                    connection.abort(CLOSE_IDLE)
+                    reaped += 1
+                else:
+                    connection.ping()
+        if reaped:
+            WS_REAPED.inc(reaped)
+            logger.info("Reaped %d idle WebSockets", reaped)
+        return reaped
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            self.reap()
+
+    def broadcast(self, board_id: int, message: Union[str, dict], exclude: WebSocket = None):
+        """Queue an event for every subscriber of the board; never waits on a socket.
+
+        ``message`` is ideally already encoded with ``encode_event``; a dict is encoded here,
+        once, before fan-out.
+        """
+        if not isinstance(message, str):
+            message = encode_json(message)
+        self.deliver(board_id, message, exclude)
+        self.backplane.publish(board_id, message)
+
+    def deliver(self, board_id: int, message: str, exclude: WebSocket = None):
         if board_id not in self.active_connections:
             return
-        for connection in self.active_connections[board_id].copy():
-            if connection != exclude:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    self.active_connections[board_id].discard(connection)
+        started = time.perf_counter()
+        connections = list(self.active_connections[board_id].items())
+        for websocket, connection in connections:
+            if websocket is not exclude:
+                connection.enqueue(message)
+        WS_FANOUT_SECONDS.observe(time.perf_counter() - started)
+        WS_FANOUT_RECIPIENTS.observe(len(connections))
+
+
+manager = ConnectionManager(create_backplane())
 
 
-manager = ConnectionManager()
+@registry.on_collect
+def _collect_connections():
+    WS_CONNECTIONS.set(manager.connection_count)
+    WS_BOARDS.set(len(manager.active_connections))
+    WS_BOARD_CONNECTIONS.clear()
+    for board_id, connections in list(manager.active_connections.items()):
+        WS_BOARD_CONNECTIONS.set(len(connections), board_id=board_id)
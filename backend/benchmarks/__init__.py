@@ -0,0 +1 @@
+# Benchmarks for the API hot paths. Run from backend/, e.g. `python -m benchmarks.ws_fanout`.
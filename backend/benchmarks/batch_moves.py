@@ -0,0 +1,91 @@
+"""Moving many cards one request at a time against one ``POST /boards/{id}/batch``.
+
+Seeds a board with ``--cards`` cards spread over two columns, moves every card to the other
+column first with single ``PUT .../move`` requests and then with one batch, and reports wall
+time, SQL statements and board events (version bumps, i.e. WebSocket broadcasts) for each.
+
+    python -m benchmarks.batch_moves --cards 1000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import configure_environment, create_board_fixture
+
+configure_environment()
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import migrate  # noqa: E402
+from app.database import async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def measure(client, board_id: int, headers: dict, requests) -> dict:
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    version = (await client.get(f"/boards/{board_id}", headers=headers)).json()["version"]
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    started = time.perf_counter()
+    try:
+        for method, path, body in requests:
+            response = await client.request(method, path, json=body, headers=headers)
+            response.raise_for_status()
+    finally:
+        elapsed = time.perf_counter() - started
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    events = (await client.get(f"/boards/{board_id}", headers=headers)).json()["version"] - version
+    return {
+        "requests": len(requests),
+        "seconds": round(elapsed, 3),
+        "sql_statements": len(statements),
+        "board_events": events,
+    }
+
+
+async def run(cards: int) -> dict:
+    migrate.upgrade()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers, board_id, columns = await create_board_fixture(client)
+        placed = []
+        for i in range(cards):
+            column = columns[i % 2]
+            response = await client.post(f"/boards/{board_id}/cards/", json={"title": f"Card {i}", "column_id": column}, headers=headers)
+            placed.append((response.json()["id"], column))
+
+        def other(column: int) -> int:
+            return columns[1] if column == columns[0] else columns[0]
+
+        singles = await measure(
+            client,
+            board_id,
+            headers,
+            [
+                ("PUT", f"/boards/{board_id}/cards/{card_id}/move", {"column_id": other(column), "position": 0})
+                for card_id, column in placed
+            ],
+        )
+        # Everything is now in the other column; the batch moves it all back.
+        operations = [{"op": "move", "card_id": card_id, "column_id": column, "position": 0} for card_id, column in placed]
+        batch = await measure(client, board_id, headers, [("POST", f"/boards/{board_id}/batch", {"operations": operations})])
+    await async_engine.dispose()
+
+    return {"benchmark": "batch_moves", "cards": cards, "single_moves": singles, "batch": batch}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=1000, help="cards to move (at most 1000, the batch limit)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.cards)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
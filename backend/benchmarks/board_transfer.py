@@ -0,0 +1,95 @@
+"""Throughput of streaming board import and export.
+
+Generates an export file of ``--cards`` cards over ``--columns`` columns on the fly, streams
+it into ``POST /boards/import`` and back out of ``GET /boards/{id}/export`` through the real
+ASGI app, and reports rows/second and the process's peak RSS after each phase. Peak RSS
+after the import should stay roughly flat as ``--cards`` grows; httpx's ASGI transport
+buffers whole response bodies, so the export figure includes the file itself.
+
+    python -m benchmarks.board_transfer --cards 50000 --columns 5
+
+Point DATABASE_URL at Postgres to measure the COPY path.
+"""
+
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+
+from benchmarks.common import configure_environment, create_board_fixture
+
+configure_environment()
+
+import httpx  # noqa: E402
+
+from app import migrate  # noqa: E402
+from app.database import async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.ranking import keys_between  # noqa: E402
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Bytes on macOS, kilobytes elsewhere.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def export_file(cards: int, columns: int):
+    yield (json.dumps({"type": "board", "title": "Transfer bench"}) + "\n").encode()
+    for column, rank in enumerate(keys_between(None, None, columns)):
+        yield (json.dumps({"type": "column", "id": column, "title": f"Col {column}", "rank": rank}) + "\n").encode()
+    per_column = -(-cards // columns)
+    for column in range(columns):
+        count = min(per_column, cards - column * per_column)
+        if count <= 0:
+            break
+        lines = [
+            json.dumps({"type": "card", "column_id": column, "title": f"Card {column}.{i}", "description": "x" * 80, "rank": rank})
+            for i, rank in enumerate(keys_between(None, None, count))
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def run(cards: int, columns: int) -> dict:
+    migrate.upgrade()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        headers, _, _ = await create_board_fixture(client, columns=0)
+
+        started = time.perf_counter()
+        response = await client.post("/boards/import", content=export_file(cards, columns), headers=headers)
+        response.raise_for_status()
+        import_seconds = time.perf_counter() - started
+        import_rss = peak_rss_mb()
+        board_id = response.json()["board"]["id"]
+
+        rows = 0
+        started = time.perf_counter()
+        async with client.stream("GET", f"/boards/{board_id}/export", headers=headers) as response:
+            response.raise_for_status()
+            async for _ in response.aiter_lines():
+                rows += 1
+        export_seconds = time.perf_counter() - started
+    await async_engine.dispose()
+
+    return {
+        "benchmark": "board_transfer",
+        "cards": cards,
+        "columns": columns,
+        "import": {"seconds": round(import_seconds, 3), "rows_per_second": round(cards / import_seconds), "peak_rss_mb": import_rss},
+        "export": {"seconds": round(export_seconds, 3), "rows_per_second": round(rows / export_seconds), "peak_rss_mb": peak_rss_mb()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=50000)
+    parser.add_argument("--columns", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.cards, args.columns)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
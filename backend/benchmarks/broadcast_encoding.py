@@ -0,0 +1,88 @@
+"""Cost of encoding a broadcast per socket versus once per event.
+
+Builds board-shaped payloads of increasing size and compares the old fan-out, where every
+``send_json`` re-encodes ``model_dump()`` output, with ``encode_event`` encoding once and
+sending the same text to every subscriber.
+
+    python -m benchmarks.broadcast_encoding --cards 1 100 1000 --subscribers 10 100 500
+"""
+
+import argparse
+import json
+import timeit
+
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+from app import schemas  # noqa: E402
+from app.ranking import keys_between  # noqa: E402
+from app.ws import encode_event, encode_json  # noqa: E402
+
+
+def board_payload(cards: int) -> schemas.BoardDetail:
+    return schemas.BoardDetail(
+        id=1,
+        title="Bench",
+        owner_id=1,
+        columns=[
+            schemas.ColumnWithCards(
+                id=1,
+                title="Backlog",
+                rank="a0",
+                cards=[
+                    schemas.CardOut(id=i, column_id=1, title=f"Card {i}", description="x" * 80, rank=rank, created_by=1)
+                    for i, rank in enumerate(keys_between(None, None, cards))
+                ],
+            )
+        ],
+    )
+
+
+def per_socket(payload: schemas.BoardDetail, subscribers: int):
+    message = {"type": "board_snapshot", "data": payload.model_dump()}
+    for _ in range(subscribers):
+        encode_json(message)
+
+
+def encode_once(payload: schemas.BoardDetail, subscribers: int):
+    text = encode_event("board_snapshot", payload)
+    frames = []
+    for _ in range(subscribers):
+        frames.append(text)
+
+
+def measure(fn, payload, subscribers: int, repeat: int) -> float:
+    number = max(1, 2000 // (subscribers * max(1, len(payload.columns[0].cards))))
+    best = min(timeit.repeat(lambda: fn(payload, subscribers), number=number, repeat=repeat))
+    return best / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, nargs="+", default=[1, 100, 1000])
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = []
+    for cards in args.cards:
+        payload = board_payload(cards)
+        for subscribers in args.subscribers:
+            before = measure(per_socket, payload, subscribers, args.repeat)
+            after = measure(encode_once, payload, subscribers, args.repeat)
+            rows.append(
+                {
+                    "cards": cards,
+                    "subscribers": subscribers,
+                    "payload_bytes": len(encode_event("board_snapshot", payload).encode()),
+                    "per_socket_ms": round(before * 1000, 3),
+                    "encode_once_ms": round(after * 1000, 3),
+                    "speedup": round(before / after, 1),
+                }
+            )
+    print(json.dumps({"benchmark": "broadcast_encoding", "results": rows}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import os
+import statistics
+import tempfile
+
+
+def configure_environment():
+    """Point the app at a scratch SQLite database unless DATABASE_URL is already set.
+
+    Must run before anything under ``app`` is imported.
+    """
+    if "DATABASE_URL" not in os.environ:
+        path = os.path.join(tempfile.mkdtemp(prefix="taskboard-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> dict:
+    """Latency summary in milliseconds."""
+    return {
+        "count": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(max(samples) * 1000, 3),
+    }
+
+
+async def create_board_fixture(client, email="bench@example.com", columns=2):
+    """Register a user and create a board with ``columns`` columns; returns (headers, board_id, column_ids)."""
+    await client.post("/register", json={"email": email, "password": "benchpass123", "display_name": "Bench"})
+    response = await client.post("/login", data={"username": email, "password": "benchpass123"})
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    board_id = (await client.post("/boards/", json={"title": "Bench"}, headers=headers)).json()["id"]
+    column_ids = []
+    for i in range(columns):
+        column = await client.post(f"/boards/{board_id}/columns/", json={"title": f"Col {i}"}, headers=headers)
+        column_ids.append(column.json()["id"])
+    return headers, board_id, column_ids
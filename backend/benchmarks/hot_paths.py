@@ -0,0 +1,335 @@
+"""Throughput and latency of card moves and creates with live WebSocket listeners.
+
+Seeds ``--boards`` boards of ``--columns`` columns and ``--cards`` cards each, connects
+``--listeners`` sockets per board through the real ``/ws/{board_id}`` endpoint, then has
+``--concurrency`` clients send ``--requests`` card moves and creates (``--create-ratio`` of
+them creates) to random boards through the real ASGI app. Reports requests/second, latency
+per operation, SQL statements per request, and broadcast lag: how long after ``broadcast``
+each listener's socket was handed the event.
+
+    python -m benchmarks.hot_paths --boards 4 --cards 1000 --listeners 50 --requests 2000 --output before.json
+    python -m benchmarks.hot_paths ... --baseline before.json
+
+With ``--baseline`` the result also carries each figure's change against an earlier run, and
+flags those worse by more than ``--tolerance`` percent.
+Everything shares one event loop, so lag includes time the listeners wait behind request
+handling, as it would in a busy worker. Point DATABASE_URL at Postgres for production-like
+write numbers; SQLite serializes writers.
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+from benchmarks.common import configure_environment, create_board_fixture, summarize
+
+configure_environment()
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app import migrate  # noqa: E402
+from app.database import async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.ranking import keys_between  # noqa: E402
+from app.services.moves import MOVE_COALESCE_WINDOW  # noqa: E402
+from app.ws import manager  # noqa: E402
+
+# Which operation the statements running in this task belong to.
+current_operation: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_operation", default=None)
+
+
+class Listener:
+    """A board subscriber speaking the ASGI WebSocket protocol to the app directly."""
+
+    def __init__(self, board_id: int, token: str):
+        self.board_id = board_id
+        self.token = token
+        self.accepted = asyncio.Event()
+        self.arrivals: list[tuple[int, float]] = []
+        self.close_code: Optional[int] = None
+        self._inbound: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self):
+        scope = {
+            "type": "websocket",
+            "asgi": {"version": "3.0"},
+            "scheme": "ws",
+            "server": ("bench", 80),
+            "client": ("127.0.0.1", 0),
+            "root_path": "",
+            "path": f"/ws/{self.board_id}",
+            "raw_path": f"/ws/{self.board_id}".encode(),
+            "query_string": f"token={self.token}".encode(),
+            "headers": [],
+            "subprotocols": [],
+        }
+        await self._inbound.put({"type": "websocket.connect"})
+        self._task = asyncio.create_task(app(scope, self._inbound.get, self._send))
+        await self.accepted.wait()
+        if self.close_code is not None:
+            raise RuntimeError(f"Listener refused with close code {self.close_code}")
+
+    async def close(self):
+        await self._inbound.put({"type": "websocket.disconnect", "code": 1000})
+        await self._task
+
+    async def _send(self, message: dict):
+        if message["type"] == "websocket.accept":
+            self.accepted.set()
+        elif message["type"] == "websocket.close":
+            self.close_code = message.get("code", 1000)
+            self.accepted.set()
+        elif message["type"] == "websocket.send":
+            seq = json.loads(message["text"]).get("seq")
+            if seq is not None:
+                self.arrivals.append((seq, time.perf_counter()))
+
+
+def board_file(columns: int, cards: int):
+    yield (json.dumps({"type": "board", "title": "Hot paths bench"}) + "\n").encode()
+    for column, rank in enumerate(keys_between(None, None, columns)):
+        yield (json.dumps({"type": "column", "id": column, "title": f"Col {column}", "rank": rank}) + "\n").encode()
+    per_column = -(-cards // columns)
+    for column in range(columns):
+        count = min(per_column, cards - column * per_column)
+        if count <= 0:
+            break
+        lines = [
+            json.dumps({"type": "card", "column_id": column, "title": f"Card {column}.{i}", "rank": rank})
+            for i, rank in enumerate(keys_between(None, None, count))
+        ]
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def seed_boards(client, headers: dict, boards: int, columns: int, cards: int) -> list[dict]:
+    """Import the boards; returns each board's id, column ids and card ids."""
+    seeded = []
+    for _ in range(boards):
+        response = await client.post("/boards/import", content=b"".join(board_file(columns, cards)), headers=headers)
+        response.raise_for_status()
+        board_id = response.json()["board"]["id"]
+        detail = (await client.get(f"/boards/{board_id}", headers=headers)).json()
+        seeded.append(
+            {
+                "id": board_id,
+                "columns": [column["id"] for column in detail["columns"]],
+                "cards": [card["id"] for column in detail["columns"] for card in column["cards"]],
+            }
+        )
+    return seeded
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def drive(client, headers: dict, boards: list[dict], concurrency: int, requests: int, create_ratio: float, seed: int):
+    rng = random.Random(seed)
+    latencies: dict[str, list[float]] = {"move": [], "create": []}
+    remaining = iter(range(requests))
+
+    async def worker():
+        for n in remaining:
+            board = rng.choice(boards)
+            column_id = rng.choice(board["columns"])
+            if rng.random() < create_ratio:
+                operation = "create"
+                request = client.post(
+                    f"/boards/{board['id']}/cards/", json={"title": f"New {n}", "column_id": column_id}, headers=headers
+                )
+            else:
+                operation = "move"
+                request = client.put(
+                    f"/boards/{board['id']}/cards/{rng.choice(board['cards'])}/move",
+                    json={"column_id": column_id, "position": rng.randrange(20)},
+                    headers=headers,
+                )
+            current_operation.set(operation)
+            started = time.perf_counter()
+            response = await request
+            latencies[operation].append(time.perf_counter() - started)
+            response.raise_for_status()
+            if operation == "create":
+                board["cards"].append(response.json()["id"])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def run(
+    boards: int, columns: int, cards: int, listeners: int, concurrency: int, requests: int, create_ratio: float, seed: int
+) -> dict:
+    migrate.upgrade()
+    # Every listener is the same user; the per-user and per-board caps would refuse most of them.
+    manager.max_per_user = manager.max_per_board = 0
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        headers, _, _ = await create_board_fixture(client, columns=0)
+        token = headers["Authorization"].split()[1]
+        seeded = await seed_boards(client, headers, boards, columns, cards)
+
+        sockets = [Listener(board["id"], token) for board in seeded for _ in range(listeners)]
+        for socket in sockets:
+            await socket.connect()
+
+        broadcast_at: dict[tuple[int, int], float] = {}
+        broadcast = manager.broadcast
+
+        def timed_broadcast(board_id, message, exclude=None):
+            seq = json.loads(message).get("seq") if isinstance(message, str) else message.get("seq")
+            if seq is not None:
+                broadcast_at[(board_id, seq)] = time.perf_counter()
+            broadcast(board_id, message, exclude)
+
+        statements: Counter = Counter()
+
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements[current_operation.get() or "background"] += 1
+
+        manager.broadcast = timed_broadcast
+        event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+        try:
+            latencies, elapsed = await drive(client, headers, seeded, concurrency, requests, create_ratio, seed)
+            # Let the writers hand every listener its board's last event.
+            latest: dict[int, int] = {}
+            for board_id, seq in broadcast_at:
+                latest[board_id] = max(seq, latest.get(board_id, 0))
+            deadline = time.perf_counter() + 10
+            while time.perf_counter() < deadline and not all(caught_up(socket, latest) for socket in sockets):
+                await asyncio.sleep(0.01)
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", count_statement)
+            del manager.broadcast
+
+        lags = [
+            arrived - broadcast_at[(socket.board_id, seq)]
+            for socket in sockets
+            for seq, arrived in socket.arrivals
+            if (socket.board_id, seq) in broadcast_at
+        ]
+        for socket in sockets:
+            await socket.close()
+    await async_engine.dispose()
+
+    total = sum(len(samples) for samples in latencies.values())
+    return {
+        "benchmark": "hot_paths",
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "database": async_engine.dialect.name,
+        "parameters": {
+            "boards": boards,
+            "columns": columns,
+            "cards": cards,
+            "listeners_per_board": listeners,
+            "concurrency": concurrency,
+            "requests": requests,
+            "create_ratio": create_ratio,
+            "seed": seed,
+            "move_coalesce_window_ms": MOVE_COALESCE_WINDOW * 1000,
+        },
+        "requests_per_second": round(total / elapsed, 1),
+        "latency": summarize(latencies["move"] + latencies["create"]),
+        "operations": {
+            operation: {
+                "latency": summarize(samples),
+                "sql_statements_per_request": round(statements[operation] / len(samples), 2),
+            }
+            for operation, samples in latencies.items()
+            if samples
+        },
+        "background_sql_statements": statements["background"],
+        "broadcasts": len(broadcast_at),
+        "broadcast_lag": summarize(lags) if lags else None,
+    }
+
+
+def caught_up(socket: Listener, latest: dict[int, int]) -> bool:
+    if socket.board_id not in latest:
+        return True
+    return bool(socket.arrivals) and socket.arrivals[-1][0] >= latest[socket.board_id]
+
+
+# (path, True when a larger value is better)
+COMPARED = [
+    (("requests_per_second",), True),
+    (("latency", "p50_ms"), False),
+    (("latency", "p99_ms"), False),
+    (("broadcast_lag", "p50_ms"), False),
+    (("broadcast_lag", "p99_ms"), False),
+    (("operations", "move", "sql_statements_per_request"), False),
+    (("operations", "create", "sql_statements_per_request"), False),
+]
+
+
+def _lookup(result: dict, path: tuple[str, ...]):
+    for key in path:
+        if not isinstance(result, dict) or key not in result:
+            return None
+        result = result[key]
+    return result
+
+
+def compare(baseline: dict, result: dict, tolerance: float) -> dict:
+    """Percent change of the headline figures; ``regressed`` marks a change of more than
+    ``tolerance`` percent in the bad direction."""
+    changes = {}
+    for path, higher_is_better in COMPARED:
+        before, after = _lookup(baseline, path), _lookup(result, path)
+        if not before or after is None:
+            continue
+        change = (after - before) / before * 100
+        changes[".".join(path)] = {
+            "baseline": before,
+            "current": after,
+            "change_pct": round(change, 1),
+            "regressed": -change > tolerance if higher_is_better else change > tolerance,
+        }
+    return {"commit": baseline.get("commit"), "changes": changes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--boards", type=int, default=4)
+    parser.add_argument("--columns", type=int, default=4, help="columns per board")
+    parser.add_argument("--cards", type=int, default=1000, help="cards per board")
+    parser.add_argument("--listeners", type=int, default=50, help="WebSocket listeners per board")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--create-ratio", type=float, default=0.2, help="share of requests that create a card")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the result to this JSON file")
+    parser.add_argument("--baseline", help="JSON result of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="percent change not counted as a regression")
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run(args.boards, args.columns, args.cards, args.listeners, args.concurrency, args.requests, args.create_ratio, args.seed)
+    )
+    if args.baseline:
+        with open(args.baseline) as f:
+            result["comparison"] = compare(json.load(f), result, args.tolerance)
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Query plans and timings for the hot read paths before and after the 0003 indexes.
+
+Migrates an empty database to 0002, seeds users, boards, columns and cards with plain
+multi-row inserts, then runs each hot query (the board-load selectinloads, the rank
+lookups behind create/move, list_boards and assignee lookups) and prints its plan and
+median latency. It then upgrades to head and runs the same queries again.
+
+    python -m benchmarks.indexes --cards 1000000
+
+Point DATABASE_URL at an empty Postgres database to get EXPLAIN ANALYZE plans there.
+"""
+
+import argparse
+import json
+import random
+import statistics
+import time
+
+from benchmarks.common import configure_environment
+
+configure_environment()
+
+from sqlalchemy import func, insert, select  # noqa: E402
+
+from app import migrate, models  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.ranking import keys_between  # noqa: E402
+
+INSERT_BATCH = 50_000
+
+
+def _insert_batched(conn, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= INSERT_BATCH:
+            conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+
+
+def seed(boards: int, columns: int, cards: int, users: int, members: int) -> dict:
+    column_ranks = keys_between(None, None, columns)
+    per_column = max(1, cards // (boards * columns))
+    card_ranks = keys_between(None, None, per_column)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        _insert_batched(
+            conn,
+            models.User.__table__,
+            ({"id": i, "email": f"user{i}@example.com", "hashed_password": "x", "display_name": f"User {i}"} for i in range(1, users + 1)),
+        )
+        _insert_batched(
+            conn,
+            models.Board.__table__,
+            ({"id": b, "title": f"Board {b}", "owner_id": (b % users) + 1} for b in range(1, boards + 1)),
+        )
+        _insert_batched(
+            conn,
+            models.BoardMember.__table__,
+            (
+                {"board_id": b, "user_id": ((b + m) % users) + 1, "role": "owner" if m == 0 else "editor"}
+                for b in range(1, boards + 1)
+                for m in range(min(members, users))
+            ),
+        )
+        _insert_batched(
+            conn,
+            models.BoardColumn.__table__,
+            (
+                {"id": (b - 1) * columns + c + 1, "board_id": b, "title": f"Col {c}", "rank": column_ranks[c]}
+                for b in range(1, boards + 1)
+                for c in range(columns)
+            ),
+        )
+        _insert_batched(
+            conn,
+            models.Card.__table__,
+            (
+                {
+                    "column_id": column_id,
+                    "title": f"Card {i}",
+                    "rank": rank,
+                    "assigned_to": (column_id * per_column + i) % users + 1,
+                }
+                for column_id in range(1, boards * columns + 1)
+                for i, rank in enumerate(card_ranks)
+            ),
+        )
+    return {
+        "boards": boards,
+        "columns": boards * columns,
+        "cards": boards * columns * per_column,
+        "users": users,
+        "seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+def hot_queries(boards: int, columns: int, users: int, per_column: int):
+    """name -> function(rng) building one instance of the query with random ids."""
+
+    def board_columns(rng):
+        board_id = rng.randint(1, boards)
+        return (
+            select(models.BoardColumn)
+            .where(models.BoardColumn.board_id == board_id)
+            .order_by(models.BoardColumn.rank)
+        )
+
+    def board_cards(rng):
+        board_id = rng.randint(1, boards)
+        column_ids = [(board_id - 1) * columns + c + 1 for c in range(columns)]
+        return select(models.Card).where(models.Card.column_id.in_(column_ids)).order_by(models.Card.rank)
+
+    def last_rank(rng):
+        column_id = rng.randint(1, boards * columns)
+        return select(func.max(models.Card.rank)).where(models.Card.column_id == column_id)
+
+    def rank_neighbours(rng):
+        column_id = rng.randint(1, boards * columns)
+        return (
+            select(models.Card.rank)
+            .where(models.Card.column_id == column_id)
+            .order_by(models.Card.rank, models.Card.id)
+            .offset(rng.randint(0, per_column - 1))
+            .limit(2)
+        )
+
+    def list_boards(rng):
+        user_id = rng.randint(1, users)
+        return (
+            select(models.Board)
+            .join(models.BoardMember, models.BoardMember.board_id == models.Board.id)
+            .where(models.BoardMember.user_id == user_id)
+            .order_by(models.Board.created_at.desc())
+        )
+
+    def assigned_cards(rng):
+        return select(models.Card.id).where(models.Card.assigned_to == rng.randint(1, users))
+
+    return {
+        "board_columns": board_columns,
+        "board_cards": board_cards,
+        "last_rank": last_rank,
+        "rank_neighbours": rank_neighbours,
+        "list_boards": list_boards,
+        "assigned_cards": assigned_cards,
+    }
+
+
+def explain(conn, statement) -> list[str]:
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    return [row[0] for row in conn.exec_driver_sql(f"EXPLAIN ANALYZE {sql}")]
+
+
+def measure(queries: dict, repeats: int, seed_value: int) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        for name, build in queries.items():
+            rng = random.Random(seed_value)
+            plan = explain(conn, build(rng))
+            timings = []
+            for _ in range(repeats):
+                statement = build(rng)
+                started = time.perf_counter()
+                conn.execute(statement).all()
+                timings.append(time.perf_counter() - started)
+            results[name] = {"median_ms": round(statistics.median(timings) * 1000, 3), "plan": plan}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cards", type=int, default=1_000_000)
+    parser.add_argument("--boards", type=int, default=1_000)
+    parser.add_argument("--columns", type=int, default=4, help="columns per board")
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--members", type=int, default=5, help="members per board")
+    parser.add_argument("--repeats", type=int, default=50, help="timed runs per query")
+    args = parser.parse_args()
+
+    migrate.upgrade(engine, "0002")
+    seeded = seed(args.boards, args.columns, args.cards, args.users, args.members)
+    queries = hot_queries(args.boards, args.columns, args.users, max(1, args.cards // (args.boards * args.columns)))
+
+    before = measure(queries, args.repeats, seed_value=1)
+    started = time.perf_counter()
+    migrate.upgrade(engine)
+    index_seconds = round(time.perf_counter() - started, 2)
+    after = measure(queries, args.repeats, seed_value=1)
+
+    report = {
+        "database": engine.dialect.name,
+        "seeded": seeded,
+        "index_build_seconds": index_seconds,
+        "queries": {
+            name: {
+                "before_ms": before[name]["median_ms"],
+                "after_ms": after[name]["median_ms"],
+                "plan_before": before[name]["plan"],
+                "plan_after": after[name]["plan"],
+            }
+            for name in queries
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
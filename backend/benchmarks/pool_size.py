@@ -0,0 +1,106 @@
+"""Read throughput against the size of the async connection pool.
+
+Runs ``--concurrency`` clients issuing ``GET /boards/{id}`` through the real ASGI app, once
+per pool size, and reports requests/second, latency and how long requests waited for a
+connection. The pool has no overflow, so checkout wait shows directly when it is too small.
+
+    python -m benchmarks.pool_size --sizes 1,2,5,10,20 --concurrency 50 --requests 2000
+
+Numbers from SQLite mostly measure aiosqlite's threads; point DATABASE_URL at Postgres.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import configure_environment, create_board_fixture, summarize
+
+configure_environment()
+
+import httpx  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app import migrate  # noqa: E402
+from app.database import (  # noqa: E402
+    ASYNC_DATABASE_URL,
+    POOL_CHECKOUT_SECONDS,
+    async_engine,
+    engine_options,
+    get_async_db,
+)
+from app.main import app  # noqa: E402
+
+
+async def drive(client, path: str, headers: dict, concurrency: int, requests: int) -> tuple[list[float], float]:
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path, headers=headers)
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+async def run(sizes: list[int], concurrency: int, requests: int, cards: int) -> dict:
+    migrate.upgrade()
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers, board_id, (todo, done) = await create_board_fixture(client)
+        for i in range(cards):
+            column = todo if i % 2 == 0 else done
+            await client.post(f"/boards/{board_id}/cards/", json={"title": f"Card {i}", "column_id": column}, headers=headers)
+
+        for size in sizes:
+            label = f"bench-{size}"
+            bench_engine = create_async_engine(
+                ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, label, is_async=True, pool_size=size, max_overflow=0)
+            )
+            sessions = async_sessionmaker(bench_engine, autoflush=False, expire_on_commit=False)
+
+            async def bench_db():
+                async with sessions() as db:
+                    yield db
+
+            app.dependency_overrides[get_async_db] = bench_db
+            try:
+                latencies, elapsed = await drive(client, f"/boards/{board_id}", headers, concurrency, requests)
+            finally:
+                app.dependency_overrides.pop(get_async_db, None)
+                await bench_engine.dispose()
+
+            checkouts = POOL_CHECKOUT_SECONDS.count(pool=label)
+            results.append(
+                {
+                    "pool_size": size,
+                    "requests_per_second": round(len(latencies) / elapsed, 1),
+                    "latency": summarize(latencies),
+                    "mean_checkout_wait_ms": round(POOL_CHECKOUT_SECONDS.total(pool=label) / checkouts * 1000, 3) if checkouts else 0.0,
+                }
+            )
+    await async_engine.dispose()
+
+    return {"benchmark": "pool_size", "concurrency": concurrency, "requests": requests, "cards": cards, "runs": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1,2,5,10,20", help="comma-separated pool sizes")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per pool size")
+    parser.add_argument("--cards", type=int, default=50, help="cards on the benchmark board")
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+    result = asyncio.run(run(sizes, args.concurrency, args.requests, args.cards))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Card search latency on a large board.
+
+Imports a board of ``--cards`` cards through ``POST /boards/import`` (titles and descriptions
+drawn from a small vocabulary, so common words match many cards and rare ones few), then
+times ``GET /boards/{id}/search`` for a mix of queries through the real ASGI app.
+
+    python -m benchmarks.search --cards 100000 --requests 200
+
+Point DATABASE_URL at Postgres to measure tsvector + GIN instead of FTS5.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.common import configure_environment, create_board_fixture, summarize
+
+configure_environment()
+
+import httpx  # noqa: E402
+
+from app import migrate  # noqa: E402
+from app.database import async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.ranking import keys_between  # noqa: E402
+
+COMMON = ["fix", "update", "review", "deploy", "design", "test", "write", "refactor"]
+RARE = [f"ticket{i}" for i in range(500)]
+QUERIES = ["deploy", "review design", "ticket42", "refactor ticket7", "nomatch"]
+
+
+async def export_file(cards: int, seed: int = 0):
+    rng = random.Random(seed)
+    yield (json.dumps({"type": "board", "title": "Search bench"}) + "\n").encode()
+    yield (json.dumps({"type": "column", "id": 1, "title": "Backlog", "rank": "a0"}) + "\n").encode()
+    batch = 5000
+    last = None
+    for start in range(0, cards, batch):
+        ranks = keys_between(last, None, min(batch, cards - start))
+        last = ranks[-1]
+        lines = []
+        for rank in ranks:
+            title = " ".join(rng.sample(COMMON, 2) + [rng.choice(RARE)])
+            description = " ".join(rng.choices(COMMON + RARE, k=20))
+            lines.append(json.dumps({"type": "card", "column_id": 1, "title": title, "description": description, "rank": rank}))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+async def run(cards: int, requests: int) -> dict:
+    migrate.upgrade()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        headers, _, _ = await create_board_fixture(client, columns=0)
+        started = time.perf_counter()
+        response = await client.post("/boards/import", content=export_file(cards), headers=headers)
+        response.raise_for_status()
+        import_seconds = time.perf_counter() - started
+        board_id = response.json()["board"]["id"]
+
+        results = {}
+        for q in QUERIES:
+            latencies, hits = [], 0
+            for _ in range(requests):
+                started = time.perf_counter()
+                response = await client.get(f"/boards/{board_id}/search", params={"q": q}, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+                hits = len(response.json())
+            results[q] = {"hits": hits, "latency": summarize(latencies)}
+    await async_engine.dispose()
+
+    return {"benchmark": "search", "cards": cards, "import_seconds": round(import_seconds, 3), "queries": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=200, help="requests per query")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.cards, args.requests)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Move latency while a board has many WebSocket subscribers.
+
+Drives ``PUT /boards/{id}/cards/{card_id}/move`` through the real ASGI app with N in-process
+subscriber sockets attached to the board, some of them slow, and reports request latency
+and how long after each request started every fast socket had the event.
+
+    python -m benchmarks.ws_fanout --sockets 500 --slow 50 --moves 200
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import configure_environment, create_board_fixture, summarize
+
+configure_environment()
+
+import httpx  # noqa: E402
+
+from app.database import Base, async_engine, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.ws import manager  # noqa: E402
+
+
+class BenchSocket:
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = 0
+        self.last_received_at = 0.0
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000):
+        pass
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.received += 1
+        self.last_received_at = time.perf_counter()
+
+
+async def run(sockets: int, slow: int, slow_delay: float, moves: int) -> dict:
+    Base.metadata.create_all(bind=engine)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers, board_id, (todo, done) = await create_board_fixture(client)
+        card = (await client.post(f"/boards/{board_id}/cards/", json={"title": "Card", "column_id": todo}, headers=headers)).json()
+
+        subscribers = [BenchSocket(slow_delay if i < slow else 0.0) for i in range(sockets)]
+        for socket in subscribers:
+            await manager.connect(socket, board_id)
+
+        fast = subscribers[slow:]
+        latencies, delivery_lags = [], []
+        for i in range(moves):
+            target = done if i % 2 == 0 else todo
+            started = time.perf_counter()
+            response = await client.put(
+                f"/boards/{board_id}/cards/{card['id']}/move",
+                json={"column_id": target, "position": 0},
+                headers=headers,
+            )
+            latencies.append(time.perf_counter() - started)
+            response.raise_for_status()
+
+            while any(socket.received <= i for socket in fast):
+                await asyncio.sleep(0)
+            delivery_lags.append(max(socket.last_received_at for socket in fast) - started)
+
+        for socket in subscribers:
+            manager.disconnect(socket, board_id)
+    await async_engine.dispose()
+
+    return {
+        "benchmark": "ws_fanout",
+        "sockets": sockets,
+        "slow_sockets": slow,
+        "slow_delay_ms": slow_delay * 1000,
+        "policy": manager.policy,
+        "move_latency": summarize(latencies),
+        "fast_delivery": summarize(delivery_lags),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sockets", type=int, default=500)
+    parser.add_argument("--slow", type=int, default=50, help="how many subscribers are slow")
+    parser.add_argument("--slow-delay-ms", type=float, default=20.0)
+    parser.add_argument("--moves", type=int, default=200)
+    args = parser.parse_args()
+    result = asyncio.run(run(args.sockets, args.slow, args.slow_delay_ms / 1000, args.moves))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Initial schema, as created by Base.metadata.create_all before migrations existed.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("hashed_password", sa.String(255), nullable=False),
+        sa.Column("display_name", sa.String(100), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "boards",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("owner_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE")),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_boards_id", "boards", ["id"])
+
+    op.create_table(
+        "board_members",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("board_id", sa.Integer(), sa.ForeignKey("boards.id", ondelete="CASCADE")),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE")),
+        sa.Column("role", sa.String(20), nullable=False),
+        sa.Column("invited_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint("board_id", "user_id"),
+    )
+    op.create_index("ix_board_members_id", "board_members", ["id"])
+
+    op.create_table(
+        "board_columns",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("board_id", sa.Integer(), sa.ForeignKey("boards.id", ondelete="CASCADE")),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_board_columns_id", "board_columns", ["id"])
+
+    op.create_table(
+        "cards",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("column_id", sa.Integer(), sa.ForeignKey("board_columns.id", ondelete="CASCADE")),
+        sa.Column("title", sa.String(255), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.Column("assigned_to", sa.Integer(), sa.ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_cards_id", "cards", ["id"])
+
+
+def downgrade():
+    op.drop_table("cards")
+    op.drop_table("board_columns")
+    op.drop_table("board_members")
+    op.drop_table("boards")
+    op.drop_table("users")
@@ -0,0 +1,63 @@
+"""Replace integer positions on cards and columns with fractional rank keys.
+
+Existing rows keep their order: within each column (or board) they are sorted by
+(position, id) and given evenly spaced keys.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+
+from itertools import groupby
+
+import sqlalchemy as sa
+from alembic import op
+
+from app.ranking import keys_between
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+RANK_TYPE = sa.String(255).with_variant(sa.String(255, collation="C"), "postgresql")
+# (table, column the ordering is scoped to)
+ORDERED_TABLES = [("board_columns", "board_id"), ("cards", "column_id")]
+BATCH_SIZE = 10_000
+
+
+def _rewrite(table_name, scope, order_by, target, values_for):
+    """Stream rows grouped by scope in ``order_by`` order and write ``target`` for each group."""
+    bind = op.get_bind()
+    table = sa.table(table_name, sa.column("id"), sa.column(scope), sa.column("position"), sa.column("rank"))
+    rows = bind.execution_options(stream_results=True).execute(
+        sa.select(table.c.id, table.c[scope]).order_by(table.c[scope], *[table.c[name] for name in order_by])
+    )
+    statement = table.update().where(table.c.id == sa.bindparam("row_id")).values({target: sa.bindparam("value")})
+    pending = []
+    for _, group in groupby(rows, key=lambda row: row[1]):
+        ids = [row[0] for row in group]
+        pending.extend({"row_id": row_id, "value": value} for row_id, value in zip(ids, values_for(len(ids))))
+        if len(pending) >= BATCH_SIZE:
+            bind.execute(statement, pending)
+            pending = []
+    if pending:
+        bind.execute(statement, pending)
+
+
+def upgrade():
+    for table_name, scope in ORDERED_TABLES:
+        op.add_column(table_name, sa.Column("rank", RANK_TYPE, nullable=True))
+        _rewrite(table_name, scope, ["position", "id"], "rank", lambda n: keys_between(None, None, n))
+        with op.batch_alter_table(table_name) as batch:
+            batch.alter_column("rank", existing_type=RANK_TYPE, nullable=False)
+            batch.drop_column("position")
+
+
+def downgrade():
+    for table_name, scope in ORDERED_TABLES:
+        op.add_column(table_name, sa.Column("position", sa.Integer(), nullable=True))
+        _rewrite(table_name, scope, ["rank", "id"], "position", range)
+        with op.batch_alter_table(table_name) as batch:
+            batch.alter_column("position", existing_type=sa.Integer(), nullable=False)
+            batch.drop_column("rank")
@@ -0,0 +1,47 @@
+"""Composite indexes for board loads, rank lookups, membership listing and assignments.
+
+On Postgres the indexes are built with CREATE INDEX CONCURRENTLY so writes to cards keep
+flowing while they build; that has to run outside a transaction, so the work preceding
+this revision is committed first.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+
+from contextlib import nullcontext
+
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+# (name, table, columns)
+INDEXES = [
+    ("ix_cards_column_id_rank", "cards", ["column_id", "rank"]),
+    ("ix_board_columns_board_id_rank", "board_columns", ["board_id", "rank"]),
+    ("ix_board_members_user_id_board_id", "board_members", ["user_id", "board_id"]),
+    ("ix_cards_assigned_to", "cards", ["assigned_to"]),
+]
+
+
+def _online():
+    if op.get_bind().dialect.name == "postgresql":
+        return op.get_context().autocommit_block()
+    return nullcontext()
+
+
+def upgrade():
+    with _online():
+        for name, table, columns in INDEXES:
+            # A failed concurrent build leaves an INVALID index behind; clear it before retrying.
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade():
+    with _online():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
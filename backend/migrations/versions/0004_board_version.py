@@ -0,0 +1,24 @@
+"""Per-board version counter, bumped by every change to a board's contents.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A constant server default makes this a metadata-only change on Postgres.
+    op.add_column("boards", sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    with op.batch_alter_table("boards") as batch:
+        batch.drop_column("version")
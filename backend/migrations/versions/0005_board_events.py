@@ -0,0 +1,32 @@
+"""Per-board event log for incremental sync.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "board_events",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("board_id", sa.Integer(), sa.ForeignKey("boards.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("seq", sa.BigInteger(), nullable=False),
+        sa.Column("type", sa.String(50), nullable=False),
+        sa.Column("message", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint("board_id", "seq"),
+    )
+    op.create_index("ix_board_events_id", "board_events", ["id"])
+
+
+def downgrade():
+    op.drop_table("board_events")
@@ -0,0 +1,61 @@
+"""Full-text search index over card titles and descriptions.
+
+Postgres gets a generated tsvector column with a GIN index (built concurrently); SQLite an
+external-content FTS5 table kept in step by triggers, filled from the existing cards.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        # Adding a stored generated column rewrites the table under an exclusive lock.
+        op.execute(
+            "ALTER TABLE cards ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')) STORED"
+        )
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_cards_search_vector")
+            op.execute("CREATE INDEX CONCURRENTLY ix_cards_search_vector ON cards USING gin (search_vector)")
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE cards_fts USING fts5("
+        "title, description, content='cards', content_rowid='id', tokenize='porter unicode61')"
+    )
+    op.execute(
+        "CREATE TRIGGER cards_fts_insert AFTER INSERT ON cards BEGIN "
+        "INSERT INTO cards_fts (rowid, title, description) VALUES (new.id, new.title, new.description); END"
+    )
+    op.execute(
+        "CREATE TRIGGER cards_fts_delete AFTER DELETE ON cards BEGIN "
+        "INSERT INTO cards_fts (cards_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END"
+    )
+    op.execute(
+        "CREATE TRIGGER cards_fts_update AFTER UPDATE OF title, description ON cards BEGIN "
+        "INSERT INTO cards_fts (cards_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO cards_fts (rowid, title, description) VALUES (new.id, new.title, new.description); END"
+    )
+    op.execute("INSERT INTO cards_fts (cards_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_cards_search_vector")
+        op.execute("ALTER TABLE cards DROP COLUMN search_vector")
+        return
+    for trigger in ("cards_fts_insert", "cards_fts_delete", "cards_fts_update"):
+        op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    op.execute("DROP TABLE IF EXISTS cards_fts")
@@ -1,18 +1,32 @@
 import os
+from contextlib import contextmanager
 
 # Set test database URL before any app imports
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 
-from app.database import Base, get_db
+from app.database import Base, get_async_db, get_db
 from app.main import app
+from app.principals import principal_cache
+from app.querystats import instrument_queries
+from app.snapshots import snapshot_cache
+from app.tickets import ticket_revocations
 
 engine = create_engine("sqlite:///./test.db", connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+instrument_queries(engine)
+
+# TestClient runs each request on its own event loop, so async connections must not be pooled.
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+instrument_queries(async_engine.sync_engine)
+TestingAsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 
 def override_get_db():
@@ -23,16 +37,52 @@ def override_get_db():
         db.close()
 
 
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 
 
 @pytest.fixture(autouse=True)
 def setup_db():
+    principal_cache.clear()
+    snapshot_cache.clear()
+    ticket_revocations.clear()
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
 
 
+@pytest.fixture
+def sql_statements():
+    """Records every SQL statement the app's async session runs while the test is active."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def max_queries(sql_statements):
+    """``with max_queries(n): client.get(...)`` fails if the block runs more than ``n`` statements."""
+
+    @contextmanager
+    def check(limit: int):
+        start = len(sql_statements)
+        yield
+        issued = sql_statements[start:]
+        assert len(issued) <= limit, f"{len(issued)} statements, expected at most {limit}:\n" + "\n".join(issued)
+
+    return check
+
+
 @pytest.fixture
 def client():
     return TestClient(app)
@@ -53,6 +103,39 @@ def auth_headers(client):
     return {"Authorization": f"Bearer {token}"}
 
 
+class BoardFactory:
+    """Builds boards, columns and cards through the API as one user."""
+
+    def __init__(self, client, headers):
+        self.client = client
+        self.headers = headers
+
+    def board(self, columns=("To Do",), title="Board") -> tuple[int, list[int]]:
+        """Create a board with ``columns``; returns its id and the column ids."""
+        board_id = self.client.post("/boards/", json={"title": title}, headers=self.headers).json()["id"]
+        column_ids = [
+            self.client.post(f"/boards/{board_id}/columns/", json={"title": column}, headers=self.headers).json()["id"]
+            for column in columns
+        ]
+        return board_id, column_ids
+
+    def cards(self, board_id: int, column_id: int, titles, description=None) -> list[dict]:
+        """Create one card per title, in order, each with its own request."""
+        return [
+            self.client.post(
+                f"/boards/{board_id}/cards/",
+                json={"title": title, "description": description, "column_id": column_id},
+                headers=self.headers,
+            ).json()
+            for title in titles
+        ]
+
+
+@pytest.fixture
+def board_factory(client, auth_headers):
+    return BoardFactory(client, auth_headers)
+
+
 @pytest.fixture
 def second_auth_headers(client):
     client.post("/register", json={
@@ -1,3 +1,12 @@
+import asyncio
+
+from passlib.context import CryptContext
+
+from app import models
+from app.passwords import PasswordPool, password_pool
+from tests.conftest import TestingSessionLocal
+
+
 def test_register(client):
     response = client.post("/register", json={
         "email": "new@example.com",
@@ -50,3 +59,53 @@ def test_login_wrong_password(client):
         "password": "wrongpassword",
     })
     assert response.status_code == 401
+
+
+def test_login_rehashes_password_with_outdated_cost(client):
+    client.post("/register", json={
+        "email": "old@example.com",
+        "password": "password123",
+        "display_name": "Old Hash",
+    })
+    db = TestingSessionLocal()
+    user = db.query(models.User).filter(models.User.email == "old@example.com").first()
+    user.hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=5).hash("password123")
+    db.commit()
+
+    response = client.post("/login", data={"username": "old@example.com", "password": "password123"})
+    assert response.status_code == 200
+
+    db.refresh(user)
+    assert user.hashed_password.startswith("$2b$04$")
+    db.close()
+
+
+def test_login_returns_503_when_password_pool_is_full(client, monkeypatch):
+    client.post("/register", json={
+        "email": "busy@example.com",
+        "password": "password123",
+        "display_name": "Busy",
+    })
+    monkeypatch.setattr(password_pool, "max_pending", 0)
+
+    response = client.post("/login", data={"username": "busy@example.com", "password": "password123"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "2"
+
+
+def test_password_pool_counts_failed_jobs_separately():
+    def broken():
+        raise ValueError("bad hash")
+
+    pool = PasswordPool(workers=1)
+
+    async def scenario():
+        try:
+            await pool.run(broken)
+        except ValueError:
+            pass
+        await pool.run(len, "ok")
+
+    asyncio.run(scenario())
+    pool.shutdown()
+    assert (pool.failed, pool.completed, pool.pending) == (1, 1, 0)
@@ -0,0 +1,71 @@
+def _titles(client, auth_headers, board_id):
+    detail = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+    return [[card["title"] for card in column["cards"]] for column in detail["columns"]]
+
+
+def test_batch_applies_operations_in_order(client, auth_headers, board_factory):
+    board_id, (todo, done) = board_factory.board(("To Do", "Done"))
+    a, b, c = board_factory.cards(board_id, todo, ["a", "b", "c"])
+
+    response = client.post(f"/boards/{board_id}/batch", json={"operations": [
+        {"op": "move", "card_id": c["id"], "column_id": todo, "position": 0},
+        {"op": "move", "card_id": a["id"], "column_id": done, "position": 0},
+        {"op": "create", "column_id": done, "title": "d"},
+        {"op": "update", "card_id": b["id"], "title": "b2"},
+        {"op": "move", "card_id": b["id"], "column_id": done, "position": 1},
+        {"op": "delete", "card_id": c["id"]},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["deleted"] == [c["id"]]
+    assert sorted(card["title"] for card in result["cards"]) == ["a", "b2", "d"]
+    assert _titles(client, auth_headers, board_id) == [[], ["a", "b2", "d"]]
+
+
+def test_batch_is_one_version_and_one_event(client, auth_headers, board_factory):
+    board_id, (todo, done) = board_factory.board(("To Do", "Done"))
+    cards = board_factory.cards(board_id, todo, ["a", "b", "c"])
+    since = client.get(f"/boards/{board_id}", headers=auth_headers).json()["version"]
+
+    token = auth_headers["Authorization"].split()[1]
+    with client.websocket_connect(f"/ws/{board_id}?token={token}") as websocket:
+        result = client.post(f"/boards/{board_id}/batch", json={"operations": [
+            {"op": "move", "card_id": card["id"], "column_id": done, "position": 0} for card in cards
+        ]}, headers=auth_headers).json()
+        event = websocket.receive_json()
+
+    assert result["version"] == since + 1
+    assert (event["type"], event["seq"]) == ("cards_batch", since + 1)
+    assert sorted(card["id"] for card in event["data"]["cards"]) == sorted(card["id"] for card in cards)
+    changes = client.get(f"/boards/{board_id}/changes?since={since}", headers=auth_headers).json()
+    assert [e["type"] for e in changes["events"]] == ["cards_batch"]
+
+
+def test_failed_operation_rolls_back_the_batch(client, auth_headers, board_factory):
+    board_id, (todo, done) = board_factory.board(("To Do", "Done"))
+    (card,) = board_factory.cards(board_id, todo, ["a"])
+    other_board, (foreign,) = board_factory.board(["Elsewhere"])
+    version = client.get(f"/boards/{board_id}", headers=auth_headers).json()["version"]
+
+    response = client.post(f"/boards/{board_id}/batch", json={"operations": [
+        {"op": "update", "card_id": card["id"], "title": "changed"},
+        {"op": "move", "card_id": card["id"], "column_id": foreign, "position": 0},
+    ]}, headers=auth_headers)
+
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Operation 1: Column not found"
+    detail = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+    assert detail["version"] == version
+    assert detail["columns"][0]["cards"][0]["title"] == "a"
+
+
+def test_viewer_cannot_batch(client, auth_headers, board_factory, second_auth_headers):
+    board_id, (todo, _) = board_factory.board(("To Do", "Done"))
+    client.post(f"/boards/{board_id}/invite", json={"email": "user2@example.com", "role": "viewer"}, headers=auth_headers)
+
+    response = client.post(f"/boards/{board_id}/batch", json={"operations": [
+        {"op": "create", "column_id": todo, "title": "Nope"},
+    ]}, headers=second_auth_headers)
+
+    assert response.status_code == 403
@@ -14,6 +14,47 @@ def test_list_boards(client, auth_headers):
     assert len(response.json()) == 2
 
 
+def test_list_boards_pages_by_cursor(client, auth_headers):
+    ids = [client.post("/boards/", json={"title": f"Board {i}"}, headers=auth_headers).json()["id"] for i in range(5)]
+
+    seen, url = [], "/boards/?limit=2"
+    while url:
+        response = client.get(url, headers=auth_headers)
+        seen.append([board["id"] for board in response.json()])
+        link = response.headers.get("link")
+        url = link[link.index("<") + 1:link.index(">")] if link else None
+
+    # Created within the same second here, so the id alone orders them.
+    assert seen == [ids[4:2:-1], ids[2:0:-1], ids[:1]]
+
+
+def test_list_boards_filters_by_title_prefix(client, auth_headers):
+    for title in ("Roadmap", "road trip", "Sprint 50%", "Sprint 5"):
+        client.post("/boards/", json={"title": title}, headers=auth_headers)
+
+    def titles(prefix):
+        return sorted(board["title"] for board in client.get("/boards/", params={"title": prefix}, headers=auth_headers).json())
+
+    assert titles("road") == ["Roadmap", "road trip"]
+    assert titles("Sprint 50%") == ["Sprint 50%"]
+
+
+def test_list_boards_includes_counts(client, auth_headers, second_auth_headers, sql_statements):
+    board_id = client.post("/boards/", json={"title": "Counted"}, headers=auth_headers).json()["id"]
+    client.post("/boards/", json={"title": "Empty"}, headers=auth_headers)
+    column_id = client.post(f"/boards/{board_id}/columns/", json={"title": "Col"}, headers=auth_headers).json()["id"]
+    for title in ("a", "b", "c"):
+        client.post(f"/boards/{board_id}/cards/", json={"title": title, "column_id": column_id}, headers=auth_headers)
+    client.post(f"/boards/{board_id}/invite", json={"email": "user2@example.com", "role": "viewer"}, headers=auth_headers)
+
+    sql_statements.clear()
+    boards = {board["title"]: board for board in client.get("/boards/", headers=auth_headers).json()}
+
+    assert (boards["Counted"]["card_count"], boards["Counted"]["member_count"]) == (3, 2)
+    assert (boards["Empty"]["card_count"], boards["Empty"]["member_count"]) == (0, 1)
+    assert len([s for s in sql_statements if "FROM boards" in s]) == 1
+
+
 def test_get_board_detail(client, auth_headers):
     create_resp = client.post("/boards/", json={"title": "Detail Board"}, headers=auth_headers)
     board_id = create_resp.json()["id"]
@@ -70,3 +111,60 @@ def test_non_member_cannot_access(client, auth_headers, second_auth_headers):
 
     response = client.get(f"/boards/{board_id}", headers=second_auth_headers)
     assert response.status_code == 403
+
+
+def test_get_board_returns_304_while_version_is_unchanged(client, auth_headers, sql_statements):
+    board_id = client.post("/boards/", json={"title": "Cached"}, headers=auth_headers).json()["id"]
+    first = client.get(f"/boards/{board_id}", headers=auth_headers)
+    etag = first.headers["etag"]
+
+    sql_statements.clear()
+    response = client.get(f"/boards/{board_id}", headers={**auth_headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+    assert len(sql_statements) == 1
+
+
+def test_every_mutation_bumps_the_board_version(client, auth_headers, second_auth_headers):
+    board_id = client.post("/boards/", json={"title": "Versioned"}, headers=auth_headers).json()["id"]
+
+    def version():
+        response = client.get(f"/boards/{board_id}", headers=auth_headers)
+        assert response.headers["etag"] == f'"{board_id}.{response.json()["version"]}"'
+        return response.json()["version"]
+
+    seen = [version()]
+    column = client.post(f"/boards/{board_id}/columns/", json={"title": "To Do"}, headers=auth_headers).json()
+    seen.append(version())
+    card = client.post(f"/boards/{board_id}/cards/", json={"title": "Task", "column_id": column["id"]}, headers=auth_headers).json()
+    seen.append(version())
+    client.put(f"/boards/{board_id}/cards/{card['id']}", json={"title": "Renamed"}, headers=auth_headers)
+    seen.append(version())
+    client.put(f"/boards/{board_id}/cards/{card['id']}/move", json={"column_id": column["id"], "position": 0}, headers=auth_headers)
+    seen.append(version())
+    client.delete(f"/boards/{board_id}/cards/{card['id']}", headers=auth_headers)
+    seen.append(version())
+    client.put(f"/boards/{board_id}/columns/{column['id']}", json={"title": "Doing"}, headers=auth_headers)
+    seen.append(version())
+    client.post(f"/boards/{board_id}/invite", json={"email": "user2@example.com", "role": "viewer"}, headers=auth_headers)
+    seen.append(version())
+    client.put(f"/boards/{board_id}", json={"title": "Renamed board"}, headers=auth_headers)
+    seen.append(version())
+
+    assert seen == list(range(len(seen)))
+
+
+def test_snapshot_is_served_from_cache_until_the_board_changes(client, auth_headers, sql_statements):
+    board_id = client.post("/boards/", json={"title": "Cached"}, headers=auth_headers).json()["id"]
+    column = client.post(f"/boards/{board_id}/columns/", json={"title": "To Do"}, headers=auth_headers).json()
+    first = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+
+    sql_statements.clear()
+    assert client.get(f"/boards/{board_id}", headers=auth_headers).json() == first
+    assert not [s for s in sql_statements if "FROM cards" in s]
+
+    client.post(f"/boards/{board_id}/cards/", json={"title": "New", "column_id": column["id"]}, headers=auth_headers)
+    refreshed = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+    assert [card["title"] for card in refreshed["columns"][0]["cards"]] == ["New"]
@@ -0,0 +1,49 @@
+def _column_with_cards(board_factory, count):
+    board_id, (column_id,) = board_factory.board(["Backlog"])
+    board_factory.cards(board_id, column_id, [f"card {i}" for i in range(count)])
+    return board_id, column_id
+
+
+def test_column_cards_page_in_rank_order(client, auth_headers, board_factory):
+    board_id, column_id = _column_with_cards(board_factory, 7)
+
+    titles, after = [], None
+    while True:
+        params = {"limit": 3} if after is None else {"limit": 3, "after": after}
+        page = client.get(f"/boards/{board_id}/columns/{column_id}/cards", params=params, headers=auth_headers).json()
+        titles.append([card["title"] for card in page["cards"]])
+        after = page["next"]
+        if after is None:
+            break
+
+    assert titles == [["card 0", "card 1", "card 2"], ["card 3", "card 4", "card 5"], ["card 6"]]
+
+
+def test_column_cards_page_checks_column_and_cursor(client, auth_headers, board_factory, second_auth_headers):
+    board_id, column_id = _column_with_cards(board_factory, 1)
+    other_board, other_column = _column_with_cards(board_factory, 1)
+
+    assert client.get(f"/boards/{board_id}/columns/{other_column}/cards", headers=auth_headers).status_code == 404
+    assert client.get(f"/boards/{board_id}/columns/{column_id}/cards?after=bogus", headers=auth_headers).status_code == 422
+    assert client.get(f"/boards/{board_id}/columns/{column_id}/cards", headers=second_auth_headers).status_code == 403
+
+
+def test_board_summary_has_counts_and_first_pages(client, auth_headers, board_factory):
+    board_id, backlog = _column_with_cards(board_factory, 5)
+    client.post(f"/boards/{board_id}/columns/", json={"title": "Empty"}, headers=auth_headers)
+
+    response = client.get(f"/boards/{board_id}?view=summary&limit=2", headers=auth_headers)
+
+    summary = response.json()
+    first, empty = summary["columns"]
+    assert (first["card_count"], [card["title"] for card in first["cards"]]) == (5, ["card 0", "card 1"])
+    assert (empty["card_count"], empty["cards"], empty["next"]) == (0, [], None)
+    rest = client.get(
+        f"/boards/{board_id}/columns/{backlog}/cards", params={"after": first["next"]}, headers=auth_headers
+    ).json()
+    assert [card["title"] for card in rest["cards"]] == ["card 2", "card 3", "card 4"]
+
+    etag = response.headers["etag"]
+    assert etag != client.get(f"/boards/{board_id}", headers=auth_headers).headers["etag"]
+    revalidated = client.get(f"/boards/{board_id}?view=summary&limit=2", headers={**auth_headers, "If-None-Match": etag})
+    assert revalidated.status_code == 304
@@ -1,3 +1,15 @@
+import asyncio
+
+from sqlalchemy import event, text
+
+from app import models
+from app.ranking import key_between
+from app.services import moves
+from app.services.moves import MOVES_APPLIED, MOVES_RECEIVED, move_coalescer
+from app.services.ranks import rebalance_ranks
+from tests.conftest import TestingAsyncSessionLocal, async_engine, engine
+
+
 def test_create_column_and_card(client, auth_headers):
     board = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()
     board_id = board["id"]
@@ -33,6 +45,84 @@ def test_move_card(client, auth_headers):
     assert moved["column_id"] == col2["id"]
 
 
+def test_move_card_reorders_within_column(client, auth_headers):
+    board = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()
+    board_id = board["id"]
+    col = client.post(f"/boards/{board_id}/columns/", json={"title": "Col"}, headers=auth_headers).json()
+
+    cards = [
+        client.post(f"/boards/{board_id}/cards/", json={"title": title, "column_id": col["id"]}, headers=auth_headers).json()
+        for title in ("a", "b", "c")
+    ]
+
+    client.put(f"/boards/{board_id}/cards/{cards[2]['id']}/move", json={
+        "column_id": col["id"],
+        "position": 0,
+    }, headers=auth_headers)
+    client.put(f"/boards/{board_id}/cards/{cards[0]['id']}/move", json={
+        "column_id": col["id"],
+        "position": 1,
+    }, headers=auth_headers)
+
+    detail = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+    assert [card["title"] for card in detail["columns"][0]["cards"]] == ["c", "a", "b"]
+
+
+def test_long_ranks_are_rebalanced(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("app.services.ranks.RANK_REBALANCE_LENGTH", 3)
+    board = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()
+    board_id = board["id"]
+    col = client.post(f"/boards/{board_id}/columns/", json={"title": "Col"}, headers=auth_headers).json()
+
+    first = client.post(f"/boards/{board_id}/cards/", json={"title": "first", "column_id": col["id"]}, headers=auth_headers).json()
+    for i in range(6):
+        card = client.post(f"/boards/{board_id}/cards/", json={"title": f"n{i}", "column_id": col["id"]}, headers=auth_headers).json()
+        client.put(f"/boards/{board_id}/cards/{card['id']}/move", json={
+            "column_id": col["id"],
+            "position": 1,
+        }, headers=auth_headers)
+
+    cards = client.get(f"/boards/{board_id}", headers=auth_headers).json()["columns"][0]["cards"]
+    assert cards[0]["id"] == first["id"]
+    assert [card["title"] for card in cards[1:]] == ["n5", "n4", "n3", "n2", "n1", "n0"]
+    assert max(len(card["rank"]) for card in cards) <= 3
+
+
+def test_rebalance_keeps_a_card_moved_while_it_runs_in_place(client, auth_headers, board_factory):
+    board_id, (column_id,) = board_factory.board()
+    a, b, c = board_factory.cards(board_id, column_id, ["a", "b", "c"])
+    with engine.begin() as conn:
+        for card, rank in ((a, "a0"), (b, "a0V"), (c, "a1")):
+            conn.execute(text("UPDATE cards SET rank = :rank WHERE id = :id"), {"rank": rank, "id": card["id"]})
+    moved = []
+
+    def move_a_between_b_and_c(conn, cursor, statement, parameters, context, executemany):
+        # Another writer commits after the rebalance read the ranks but before it writes.
+        if statement.startswith("UPDATE cards") and not moved:
+            moved.append(True)
+            with engine.begin() as other:
+                other.execute(
+                    text("UPDATE cards SET rank = :rank WHERE id = :id"),
+                    {"rank": key_between("a0V", "a1"), "id": a["id"]},
+                )
+
+    async def rebalance():
+        async with TestingAsyncSessionLocal() as db:
+            await rebalance_ranks(db, models.Card, models.Card.column_id == column_id)
+            await db.commit()
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", move_a_between_b_and_c)
+    try:
+        asyncio.run(rebalance())
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", move_a_between_b_and_c)
+
+    assert moved
+    column = client.get(f"/boards/{board_id}", headers=auth_headers).json()["columns"][0]
+    assert [card["title"] for card in column["cards"]] == ["b", "a", "c"]
+    assert len({card["rank"] for card in column["cards"]}) == 3
+
+
 def test_update_card(client, auth_headers):
     board = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()
     board_id = board["id"]
@@ -81,3 +171,91 @@ def test_viewer_cannot_create_card(client, auth_headers, second_auth_headers):
         "column_id": col["id"],
     }, headers=second_auth_headers)
     assert response.status_code == 403
+
+
+def test_cards_are_only_reachable_through_their_own_board(client, auth_headers, second_auth_headers):
+    home = client.post("/boards/", json={"title": "Home"}, headers=auth_headers).json()["id"]
+    other = client.post("/boards/", json={"title": "Other"}, headers=auth_headers).json()["id"]
+    home_column = client.post(f"/boards/{home}/columns/", json={"title": "To Do"}, headers=auth_headers).json()["id"]
+    other_column = client.post(f"/boards/{other}/columns/", json={"title": "To Do"}, headers=auth_headers).json()["id"]
+    card_id = client.post(f"/boards/{home}/cards/", json={"title": "Task", "column_id": home_column}, headers=auth_headers).json()["id"]
+
+    moved = client.put(f"/boards/{other}/cards/{card_id}/move", json={"column_id": other_column, "position": 0}, headers=auth_headers)
+    updated = client.put(f"/boards/{other}/cards/{card_id}", json={"title": "Stolen"}, headers=auth_headers)
+    deleted = client.delete(f"/boards/{other}/cards/{card_id}", headers=auth_headers)
+    bad_target = client.put(f"/boards/{home}/cards/{card_id}/move", json={"column_id": other_column, "position": 0}, headers=auth_headers)
+    outsider = client.delete(f"/boards/{home}/cards/999", headers=second_auth_headers)
+
+    assert [r.status_code for r in (moved, updated, deleted)] == [404, 404, 404]
+    assert (bad_target.status_code, bad_target.json()["detail"]) == (404, "Target column not found")
+    assert (outsider.status_code, outsider.json()["detail"]) == (403, "Not a member of this board")
+    card = client.get(f"/boards/{home}", headers=auth_headers).json()["columns"][0]["cards"][0]
+    assert (card["id"], card["title"]) == (card_id, "Task")
+
+
+def test_rapid_moves_are_coalesced_into_one_write(client, auth_headers, monkeypatch):
+    monkeypatch.setattr(move_coalescer, "window", 0.05)
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    todo, done = (
+        client.post(f"/boards/{board_id}/columns/", json={"title": title}, headers=auth_headers).json()["id"]
+        for title in ("To Do", "Done")
+    )
+    card, other = (
+        client.post(f"/boards/{board_id}/cards/", json={"title": title, "column_id": todo}, headers=auth_headers).json()
+        for title in ("dragged", "other")
+    )
+    version = client.get(f"/boards/{board_id}", headers=auth_headers).json()["version"]
+    received, applied = MOVES_RECEIVED.value(), MOVES_APPLIED.value(outcome="applied")
+
+    async def drag():
+        # A drag across both columns, ending after "other".
+        targets = [(done, 0), (todo, 0), (done, 0), (todo, 1)]
+        return await asyncio.gather(*(move_coalescer.move(board_id, card["id"], *target) for target in targets))
+
+    results = asyncio.run(drag())
+
+    assert {(result.column_id, result.rank) for result in results} == {(todo, results[0].rank)}
+    detail = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+    assert detail["version"] == version + 1
+    assert [c["id"] for c in detail["columns"][0]["cards"]] == [other["id"], card["id"]]
+    assert (MOVES_RECEIVED.value() - received, MOVES_APPLIED.value(outcome="applied") - applied) == (4, 1)
+
+
+def test_a_move_during_a_slow_write_lands_after_it(client, auth_headers, board_factory, monkeypatch):
+    monkeypatch.setattr(move_coalescer, "window", 0.01)
+    board_id, (todo, done) = board_factory.board(("To Do", "Done"))
+    (card,) = board_factory.cards(board_id, todo, ["dragged"])
+    real_apply_move = moves.apply_move
+    calls = []
+
+    async def slow_first_write(db, *args):
+        calls.append(args)
+        if len(calls) == 1:
+            await asyncio.sleep(0.1)
+        return await real_apply_move(db, *args)
+
+    monkeypatch.setattr(moves, "apply_move", slow_first_write)
+
+    async def drag():
+        first = asyncio.create_task(move_coalescer.move(board_id, card["id"], done, 0))
+        await asyncio.sleep(0.03)
+        return await asyncio.gather(first, move_coalescer.move(board_id, card["id"], todo, 0))
+
+    first, last = asyncio.run(drag())
+
+    assert (first.column_id, last.column_id) == (done, todo)
+    assert client.get(f"/boards/{board_id}", headers=auth_headers).json()["columns"][0]["cards"][0]["id"] == card["id"]
+
+
+def test_zero_window_writes_every_move(client, auth_headers, board_factory, monkeypatch):
+    monkeypatch.setattr(move_coalescer, "window", 0)
+    board_id, (todo, done) = board_factory.board(("To Do", "Done"))
+    (card,) = board_factory.cards(board_id, todo, ["dragged"])
+    version = client.get(f"/boards/{board_id}", headers=auth_headers).json()["version"]
+
+    async def drag():
+        return await asyncio.gather(*(move_coalescer.move(board_id, card["id"], column, 0) for column in (done, todo)))
+
+    asyncio.run(drag())
+
+    assert client.get(f"/boards/{board_id}", headers=auth_headers).json()["version"] == version + 2
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.database import (
+    POOL_CHECKOUT_SECONDS,
+    POOL_HOLD_SECONDS,
+    POOL_SIZE,
+    POOL_TIMEOUTS,
+    TimedAsyncQueuePool,
+    TimedNullPool,
+    engine_options,
+    instrument,
+    to_async_url,
+    uninstrument,
+)
+from app.metrics import registry
+
+
+def test_async_url_uses_asyncpg_for_postgres():
+    url = to_async_url("postgresql://taskboard:secret@db:5432/taskboard")
+    assert url == "postgresql+asyncpg://taskboard:secret@db:5432/taskboard"
+
+
+def test_async_url_uses_aiosqlite_for_sqlite():
+    assert to_async_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
+def test_engine_options_use_timed_queue_pool_from_settings():
+    options = engine_options("postgresql+asyncpg://db/taskboard", "async", is_async=True, pool_size=7, max_overflow=3)
+    assert options["poolclass"] is TimedAsyncQueuePool
+    assert (options["pool_size"], options["max_overflow"]) == (7, 3)
+    assert options["pool_pre_ping"] is True
+
+
+def test_external_pooler_mode_disables_pool_and_prepared_statements():
+    options = engine_options("postgresql+asyncpg://db/taskboard", "async", is_async=True, external_pooler=True)
+    assert options["poolclass"] is TimedNullPool
+    assert "pool_size" not in options
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_name_func"]() != options["connect_args"]["prepared_statement_name_func"]()
+
+
+def test_pool_records_checkout_wait_hold_time_and_timeouts(tmp_path):
+    url = f"sqlite:///{tmp_path / 'pool.db'}"
+    engine = instrument(create_engine(url, **engine_options(url, "test-pool", pool_size=1, max_overflow=0, pool_timeout=0.05)))
+
+    held = engine.connect()
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+
+    assert POOL_TIMEOUTS.value(pool="test-pool") == 1
+    assert POOL_CHECKOUT_SECONDS.count(pool="test-pool") == 2
+    assert POOL_CHECKOUT_SECONDS.total(pool="test-pool") >= 0.05
+    assert POOL_HOLD_SECONDS.count(pool="test-pool") == 1
+    registry.collect()
+    assert POOL_SIZE.value(pool="test-pool") == 1
+
+    uninstrument(engine)
+    engine.dispose()
+    registry.collect()
+    assert ("test-pool",) not in POOL_SIZE.values
@@ -0,0 +1,99 @@
+def test_changes_replay_missed_events_in_order(client, auth_headers, board_factory):
+    board_id, (column_id,) = board_factory.board()
+    since = client.get(f"/boards/{board_id}", headers=auth_headers).json()["version"]
+    first, _ = board_factory.cards(board_id, column_id, ["a", "b"])
+    client.delete(f"/boards/{board_id}/cards/{first['id']}", headers=auth_headers)
+
+    changes = client.get(f"/boards/{board_id}/changes?since={since}", headers=auth_headers).json()
+
+    assert changes["version"] == since + 3
+    assert changes["snapshot"] is None
+    assert [event["type"] for event in changes["events"]] == ["card_created", "card_created", "card_deleted"]
+    assert [event["seq"] for event in changes["events"]] == [since + 1, since + 2, since + 3]
+    assert changes["events"][1]["data"]["title"] == "b"
+
+
+def test_changes_are_empty_when_client_is_current(client, auth_headers, board_factory):
+    board_id, _ = board_factory.board()
+    version = client.get(f"/boards/{board_id}", headers=auth_headers).json()["version"]
+
+    changes = client.get(f"/boards/{board_id}/changes?since={version}", headers=auth_headers).json()
+
+    assert changes == {"version": version, "events": [], "snapshot": None}
+
+
+def test_changes_fall_back_to_snapshot_once_log_is_compacted(client, auth_headers, board_factory, monkeypatch):
+    monkeypatch.setattr("app.services.events.COMPACT_EVERY", 2)
+    monkeypatch.setattr("app.services.events.BOARD_EVENT_RETENTION", 2)
+    board_id, (column_id,) = board_factory.board()
+    board_factory.cards(board_id, column_id, ["a", "b", "c", "d"])
+
+    changes = client.get(f"/boards/{board_id}/changes?since=1", headers=auth_headers).json()
+
+    assert changes["events"] is None
+    assert changes["version"] == changes["snapshot"]["version"] == 5
+    assert [card["title"] for card in changes["snapshot"]["columns"][0]["cards"]] == ["a", "b", "c", "d"]
+    recent = client.get(f"/boards/{board_id}/changes?since=4", headers=auth_headers).json()
+    assert [event["data"]["title"] for event in recent["events"]] == ["d"]
+
+
+def test_changes_require_membership(client, auth_headers, board_factory, second_auth_headers):
+    board_id, _ = board_factory.board()
+
+    response = client.get(f"/boards/{board_id}/changes?since=0", headers=second_auth_headers)
+
+    assert response.status_code == 403
+
+
+def test_websocket_resume_replays_missed_events_before_live_ones(client, auth_headers, board_factory):
+    board_id, (column_id,) = board_factory.board()
+    since = client.get(f"/boards/{board_id}", headers=auth_headers).json()["version"]
+    board_factory.cards(board_id, column_id, ["missed"])
+    token = auth_headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/ws/{board_id}?token={token}&since={since}") as websocket:
+        replayed = websocket.receive_json()
+        board_factory.cards(board_id, column_id, ["live"])
+        live = websocket.receive_json()
+
+    assert (replayed["type"], replayed["seq"], replayed["data"]["title"]) == ("card_created", since + 1, "missed")
+    assert (live["seq"], live["data"]["title"]) == (since + 2, "live")
+
+
+def test_websocket_resume_sends_snapshot_when_too_far_behind(client, auth_headers, board_factory, monkeypatch):
+    monkeypatch.setattr("app.services.events.BOARD_CHANGES_LIMIT", 1)
+    board_id, (column_id,) = board_factory.board()
+    board_factory.cards(board_id, column_id, ["a", "b"])
+    token = auth_headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/ws/{board_id}?token={token}&since=0") as websocket:
+        message = websocket.receive_json()
+
+    assert message["type"] == "board_snapshot"
+    assert message["seq"] == message["data"]["version"] == 3
+
+
+def test_background_rebalance_is_logged_with_final_ranks(client, auth_headers, board_factory, monkeypatch):
+    monkeypatch.setattr("app.services.ranks.RANK_REBALANCE_LENGTH", 2)
+    board_id, (column_id,) = board_factory.board()
+    board_factory.cards(board_id, column_id, ["first"])
+    for (card,) in (board_factory.cards(board_id, column_id, [f"n{i}"]) for i in range(3)):
+        client.put(f"/boards/{board_id}/cards/{card['id']}/move", json={"column_id": column_id, "position": 1}, headers=auth_headers)
+
+    events = client.get(f"/boards/{board_id}/changes?since=0", headers=auth_headers).json()["events"]
+    reranked = [event for event in events if event["type"] == "cards_reranked"]
+    board = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+
+    assert reranked and reranked[-1]["data"]["column_id"] == column_id
+    assert reranked[-1]["data"]["ranks"] == [[card["id"], card["rank"]] for card in board["columns"][0]["cards"]]
+
+
+def test_deleting_a_board_clears_its_log(client, auth_headers, board_factory):
+    board_id, (column_id,) = board_factory.board()
+    client.delete(f"/boards/{board_id}", headers=auth_headers)
+
+    new_board_id, (new_column_id,) = board_factory.board()
+    board_factory.cards(new_board_id, new_column_id, ["fresh"])
+
+    events = client.get(f"/boards/{new_board_id}/changes?since=0", headers=auth_headers).json()["events"]
+    assert [event["type"] for event in events] == ["column_created", "card_created"]
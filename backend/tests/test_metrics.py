@@ -0,0 +1,112 @@
+import json
+import time
+
+import pytest
+
+from app.metrics import MultiProcessCollector, Registry
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    latency = registry.histogram("request_seconds", "Request latency.", ("route",), buckets=(0.1, 1.0))
+    latency.observe(0.05, route="/a")
+    latency.observe(0.5, route="/a")
+    latency.observe(5, route="/a")
+
+    lines = registry.render().splitlines()
+    assert 'request_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'request_seconds_bucket{route="/a",le="1"} 2' in lines
+    assert 'request_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'request_seconds_count{route="/a"} 3' in lines
+
+
+def test_collect_hooks_set_gauges_before_render():
+    registry = Registry()
+    depth = registry.gauge("queue_depth", "Items waiting.")
+    queue = [1, 2, 3]
+    registry.on_collect(lambda: depth.set(len(queue)))
+
+    assert "queue_depth 3" in registry.render().splitlines()
+
+
+def test_labels_must_match_declaration():
+    registry = Registry()
+    counter = registry.counter("events_total", "Events.", ("kind",))
+    with pytest.raises(ValueError):
+        counter.inc(board="1")
+    assert registry.counter("events_total", "Events.", ("kind",)) is counter
+
+
+def test_metrics_endpoint_reports_pool_and_password_gauges(client, auth_headers):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'taskboard_db_pool_checked_out{pool="async"}' in body
+    assert "# TYPE taskboard_db_pool_checkout_seconds histogram" in body
+    assert "taskboard_password_queue_depth 0" in body
+    assert 'taskboard_password_jobs_total{outcome="completed"}' in body
+
+
+def _worker(directory, name, requests, connections):
+    registry = Registry()
+    registry.counter("requests_total", "Requests.", ("route",)).inc(requests, route="/a")
+    registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0)).observe(0.5)
+    registry.gauge("connections", "Open sockets.").set(connections)
+    collector = MultiProcessCollector(registry, str(directory), interval=5, name=name)
+    collector.write()
+    return collector
+
+
+def test_multiprocess_scrape_sums_every_workers_snapshot(tmp_path):
+    first = _worker(tmp_path, "a", 3, 2)
+    _worker(tmp_path, "b", 4, 5)
+
+    lines = first.render().splitlines()
+
+    assert 'requests_total{route="/a"} 7' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert "latency_seconds_count 2" in lines
+    assert "connections 7" in lines
+
+
+def test_stale_workers_keep_counters_but_lose_gauges(tmp_path):
+    first = _worker(tmp_path, "a", 3, 2)
+    _worker(tmp_path, "gone", 4, 5)
+    path = tmp_path / "gone.json"
+    snapshot = json.loads(path.read_text())
+    snapshot["written_at"] = time.time() - 60
+    path.write_text(json.dumps(snapshot))
+
+    lines = first.render().splitlines()
+
+    assert 'requests_total{route="/a"} 7' in lines
+    assert "connections 2" in lines
+
+
+def test_http_and_auth_failures_are_counted(client, auth_headers, second_auth_headers):
+    board_id = client.post("/boards/", json={"title": "Private"}, headers=auth_headers).json()["id"]
+    client.get(f"/boards/{board_id}", headers=second_auth_headers)
+    client.post("/login", data={"username": "test@example.com", "password": "wrong"})
+    client.get("/boards/", headers={"Authorization": "Bearer not-a-token"})
+
+    body = client.get("/metrics").text
+
+    assert 'taskboard_http_requests_total{method="GET",route="/boards/{board_id}",status="403"}' in body
+    assert 'taskboard_http_request_duration_seconds_count{method="POST",route="/boards/"}' in body
+    for reason in ("not_member", "invalid_login", "invalid_token"):
+        assert f'taskboard_auth_failures_total{{reason="{reason}"}}' in body
+
+
+def test_websocket_connections_are_reported_per_board(client, auth_headers):
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    token = auth_headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/ws/{board_id}?token={token}") as websocket:
+        client.post(f"/boards/{board_id}/columns/", json={"title": "To Do"}, headers=auth_headers)
+        websocket.receive_json()
+        body = client.get("/metrics").text
+
+    assert f'taskboard_ws_board_connections{{board_id="{board_id}"}} 1' in body
+    assert "taskboard_ws_fanout_seconds_count" in body
@@ -0,0 +1,117 @@
+import sqlalchemy as sa
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from fastapi.testclient import TestClient
+
+from app import database, migrate
+from app.database import Base
+from app.main import app
+from app.models import is_search_object
+from app.seed import DEMO_EMAIL
+
+
+def _seed_positions(engine):
+    with engine.begin() as conn:
+        conn.execute(sa.text("INSERT INTO users (id, email, hashed_password, display_name) VALUES (1, 'a@b.c', 'x', 'A')"))
+        conn.execute(sa.text("INSERT INTO boards (id, title, owner_id) VALUES (1, 'Board', 1)"))
+        conn.execute(sa.text("INSERT INTO board_columns (id, board_id, title, position) VALUES (1, 1, 'Done', 1), (2, 1, 'To Do', 0)"))
+        conn.execute(
+            sa.text(
+                "INSERT INTO cards (id, column_id, title, position) VALUES "
+                "(1, 2, 'third', 2), (2, 2, 'first', 0), (3, 2, 'second', 1), (4, 1, 'only', 0)"
+            )
+        )
+
+
+def test_rank_migration_preserves_existing_order(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrate.db'}")
+    migrate.upgrade(engine, "0001")
+    _seed_positions(engine)
+
+    migrate.upgrade(engine)
+
+    with engine.connect() as conn:
+        cards = conn.execute(sa.text("SELECT title FROM cards WHERE column_id = 2 ORDER BY rank")).scalars().all()
+        columns = conn.execute(sa.text("SELECT title FROM board_columns ORDER BY rank")).scalars().all()
+    assert cards == ["first", "second", "third"]
+    assert columns == ["To Do", "Done"]
+
+    with engine.begin() as conn:
+        command.downgrade(migrate.alembic_config(conn), "0001")
+    with engine.connect() as conn:
+        positions = conn.execute(sa.text("SELECT title, position FROM cards WHERE column_id = 2 ORDER BY position")).all()
+    assert positions == [("first", 0), ("second", 1), ("third", 2)]
+
+
+def test_upgrade_adopts_database_created_without_migrations(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    migrate.upgrade(engine, "0001")
+    _seed_positions(engine)
+    with engine.begin() as conn:
+        conn.execute(sa.text("DROP TABLE alembic_version"))
+
+    migrate.upgrade(engine)
+
+    with engine.connect() as conn:
+        assert conn.execute(sa.text("SELECT count(*) FROM cards WHERE rank IS NOT NULL")).scalar() == 4
+
+
+def test_search_migration_indexes_existing_cards(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    migrate.upgrade(engine, "0001")
+    _seed_positions(engine)
+
+    migrate.upgrade(engine)
+
+    with engine.begin() as conn:
+        conn.execute(sa.text("UPDATE cards SET title = 'renamed' WHERE id = 4"))
+        matches = conn.execute(sa.text("SELECT rowid FROM cards_fts WHERE cards_fts MATCH 'first OR renamed' ORDER BY rowid"))
+        assert matches.scalars().all() == [2, 4]
+    migrate.downgrade(engine, "0005")
+    with engine.connect() as conn:
+        assert not sa.inspect(conn).has_table("cards_fts")
+
+
+def test_migrated_schema_matches_models(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'head.db'}")
+    migrate.upgrade(engine)
+
+    with engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={"include_name": lambda name, *_: not is_search_object(name)})
+        assert compare_metadata(context, Base.metadata) == []
+        plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN SELECT id FROM cards WHERE column_id = 1 ORDER BY rank").all()
+    assert "ix_cards_column_id_rank" in " ".join(row[-1] for row in plan)
+
+
+def test_cli_upgrade_check_and_downgrade(tmp_path, capsys):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'cli.db'}")
+    assert migrate.main(["check"], engine) == 1
+
+    assert migrate.main(["upgrade", "--seed"], engine) == 0
+    assert migrate.main(["check"], engine) == 0
+    with engine.connect() as conn:
+        assert conn.execute(sa.text("SELECT count(*) FROM users WHERE email = :e"), {"e": DEMO_EMAIL}).scalar() == 1
+
+    assert migrate.main(["downgrade", "0002"], engine) == 0
+    capsys.readouterr()
+    migrate.main(["current"], engine)
+    assert capsys.readouterr().out.strip() == "0002"
+
+
+def test_app_startup_runs_no_sql():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engines = [database.engine, database.async_engine.sync_engine]
+    for engine in engines:
+        sa.event.listen(engine, "before_cursor_execute", record)
+    try:
+        with TestClient(app):
+            pass
+    finally:
+        for engine in engines:
+            sa.event.remove(engine, "before_cursor_execute", record)
+    assert statements == []
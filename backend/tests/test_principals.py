@@ -0,0 +1,60 @@
+import time
+
+from app.principals import Principal, PrincipalCache
+
+
+def test_cache_expires_entries_after_ttl():
+    cache = PrincipalCache(ttl=0.05)
+    cache.put_user(Principal(id=1, email="a@example.com", display_name="A"))
+    cache.put_role(1, 10, "editor")
+    assert cache.get_role(1, 10) == "editor"
+
+    time.sleep(0.06)
+
+    assert cache.get_user(1) is None
+    assert cache.get_role(1, 10) is None
+
+
+def test_cache_evicts_least_recently_used_user():
+    cache = PrincipalCache(max_entries=2)
+    for user_id in (1, 2):
+        cache.put_user(Principal(id=user_id, email=f"{user_id}@example.com", display_name=""))
+    cache.get_user(1)
+    cache.put_user(Principal(id=3, email="3@example.com", display_name=""))
+
+    assert cache.get_user(1) is not None
+    assert cache.get_user(2) is None
+
+
+def test_invalidate_board_drops_role_for_every_user():
+    cache = PrincipalCache()
+    cache.put_role(1, 10, "owner")
+    cache.put_role(2, 10, "viewer")
+    cache.put_role(2, 11, "editor")
+
+    cache.invalidate_board(10)
+
+    assert cache.get_role(1, 10) is None
+    assert cache.get_role(2, 10) is None
+    assert cache.get_role(2, 11) == "editor"
+
+
+def test_mutations_skip_auth_queries_once_cached(client, auth_headers, sql_statements):
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    column = client.post(f"/boards/{board_id}/columns/", json={"title": "To Do"}, headers=auth_headers).json()
+    sql_statements.clear()
+
+    client.post(f"/boards/{board_id}/cards/", json={"title": "Task", "column_id": column["id"]}, headers=auth_headers)
+
+    assert not [s for s in sql_statements if "FROM users" in s]
+    # Card mutations check membership in the same query that looks up the column.
+    membership = [s for s in sql_statements if "board_members" in s]
+    assert len(membership) == 1 and "JOIN board_columns" in membership[0]
+
+
+def test_deleted_board_role_is_not_served_from_cache(client, auth_headers):
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    client.delete(f"/boards/{board_id}", headers=auth_headers)
+
+    response = client.get(f"/boards/{board_id}", headers=auth_headers)
+    assert response.status_code == 403
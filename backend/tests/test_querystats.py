@@ -0,0 +1,45 @@
+def _card(board_factory):
+    board_id, (column_id,) = board_factory.board()
+    (card,) = board_factory.cards(board_id, column_id, ["Task"])
+    return board_id, column_id, card["id"]
+
+
+def test_debug_headers_report_the_requests_queries(client, auth_headers, board_factory, monkeypatch):
+    board_id, _, card_id = _card(board_factory)
+    assert "x-db-queries" not in client.get(f"/boards/{board_id}", headers=auth_headers).headers
+
+    monkeypatch.setattr("app.querystats.DEBUG_QUERY_HEADERS", True)
+    response = client.put(f"/boards/{board_id}/cards/{card_id}", json={"title": "Renamed"}, headers=auth_headers)
+
+    assert int(response.headers["x-db-queries"]) > 0
+    assert float(response.headers["x-db-time-ms"]) >= float(response.headers["x-db-slowest-ms"]) > 0
+    assert response.headers["x-db-slowest-statement"].split()[0] in ("SELECT", "UPDATE", "INSERT")
+
+
+def test_query_histograms_are_labeled_by_route(client, auth_headers, board_factory):
+    board_id, column_id, card_id = _card(board_factory)
+    client.put(f"/boards/{board_id}/cards/{card_id}/move", json={"column_id": column_id, "position": 0}, headers=auth_headers)
+
+    text = client.get("/metrics").text
+
+    route = 'method="PUT",route="/boards/{board_id}/cards/{card_id}/move"'
+    assert f"taskboard_http_db_queries_count{{{route}}}" in text
+    assert f"taskboard_http_db_seconds_count{{{route}}}" in text
+    assert f'route="/boards/{board_id}' not in text
+
+
+def test_card_and_board_endpoints_stay_within_query_budgets(client, auth_headers, board_factory, max_queries):
+    board_id, column_id, card_id = _card(board_factory)
+
+    with max_queries(5):
+        client.post(f"/boards/{board_id}/cards/", json={"title": "Another", "column_id": column_id}, headers=auth_headers)
+    with max_queries(4):
+        client.put(f"/boards/{board_id}/cards/{card_id}", json={"title": "Renamed"}, headers=auth_headers)
+    with max_queries(6):
+        client.put(f"/boards/{board_id}/cards/{card_id}/move", json={"column_id": column_id, "position": 1}, headers=auth_headers)
+    with max_queries(6):
+        client.get(f"/boards/{board_id}", headers=auth_headers)
+    with max_queries(1):
+        client.get("/boards/", headers=auth_headers)
+    with max_queries(4):
+        client.delete(f"/boards/{board_id}/cards/{card_id}", headers=auth_headers)
@@ -0,0 +1,34 @@
+import random
+
+import pytest
+
+from app.ranking import key_between, keys_between
+
+
+def test_appends_keep_keys_short():
+    keys = keys_between(None, None, 5000)
+    assert keys == sorted(keys)
+    assert max(len(key) for key in keys) <= 4
+
+
+def test_random_inserts_stay_ordered_and_unique():
+    rng = random.Random(7)
+    keys = [key_between(None, None)]
+    for _ in range(2000):
+        index = rng.randint(0, len(keys))
+        before = keys[index - 1] if index > 0 else None
+        after = keys[index] if index < len(keys) else None
+        keys.insert(index, key_between(before, after))
+    assert keys == sorted(keys)
+    assert len(set(keys)) == len(keys)
+
+
+def test_keys_between_bounds():
+    keys = keys_between("a0", "a1", 10)
+    assert keys == sorted(keys)
+    assert "a0" < keys[0] and keys[-1] < "a1"
+
+
+def test_key_between_rejects_reversed_bounds():
+    with pytest.raises(ValueError):
+        key_between("a1", "a0")
@@ -0,0 +1,50 @@
+def _search(client, auth_headers, board_id, q):
+    response = client.get(f"/boards/{board_id}/search", params={"q": q}, headers=auth_headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_search_ranks_title_matches_first_and_highlights(client, auth_headers, board_factory):
+    board_id, (column_id,) = board_factory.board()
+    board_factory.cards(board_id, column_id, ["Write docs"], "Mention the deploy <script> steps")
+    (deploy,) = board_factory.cards(board_id, column_id, ["Deploy the API"])
+    board_factory.cards(board_id, column_id, ["Unrelated"])
+
+    hits = _search(client, auth_headers, board_id, "deploying")
+
+    assert [hit["card"]["id"] for hit in hits][0] == deploy["id"]
+    assert hits[0]["title"] == "<mark>Deploy</mark> the API"
+    assert hits[1]["title"] == "Write docs"
+    assert "<mark>deploy</mark> &lt;script&gt;" in hits[1]["snippet"]
+
+
+def test_search_index_follows_updates_and_deletes(client, auth_headers, board_factory):
+    board_id, (column_id,) = board_factory.board()
+    (card,) = board_factory.cards(board_id, column_id, ["Old name"])
+    (other,) = board_factory.cards(board_id, column_id, ["Fix login"])
+
+    client.put(f"/boards/{board_id}/cards/{card['id']}", json={"title": "Shiny name"}, headers=auth_headers)
+    client.delete(f"/boards/{board_id}/cards/{other['id']}", headers=auth_headers)
+
+    assert _search(client, auth_headers, board_id, "old") == []
+    assert [hit["card"]["id"] for hit in _search(client, auth_headers, board_id, "shiny")] == [card["id"]]
+    assert _search(client, auth_headers, board_id, "login") == []
+
+
+def test_search_is_scoped_to_the_board_and_its_members(client, auth_headers, board_factory, second_auth_headers):
+    board_id, (column_id,) = board_factory.board()
+    other_board, (other_column,) = board_factory.board(title="Other")
+    board_factory.cards(other_board, other_column, ["Secret plan"])
+
+    assert _search(client, auth_headers, board_id, "secret") == []
+    response = client.get(f"/boards/{other_board}/search", params={"q": "secret"}, headers=second_auth_headers)
+    assert response.status_code == 403
+
+
+def test_search_treats_query_syntax_as_text(client, auth_headers, board_factory):
+    board_id, (column_id,) = board_factory.board()
+    (card,) = board_factory.cards(board_id, column_id, ["Review NEAR release"])
+
+    assert [hit["card"]["id"] for hit in _search(client, auth_headers, board_id, 'review AND "near*')] == []
+    assert [hit["card"]["id"] for hit in _search(client, auth_headers, board_id, "NEAR: (release)")] == [card["id"]]
+    assert _search(client, auth_headers, board_id, "*** ---") == []
@@ -0,0 +1,101 @@
+import json
+
+
+def _export(client, auth_headers, board_id):
+    response = client.get(f"/boards/{board_id}/export", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def _board(board_factory):
+    board_id, (todo, done) = board_factory.board(("To Do", "Done"), title="Source")
+    board_factory.cards(board_id, todo, ["a", "b"])
+    board_factory.cards(board_id, done, ["c", "d"])
+    return board_id
+
+
+def _ndjson(records):
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def test_export_streams_board_columns_then_cards(client, auth_headers, board_factory):
+    board_id = _board(board_factory)
+
+    records = _export(client, auth_headers, board_id)
+
+    assert [record["type"] for record in records] == ["board", "column", "column", "card", "card", "card", "card"]
+    assert records[0] == {"type": "board", "format": 1, "title": "Source"}
+    assert [record["title"] for record in records[3:]] == ["a", "b", "c", "d"]
+    assert {record["column_id"] for record in records[3:]} == {record["id"] for record in records[1:3]}
+
+
+def test_import_round_trips_an_export(client, auth_headers, board_factory, second_auth_headers, monkeypatch):
+    monkeypatch.setattr("app.services.transfer.BOARD_TRANSFER_BATCH_SIZE", 2)
+    board_id = _board(board_factory)
+    exported = client.get(f"/boards/{board_id}/export", headers=auth_headers).text
+
+    response = client.post("/boards/import", content=exported, headers=second_auth_headers)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["board"]["title"], result["columns"], result["cards"]) == ("Source", 2, 4)
+    source = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+    copy = client.get(f"/boards/{result['board']['id']}", headers=second_auth_headers).json()
+    titles = [[card["title"] for card in column["cards"]] for column in copy["columns"]]
+    assert titles == [[card["title"] for card in column["cards"]] for column in source["columns"]]
+    assert copy["members"][0]["role"] == "owner"
+
+
+def test_import_assigns_cards_by_email(client, auth_headers):
+    body = _ndjson([
+        {"type": "board", "title": "Assigned"},
+        {"type": "column", "id": 7, "title": "To Do", "rank": "a0"},
+        {"type": "card", "column_id": 7, "title": "known", "rank": "a0", "assignee": "test@example.com"},
+        {"type": "card", "column_id": 7, "title": "unknown", "rank": "a1", "assignee": "nobody@example.com"},
+    ])
+
+    board_id = client.post("/boards/import", content=body, headers=auth_headers).json()["board"]["id"]
+
+    known, unknown = client.get(f"/boards/{board_id}", headers=auth_headers).json()["columns"][0]["cards"]
+    assert known["assigned_to"] == known["created_by"]
+    assert unknown["assigned_to"] is None
+    assert _export(client, auth_headers, board_id)[2]["assignee"] == "test@example.com"
+
+
+def test_invalid_import_creates_nothing(client, auth_headers):
+    body = _ndjson([
+        {"type": "board", "title": "Broken"},
+        {"type": "column", "id": 1, "title": "To Do", "rank": "a0"},
+        {"type": "card", "column_id": 1, "title": "ok", "rank": "a0"},
+        {"type": "card", "column_id": 2, "title": "orphan", "rank": "a1"},
+    ])
+
+    response = client.post("/boards/import", content=body, headers=auth_headers)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Line 4: unknown column id 2"
+    assert client.get("/boards/", headers=auth_headers).json() == []
+
+
+def test_import_rejects_bad_records(client, auth_headers):
+    cases = [
+        ("", "The import has no board record"),
+        (_ndjson([{"type": "column", "id": 1, "title": "x", "rank": "a0"}]), "Line 1: expected the board record first"),
+        ('{"type": "board"}\n', "Line 1: board.title: Field required"),
+        (
+            _ndjson([{"type": "board", "title": "t"}, {"type": "column", "id": 1, "title": "x", "rank": "a!"}]),
+            "Line 2: invalid rank 'a!'",
+        ),
+    ]
+    for body, detail in cases:
+        response = client.post("/boards/import", content=body, headers=auth_headers)
+        assert (response.status_code, response.json()["detail"]) == (422, detail)
+
+
+def test_non_member_cannot_export(client, auth_headers, second_auth_headers):
+    board_id = client.post("/boards/", json={"title": "Private"}, headers=auth_headers).json()["id"]
+
+    response = client.get(f"/boards/{board_id}/export", headers=second_auth_headers)
+
+    assert response.status_code == 403
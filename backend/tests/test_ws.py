@@ -0,0 +1,427 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import queue
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app import schemas
+from app.tickets import issue_ticket, read_ticket
+from app.ws import (
+    CLOSE_IDLE,
+    Backplane,
+    ConnectionLimitExceeded,
+    ConnectionManager,
+    PostgresBackplane,
+    encode_event,
+)
+
+
+class RecordingSocket:
+    def __init__(self, fail=False, delay=0.0):
+        self.messages = []
+        self.frames = []
+        self.fail = fail
+        self.delay = delay
+        self.close_code = None
+
+    async def accept(self):
+        pass
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.frames.append(text)
+        self.messages.append(json.loads(text))
+
+
+async def settle():
+    """Let writer tasks and the backplane publisher drain their queues."""
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+class BusBackplane(Backplane):
+    """Stands in for a network transport: every backplane on the bus sees every payload."""
+
+    def __init__(self, bus):
+        super().__init__()
+        self.bus = bus
+        bus.append(self)
+
+    async def _send(self, payload):
+        for backplane in self.bus:
+            backplane._receive(payload)
+
+
+def test_broadcast_reaches_only_the_board():
+    async def scenario():
+        manager = ConnectionManager()
+        on_board, other_board = RecordingSocket(), RecordingSocket()
+        await manager.connect(on_board, 1)
+        await manager.connect(other_board, 2)
+
+        manager.broadcast(1, {"type": "card_created"})
+        await settle()
+
+        assert on_board.messages == [{"type": "card_created"}]
+        assert other_board.messages == []
+
+    asyncio.run(scenario())
+
+
+def test_broadcast_drops_failed_sockets():
+    async def scenario():
+        manager = ConnectionManager()
+        healthy, broken = RecordingSocket(), RecordingSocket(fail=True)
+        await manager.connect(healthy, 1)
+        await manager.connect(broken, 1)
+
+        manager.broadcast(1, {"type": "card_deleted"})
+        await settle()
+
+        assert list(manager.active_connections[1]) == [healthy]
+
+    asyncio.run(scenario())
+
+
+def test_backplane_fans_out_to_other_processes_once():
+    async def scenario():
+        bus = []
+        workers = [ConnectionManager(BusBackplane(bus)) for _ in range(3)]
+        sockets = [RecordingSocket() for _ in workers]
+        for worker, socket in zip(workers, sockets):
+            await worker.connect(socket, 7)
+            await worker.start()
+
+        workers[0].broadcast(7, {"type": "card_moved", "data": {"card_id": 1}})
+        await settle()
+
+        for socket in sockets:
+            assert socket.messages == [{"type": "card_moved", "data": {"card_id": 1}}]
+
+    asyncio.run(scenario())
+
+
+def test_event_is_encoded_once_for_all_sockets():
+    async def scenario():
+        manager = ConnectionManager()
+        sockets = [RecordingSocket() for _ in range(3)]
+        for socket in sockets:
+            await manager.connect(socket, 1)
+
+        card = schemas.CardOut(id=5, column_id=2, title="Café", rank="a0")
+        manager.broadcast(1, encode_event("card_created", card))
+        await settle()
+
+        first = sockets[0].frames[0]
+        assert all(socket.frames[0] is first for socket in sockets)
+        assert json.loads(first) == {"type": "card_created", "data": card.model_dump()}
+
+    asyncio.run(scenario())
+
+
+def test_slow_socket_does_not_block_broadcast():
+    async def scenario():
+        manager = ConnectionManager()
+        slow, fast = RecordingSocket(delay=0.5), RecordingSocket()
+        await manager.connect(slow, 1)
+        await manager.connect(fast, 1)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        manager.broadcast(1, {"type": "card_moved"})
+        assert loop.time() - started < 0.05
+
+        await settle()
+        assert fast.messages == [{"type": "card_moved"}]
+        assert slow.messages == []
+
+        manager.disconnect(slow, 1)
+
+    asyncio.run(scenario())
+
+
+def _flood(policy):
+    async def scenario():
+        manager = ConnectionManager(max_queue=2, policy=policy)
+        socket = RecordingSocket(delay=0.01)
+        await manager.connect(socket, 1)
+        for i in range(5):
+            manager.broadcast(1, {"type": "card_moved", "data": {"n": i}})
+        await asyncio.sleep(0.1)
+        connection = manager.active_connections.get(1, {}).get(socket)
+        return socket, connection
+
+    return asyncio.run(scenario())
+
+
+def test_drop_policy_discards_overflow():
+    socket, connection = _flood("drop")
+    assert [m["data"]["n"] for m in socket.messages] == [0, 1]
+    assert connection.dropped == 3
+
+
+def test_coalesce_policy_collapses_backlog_into_resync():
+    socket, _ = _flood("coalesce")
+    assert socket.messages[-1] == {"type": "board_resync", "data": {}}
+
+
+def test_disconnect_policy_closes_slow_socket():
+    socket, connection = _flood("disconnect")
+    assert socket.close_code == 1013
+    assert connection is None
+
+
+def test_silent_sockets_are_reaped_and_the_rest_pinged():
+    async def scenario():
+        manager = ConnectionManager(idle_timeout=0.05)
+        silent, chatty = RecordingSocket(), RecordingSocket()
+        await manager.connect(silent, 1, user_id=1)
+        connection = await manager.connect(chatty, 1, user_id=2)
+        await asyncio.sleep(0.1)
+        connection.touch()
+        reaped = manager.reap()
+        await settle()
+        return silent, chatty, reaped, list(manager.active_connections[1])
+
+    silent, chatty, reaped, remaining = asyncio.run(scenario())
+    assert reaped == 1
+    assert silent.close_code == CLOSE_IDLE
+    assert chatty.messages == [{"type": "ping"}]
+    assert remaining == [chatty]
+
+
+def test_connection_limits_per_user_and_board():
+    async def scenario():
+        manager = ConnectionManager(max_per_user=1, max_per_board=2)
+        first = RecordingSocket()
+        await manager.connect(first, 1, user_id=1)
+        with pytest.raises(ConnectionLimitExceeded) as per_user:
+            await manager.connect(RecordingSocket(), 2, user_id=1)
+        await manager.connect(RecordingSocket(), 1, user_id=2)
+        with pytest.raises(ConnectionLimitExceeded) as per_board:
+            await manager.connect(RecordingSocket(), 1, user_id=3)
+        manager.disconnect(first, 1)
+        await manager.connect(RecordingSocket(), 2, user_id=1)
+        return per_user.value.limit, per_board.value.limit
+
+    assert asyncio.run(scenario()) == ("user", "board")
+
+
+def test_socket_over_the_user_limit_is_refused(client, auth_headers, monkeypatch):
+    monkeypatch.setattr("app.main.manager.max_per_user", 1)
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    token = auth_headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/ws/{board_id}?token={token}") as websocket:
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect(f"/ws/{board_id}?token={token}"):
+                pass
+        websocket.send_json({"type": "pong"})
+        websocket.send_json({"id": 1, "action": "column.create", "data": {"title": "To Do"}})
+        ack, _ = _receive_until_ack(websocket)
+
+    assert (ack["id"], ack["ok"]) == (1, True)
+
+
+def test_mutation_is_pushed_to_board_socket(client, auth_headers):
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    token = auth_headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/ws/{board_id}?token={token}") as websocket:
+        client.post(f"/boards/{board_id}/columns/", json={"title": "To Do"}, headers=auth_headers)
+        message = websocket.receive_json()
+
+    assert message["type"] == "column_created"
+    assert message["data"]["title"] == "To Do"
+
+
+def _receive_until_ack(websocket):
+    events = []
+    while True:
+        message = websocket.receive_json()
+        if message["type"] == "ack":
+            return message, events
+        events.append(message)
+
+
+def test_socket_actions_are_acked_and_broadcast(client, auth_headers):
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    token = auth_headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/ws/{board_id}?token={token}") as websocket:
+        websocket.send_json({"id": 1, "action": "column.create", "data": {"title": "To Do"}})
+        column_ack, column_events = _receive_until_ack(websocket)
+        column_id = column_ack["data"]["id"]
+        websocket.send_json({"id": "c1", "action": "card.create", "data": {"title": "Task", "column_id": column_id}})
+        card_ack, card_events = _receive_until_ack(websocket)
+        websocket.send_json({"id": "m1", "action": "card.move", "data": {"card_id": card_ack["data"]["id"], "column_id": column_id, "position": 0}})
+        move_ack, move_events = _receive_until_ack(websocket)
+
+    assert (column_ack["id"], column_ack["ok"], column_ack["data"]["title"]) == (1, True, "To Do")
+    assert [event["type"] for event in column_events + card_events + move_events] == ["column_created", "card_created", "card_moved"]
+    assert (card_ack["id"], card_ack["data"]["title"]) == ("c1", "Task")
+    assert (move_ack["id"], move_ack["data"]["column_id"]) == ("m1", column_id)
+    detail = client.get(f"/boards/{board_id}", headers=auth_headers).json()
+    assert [card["title"] for card in detail["columns"][0]["cards"]] == ["Task"]
+
+
+def test_socket_action_errors_are_acked(client, auth_headers, second_auth_headers):
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    client.post(f"/boards/{board_id}/invite", json={"email": "user2@example.com", "role": "viewer"}, headers=auth_headers)
+    token = auth_headers["Authorization"].split()[1]
+    viewer_token = second_auth_headers["Authorization"].split()[1]
+
+    with client.websocket_connect(f"/ws/{board_id}?token={token}") as websocket:
+        websocket.send_text("not json")
+        malformed = websocket.receive_json()
+        websocket.send_json({"id": 2, "action": "card.fly", "data": {}})
+        unknown = websocket.receive_json()
+        websocket.send_json({"id": 3, "action": "card.delete", "data": {}})
+        invalid = websocket.receive_json()
+        websocket.send_json({"id": 4, "action": "card.delete", "data": {"card_id": 999}})
+        missing = websocket.receive_json()
+    with client.websocket_connect(f"/ws/{board_id}?token={viewer_token}") as websocket:
+        websocket.send_json({"id": 5, "action": "column.create", "data": {"title": "Nope"}})
+        forbidden = websocket.receive_json()
+
+    assert (malformed["id"], malformed["ok"], malformed["status"]) == (None, False, 400)
+    assert (unknown["id"], unknown["status"]) == (2, 400)
+    assert (invalid["id"], invalid["status"], invalid["detail"][0]["loc"]) == (3, 422, ["card_id"])
+    assert (missing["id"], missing["status"], missing["detail"]) == (4, 404, "Card not found")
+    assert (forbidden["id"], forbidden["status"]) == (5, 403)
+    assert client.get(f"/boards/{board_id}", headers=auth_headers).json()["columns"] == []
+
+
+def _ticket(client, board_id, headers):
+    response = client.post(f"/boards/{board_id}/ticket", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_board_ticket_connects_without_the_database(client, auth_headers, second_auth_headers, monkeypatch):
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    client.post(f"/boards/{board_id}/invite", json={"email": "user2@example.com", "role": "viewer"}, headers=auth_headers)
+    owner, viewer = _ticket(client, board_id, auth_headers), _ticket(client, board_id, second_auth_headers)
+
+    def no_database():
+        raise AssertionError("ticket connects must not open a session")
+
+    monkeypatch.setattr("app.main.AsyncSessionLocal", no_database)
+    with client.websocket_connect(f"/ws/{board_id}?ticket={viewer['ticket']}") as websocket:
+        websocket.send_json({"id": 1, "action": "column.create", "data": {"title": "Nope"}})
+        forbidden = websocket.receive_json()
+    with client.websocket_connect(f"/ws/{board_id}?ticket={owner['ticket']}") as websocket:
+        client.post(f"/boards/{board_id}/columns/", json={"title": "To Do"}, headers=auth_headers)
+        event = websocket.receive_json()
+
+    assert (owner["role"], viewer["role"], owner["expires_in"]) == ("owner", "viewer", 60)
+    assert (forbidden["id"], forbidden["status"]) == (1, 403)
+    assert event["type"] == "column_created"
+
+
+def test_board_tickets_are_scoped_and_not_access_tokens(client, auth_headers, second_auth_headers):
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    other_id = client.post("/boards/", json={"title": "Other"}, headers=auth_headers).json()["id"]
+    ticket = _ticket(client, board_id, auth_headers)["ticket"]
+    token = auth_headers["Authorization"].split()[1]
+
+    for path in (f"/ws/{other_id}?ticket={ticket}", f"/ws/{board_id}?ticket={token}", f"/ws/{board_id}?ticket={ticket}x", f"/ws/{board_id}"):
+        with pytest.raises(WebSocketDisconnect):
+            with client.websocket_connect(path):
+                pass
+    assert client.get("/boards/", headers={"Authorization": f"Bearer {ticket}"}).status_code == 401
+    assert client.post(f"/boards/{board_id}/ticket", headers=second_auth_headers).status_code == 403
+
+
+def test_deleting_a_board_revokes_its_tickets(client, auth_headers):
+    board_id = client.post("/boards/", json={"title": "Board"}, headers=auth_headers).json()["id"]
+    ticket = _ticket(client, board_id, auth_headers)["ticket"]
+
+    client.delete(f"/boards/{board_id}", headers=auth_headers)
+
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/ws/{board_id}?ticket={ticket}"):
+            pass
+
+
+def test_expired_ticket_is_refused():
+    fresh, _ = issue_ticket(1, 7, "editor")
+    expired, _ = issue_ticket(1, 7, "editor", ttl=-10)
+
+    assert read_ticket(fresh, 7).role == "editor"
+    assert read_ticket(expired, 7) is None
+
+
+# --- Multi-process harness (needs a real Postgres) ---
+
+POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+
+
+class QueueSocket:
+    def __init__(self, inbox, name):
+        self.inbox = inbox
+        self.name = name
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        self.inbox.put((self.name, json.loads(text)))
+
+
+async def _serve_worker(dsn, name, board_id, ready, inbox, commands):
+    manager = ConnectionManager(PostgresBackplane(dsn))
+    await manager.start()
+    await manager.connect(QueueSocket(inbox, name), board_id)
+    ready.put(name)
+
+    loop = asyncio.get_running_loop()
+    while True:
+        command = await loop.run_in_executor(None, commands.get)
+        if command is None:
+            break
+        manager.broadcast(board_id, command)
+    await manager.stop()
+
+
+def _run_worker(*args):
+    asyncio.run(_serve_worker(*args))
+
+
+@pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+def test_postgres_backplane_across_processes():
+    ctx = multiprocessing.get_context("spawn")
+    ready, inbox = ctx.Queue(), ctx.Queue()
+    commands = [ctx.Queue() for _ in range(3)]
+    workers = [
+        ctx.Process(target=_run_worker, args=(POSTGRES_URL, f"worker-{i}", 42, ready, inbox, commands[i]))
+        for i in range(3)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for _ in workers:
+            ready.get(timeout=30)
+
+        commands[0].put({"type": "card_created", "data": {"id": 1}})
+
+        received = sorted(inbox.get(timeout=10) for _ in workers)
+        assert received == [(f"worker-{i}", {"type": "card_created", "data": {"id": 1}}) for i in range(3)]
+        with pytest.raises(queue.Empty):
+            inbox.get(timeout=0.5)
+    finally:
+        for command in commands:
+            command.put(None)
+        for worker in workers:
+            worker.join(timeout=10)
+            if worker.is_alive():
+                worker.terminate()
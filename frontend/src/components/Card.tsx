@@ -7,7 +7,7 @@ interface CardData {
   title: string;
   description: string | null;
   column_id: number;
-  position: number;
+  rank: string;
 }
 
 interface SortableCardProps {
@@ -8,7 +8,7 @@ interface CardData {
   title: string;
   description: string | null;
   column_id: number;
-  position: number;
+  rank: string;
 }
 
 interface ColumnProps {
@@ -1,5 +1,6 @@
 "use client";
 import { useEffect, useRef } from "react";
+import { apiFetch } from "@/lib/api";
 
 const WS_URL = process.env.NEXT_PUBLIC_WS_URL || "ws://localhost:8000";
 
@@ -16,15 +17,30 @@ export function useBoardSocket(boardId: string | undefined, onMessage: (msg: Rec
       return;
     }
 
-    const url = `${WS_URL}/ws/${boardId}?token=${token}`;
-    ws.current = new WebSocket(url);
+    let cancelled = false;
 
-    ws.current.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-      onMessage(data);
-    };
+    // A board ticket lets the server accept the socket without a database lookup.
+    apiFetch(`/boards/${boardId}/ticket`, { method: "POST" })
+      .then(({ ticket }) => `${WS_URL}/ws/${boardId}?ticket=${ticket}`)
+      .catch(() => `${WS_URL}/ws/${boardId}?token=${token}`)
+      .then((url) => {
+        if (cancelled) {
+          return;
+        }
+        ws.current = new WebSocket(url);
+
+        ws.current.onmessage = (event) => {
+          const data = JSON.parse(event.data);
+          if (data.type === "ping") {
+            ws.current?.send(JSON.stringify({ type: "pong" }));
+            return;
+          }
+          onMessage(data);
+        };
+      });
 
     return () => {
+      cancelled = true;
       ws.current?.close();
       ws.current = null;
     };
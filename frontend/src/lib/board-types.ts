@@ -3,7 +3,7 @@ export interface CardData {
   title: string;
   description: string | null;
   column_id: number;
-  position: number;
+  rank: string;
   assigned_to: number | null;
   created_by: number | null;
 }
@@ -11,7 +11,7 @@ export interface CardData {
 export interface ColumnData {
   id: number;
   title: string;
-  position: number;
+  rank: string;
   cards: CardData[];
 }
 
@@ -25,6 +25,7 @@ export interface BoardData {
   id: number;
   title: string;
   owner_id: number;
+  version: number;
   columns: ColumnData[];
   members: BoardMember[];
 }